@@ -0,0 +1,154 @@
+import struct
+from array import array
+from profiler import PHASES
+
+# average current of the loads, mA; tune them to the board with a meter
+CURRENTS_MA = {
+    "cpu": 25.0,            # RP2040 running, regulator, sensor
+    "radio": 45.0,          # CYW43 associated, transmitting and receiving
+    "panel": 5.0,           # e-ink panel refreshing
+}
+SLEEP_UA = 0.1              # between wakes: TPL5110 and leakage with the power cut
+
+# loads active in every phase of a wake; the time outside the phases is counted as cpu
+PHASE_LOADS = {
+    "battery": ("cpu",),
+    "sensor": ("cpu",),
+    "display": ("cpu", "panel"),
+    "wifi": ("cpu", "radio"),
+    "mqtt": ("cpu", "radio"),
+    "publish": ("cpu", "radio"),
+    "eink_sleep": ("cpu",),
+}
+
+V_EMPTY_MV = 3000           # voltage the projection runs down to
+SAMPLE_EVERY = 12           # wakes between voltage samples, so the history spans days
+
+MAGIC = b"PE"
+HEADER = "<2sHHHIf"         # magic, capacity, index of the sample written next, count, wakes, mAh of the last wake
+HEADER_SIZE = struct.calcsize(HEADER)
+SAMPLE = "<IH"              # wake, mV
+SAMPLE_SIZE = struct.calcsize(SAMPLE)
+
+
+def wake_mah(durations):
+    """Charge taken by one wake from the microseconds spent in every phase (see profiler.PHASES)."""
+    total = durations[PHASES.index("total")]
+    charge = 0.0            # mA * us
+    counted = 0
+    for i, name in enumerate(PHASES):
+        loads = PHASE_LOADS.get(name)
+        if loads is None:
+            continue
+        current = 0.0
+        for load in loads:
+            current += CURRENTS_MA[load]
+        charge += current * durations[i]
+        counted += durations[i]
+    if total > counted:
+        charge += CURRENTS_MA["cpu"] * (total - counted)
+    return charge / 3_600_000_000
+
+
+class Energy:
+    """
+    Energy per wake and battery life projection.
+
+    Every wake gets its charge estimated from the phase durations and current
+    coefficients. Every SAMPLE_EVERY wakes the battery voltage is added to a ring
+    of 'capacity' samples; a line fitted through them gives the discharge slope
+    per wake, which projects the time until V_EMPTY_MV. Until the slope is known
+    (or while the voltage is not falling, e.g. on USB) the projection divides the
+    remaining capacity by the charge of a wake.
+    """
+
+    def __init__(self, filename="energy.dat", capacity=48):
+        self.filename = filename
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+        self.wakes = 0
+        self.mah = 0.0              # charge of the last wake
+        self.header = bytearray(HEADER_SIZE)
+        self.sample = bytearray(SAMPLE_SIZE)
+        self.x = array("i", bytes(4 * capacity))
+        self.mv = array("H", bytes(2 * capacity))
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.filename, "rb") as f:
+                if f.readinto(self.header) != HEADER_SIZE:
+                    return False
+        except OSError:
+            return False
+        magic, capacity, head, count, wakes, mah = struct.unpack(HEADER, self.header)
+        if magic != MAGIC or capacity != self.capacity:
+            return False
+        self.head = head
+        self.count = count
+        self.wakes = wakes
+        self.mah = mah
+        return True
+
+    def update(self, durations, voltage):
+        """Accounts the wake that just ended, 'voltage' being the battery voltage measured in it."""
+        self.mah = wake_mah(durations)
+        self.wakes += 1
+        try:
+            f = open(self.filename, "r+b")
+        except OSError:
+            f = open(self.filename, "wb")
+            self.head = 0
+            self.count = 0
+        with f:
+            if self.wakes % SAMPLE_EVERY == 1 or not self.count:
+                struct.pack_into(SAMPLE, self.sample, 0, self.wakes, int(voltage * 1000))
+                f.seek(HEADER_SIZE + self.head * SAMPLE_SIZE)
+                f.write(self.sample)
+                self.head = (self.head + 1) % self.capacity
+                self.count = min(self.count + 1, self.capacity)
+            struct.pack_into(HEADER, self.header, 0, MAGIC, self.capacity, self.head, self.count, self.wakes, self.mah)
+            f.seek(0)
+            f.write(self.header)
+        return self.mah
+
+    def slope(self):
+        """Least squares discharge slope in mV per wake, None with fewer than 3 samples."""
+        n = self.count
+        if n < 3:
+            return None
+        x = self.x
+        mv = self.mv
+        try:
+            with open(self.filename, "rb") as f:
+                f.seek(HEADER_SIZE)
+                for i in range(n):
+                    f.readinto(self.sample)
+                    wake, mv[i] = struct.unpack(SAMPLE, self.sample)
+                    x[i] = wake - self.wakes
+        except OSError:
+            return None
+        # centred sums, single precision floats would lose the slope in the raw ones
+        mean_x = sum(x[i] for i in range(n)) / n
+        mean_mv = sum(mv[i] for i in range(n)) / n
+        sxx = sxy = 0.0
+        for i in range(n):
+            dx = x[i] - mean_x
+            sxx += dx * dx
+            sxy += dx * (mv[i] - mean_mv)
+        if not sxx:
+            return None
+        return sxy / sxx
+
+    def days_left(self, voltage, soc, capacity_mah, interval_s):
+        """Projected days until the battery is empty, None when there is nothing to project from."""
+        slope = self.slope()
+        if slope is not None and slope < 0:
+            wakes = (voltage * 1000 - V_EMPTY_MV) / -slope
+        elif self.mah:
+            cycle_mah = self.mah + SLEEP_UA / 1000 * interval_s / 3600
+            wakes = soc / 100 * capacity_mah / cycle_mah
+        else:
+            return None
+        return max(0, wakes) * interval_s / 86400
@@ -26,10 +26,15 @@ SPI_DISPLAY = SPI(SPI_NUM, baudrate=1_000_000, sck=SCL_PIN, mosi=SDA_PIN)
 # DONE_PIN = Pin(0, Pin.OUT)
 DONE_PIN = Pin(9, Pin.OUT)
 
+# power
+VBUS_SENSE = Pin('WL_GPIO2', Pin.IN)     # high when powered from USB
+
 # analog
 Pin(28, Pin.OPEN_DRAIN, None)
 BATT_ADC = ADC(28)
+BATT_ADC_CHANNEL = 2        # ADC input of GPIO28, for reading the registers directly
 TEMPER_ADC = ADC(4)
+TEMPER_ADC_CHANNEL = 4
 
 # leds
 ONBOARD_LED = Pin('LED', Pin.OUT)
@@ -0,0 +1,274 @@
+import struct
+import os
+from array import array
+from nonvolatile import byte_to_num, SEEK_END
+
+MAGIC = b"PQ"
+HEADER = "<2sBBHHHI"        # magic, channels, bits per value, capacity, head, count, sequence number
+HEADER_SIZE = struct.calcsize(HEADER)
+CHANNEL = "<12sff"          # name, scale, offset: value = offset + raw * scale
+NAME_SIZE = 12              # bytes of a channel name in CHANNEL
+CHANNEL_SIZE = struct.calcsize(CHANNEL)
+SEQ_BITS = 16               # every record has the low 16 bits of its sequence number
+BITS = (8, 12, 16)
+
+# range stored in the history, by device class; the display range only maps it to the screen
+CHANNEL_RANGES = {
+    "temperature": (-55, 125),
+    "humidity": (0, 100),
+    "moisture": (0, 100),
+    "carbon_dioxide": (0, 10000),
+}
+
+
+def sensor_channels(sensor):
+    """(name, minimum, maximum) of every quantity the sensor measures, the displayed one first."""
+    channels = []
+    for name in sensor.last_values:
+        if name not in sensor.units_classes:
+            continue
+        unit, device_class = sensor.units_classes[name]
+        if device_class in CHANNEL_RANGES:
+            channels.append((name,) + CHANNEL_RANGES[device_class])
+        elif not channels:
+            channels.append((name, sensor.displ_min, sensor.displ_max))
+        else:
+            channels.append((name, 0, 100))
+    return channels
+
+
+def column_size(bits, capacity):
+    return (capacity * bits + 7) // 8
+
+
+def to_rows(raw, out, scale, offset, minimum, maximum, rows):
+    """
+    Maps raw entries (bytearray, array('H') or a memoryview of them) to chart rows
+    0..rows in one pass, 'minimum' and 'maximum' being the values at row 0 and 'rows'.
+    """
+    k = rows / (maximum - minimum)
+    gain = scale * k
+    shift = (offset - minimum) * k
+    for i in range(len(raw)):
+        row = int(raw[i] * gain + shift)
+        out[i] = 0 if row < 0 else rows if row > rows else row
+    return out
+
+
+class History:
+    """
+    Fixed-capacity circular log of measured values, stored by columns.
+
+    The file holds a header, a table of channels and then one column of 'capacity'
+    entries for the sequence numbers and one for every channel. Values are stored
+    as 8, 12 or 16 bit fixed point numbers with the scale and offset kept in the
+    channel table, so the stored history decodes the same way whatever the display
+    range is set to. Appending writes one entry per column and the header in place,
+    reading the last entries of one channel takes at most two reads into
+    preallocated buffers.
+    """
+
+    def __init__(self, filename, channels, bits=12, capacity=1000, max_read=250):
+        assert bits in BITS and capacity % 2 == 0      # 12 bit entry pairs never straddle the column end
+        self.filename = filename
+        self.bits = bits
+        self.capacity = capacity
+        self.names = []
+        self.encoding = {}          # name: (scale, offset)
+        for name, minimum, maximum in channels:
+            if len(name.encode()) > NAME_SIZE:     # struct would cut it and load() would not find it
+                raise ValueError("Channel name over {} bytes: {}".format(NAME_SIZE, name))
+            self.names.append(name)
+            self.encoding[name] = ((maximum - minimum) / ((1 << bits) - 1), minimum)
+        self.data_offset = HEADER_SIZE + len(channels) * CHANNEL_SIZE
+        self.head = 0               # index of the entry written next
+        self.count = 0
+        self.seq = 0                # number of records ever appended
+        self.header = bytearray(HEADER_SIZE)
+        self.entry = bytearray(2)
+        self.max_read = max_read
+        self.buffer = bytearray(column_size(16, max_read) + 2)
+        self.values = array("H", bytes(2 * max_read))
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.filename, "rb") as f:
+                if f.readinto(self.header) != HEADER_SIZE:
+                    return False
+                magic, channels, bits, capacity, head, count, seq = struct.unpack(HEADER, self.header)
+                if magic != MAGIC or channels != len(self.names) or bits != self.bits or capacity != self.capacity:
+                    return False
+                names = []
+                encoding = {}
+                for _ in range(channels):
+                    name, scale, offset = struct.unpack(CHANNEL, f.read(CHANNEL_SIZE))
+                    name = name.rstrip(b"\0").decode()
+                    names.append(name)
+                    encoding[name] = (scale, offset)
+        except OSError:
+            return False
+        if sorted(names) != sorted(self.names):
+            return False
+        self.names = names
+        self.encoding = encoding
+        self.head = head
+        self.count = count
+        self.seq = seq
+        return True
+
+    def _column_offset(self, name=None):
+        if name is None:
+            return self.data_offset
+        return (self.data_offset + column_size(SEQ_BITS, self.capacity)
+                + self.names.index(name) * column_size(self.bits, self.capacity))
+
+    def _create(self):
+        # header, channel table and zeroed columns, so every entry can be written in place
+        with open(self.filename, "wb") as f:
+            f.write(self._pack_header())
+            for name in self.names:
+                scale, offset = self.encoding[name]
+                f.write(struct.pack(CHANNEL, name.encode(), scale, offset))
+            zeros = bytes(64)
+            size = column_size(SEQ_BITS, self.capacity) + len(self.names) * column_size(self.bits, self.capacity)
+            while size > 0:
+                f.write(zeros[:min(size, len(zeros))])
+                size -= len(zeros)
+
+    def encode(self, name, value):
+        scale, offset = self.encoding[name]
+        raw = int((value - offset) / scale + 0.5)
+        top = (1 << self.bits) - 1
+        return 0 if raw < 0 else top if raw > top else raw
+
+    def decode(self, name, raw):
+        scale, offset = self.encoding[name]
+        return offset + raw * scale
+
+    def _write_entry(self, f, offset, bits, index, raw):
+        entry = self.entry
+        if bits == 8:
+            entry[0] = raw
+            f.seek(offset + index)
+            f.write(memoryview(entry)[:1])
+            return
+        if bits == 16:
+            f.seek(offset + 2 * index)
+            struct.pack_into("<H", entry, 0, raw)
+        else:                       # 12 bits, two entries in three bytes
+            position = offset + (index * 3 >> 1)
+            f.seek(position)
+            f.readinto(entry)
+            if index & 1:
+                entry[0] = (entry[0] & 0x0F) | (raw << 4 & 0xF0)
+                entry[1] = raw >> 4
+            else:
+                entry[0] = raw & 0xFF
+                entry[1] = (entry[1] & 0xF0) | (raw >> 8)
+            f.seek(position)
+        f.write(entry)
+
+    def append(self, values):
+        """Appends one record, 'values' maps channel names to values."""
+        if not self.count:
+            self._create()
+        index = self.head
+        self.head = (index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+        with open(self.filename, "r+b") as f:
+            self._write_entry(f, self._column_offset(), SEQ_BITS, index, self.seq & 0xFFFF)
+            for name in self.names:
+                value = values.get(name)
+                raw = 0 if value is None else self.encode(name, value)
+                self._write_entry(f, self._column_offset(name), self.bits, index, raw)
+            self.seq += 1
+            f.seek(0)
+            f.write(self._pack_header())
+
+    def _read_entries(self, f, offset, bits, start, n, done):
+        # entries start..start+n-1 of one column to the output, from position 'done' on
+        buffer = self.buffer
+        if bits == 8:
+            f.seek(offset + start)
+            f.readinto(memoryview(buffer)[done:done + n])
+        elif bits == 16:
+            f.seek(offset + 2 * start)
+            f.readinto(memoryview(self.values)[done:done + n])
+        else:
+            first = start * 3 >> 1
+            size = ((start + n) * 3 + 1 >> 1) - first
+            f.seek(offset + first)
+            f.readinto(memoryview(buffer)[:size])
+            values = self.values
+            for k in range(n):
+                index = start + k
+                p = (index * 3 >> 1) - first
+                if index & 1:
+                    values[done + k] = buffer[p] >> 4 | buffer[p + 1] << 4
+                else:
+                    values[done + k] = buffer[p] | (buffer[p + 1] & 0x0F) << 8
+
+    def read_last(self, num_of_records, name=None):
+        """
+        Returns a memoryview of the raw last entries of one channel, oldest first:
+        bytes for 8 bit histories, unsigned 16 bit integers otherwise.
+        Without a name the sequence numbers are returned.
+        The view is reused by the next read.
+        """
+        n = min(num_of_records, self.count, self.max_read)
+        bits = SEQ_BITS if name is None else self.bits
+        output = memoryview(self.buffer if bits == 8 else self.values)
+        if not n:
+            return output[:0]
+        offset = self._column_offset(name)
+        start = (self.head - n) % self.capacity
+        first = min(n, self.capacity - start)
+        with open(self.filename, "rb") as f:
+            self._read_entries(f, offset, bits, start, first, 0)
+            if first < n:
+                self._read_entries(f, offset, bits, 0, n - first, first)
+        return output[:n]
+
+    def last_values(self, num_of_values, name):
+        scale, offset = self.encoding[name]
+        return [offset + raw * scale for raw in self.read_last(num_of_values, name)]
+
+    def last_rows(self, num_of_values, name, minimum, maximum, rows, out):
+        """Last values of one channel as chart rows, see to_rows."""
+        raw = self.read_last(num_of_values, name)
+        scale, offset = self.encoding[name]
+        to_rows(raw, out, scale, offset, minimum, maximum, rows)
+        return len(raw)
+
+    def import_legacy(self, filename, num_of_values, minimum, maximum):
+        """
+        Moves the tail of an old one-byte-per-value log, quantized over minimum..maximum,
+        into the first channel of an empty history.
+        """
+        if self.count:
+            return
+        try:
+            num_of_values = min(num_of_values, self.capacity, os.stat(filename)[6])
+            with open(filename, "rb") as f:
+                f.seek(-num_of_values, SEEK_END)
+                values = f.read(num_of_values)
+        except OSError:
+            return
+        self.count = len(values)
+        self.head = self.count % self.capacity
+        self.seq = self.count
+        self._create()
+        name = self.names[0]
+        with open(self.filename, "r+b") as f:
+            for index, byte in enumerate(values):
+                self._write_entry(f, self._column_offset(), SEQ_BITS, index, index)
+                raw = self.encode(name, byte_to_num(byte, minimum, maximum))
+                self._write_entry(f, self._column_offset(name), self.bits, index, raw)
+        os.remove(filename)
+
+    def _pack_header(self):
+        struct.pack_into(HEADER, self.header, 0, MAGIC, len(self.names), self.bits, self.capacity,
+                         self.head, self.count, self.seq)
+        return self.header
@@ -0,0 +1,73 @@
+import builtins
+import gc
+import json
+import sys
+from time import ticks_us, ticks_diff
+
+REPORT_FILE = "imports.json"
+
+_import = None
+_stack = []                 # [us of nested imports, us of gc.collect() inside] of the imports in progress
+Imports = []                # (module, ms, ms without nested imports, bytes kept), in the order they finished
+
+
+def _profiled_import(name, *args):
+    loaded = len(sys.modules)
+    t = ticks_us()
+    gc.collect()
+    before = gc.mem_alloc()
+    collected = ticks_diff(ticks_us(), t)
+    frame = [0, 0]
+    _stack.append(frame)
+    start = ticks_us()
+    try:
+        module = _import(name, *args)
+    finally:
+        _stack.pop()
+    elapsed = ticks_diff(ticks_us(), start) - frame[1]
+    t = ticks_us()
+    gc.collect()
+    kept = gc.mem_alloc() - before
+    collected += ticks_diff(ticks_us(), t)
+    if _stack:
+        _stack[-1][0] += elapsed
+        _stack[-1][1] += frame[1] + collected
+    if len(sys.modules) != loaded:         # imported now, not taken from sys.modules
+        fromlist = args[2] if len(args) > 2 else None
+        if fromlist and fromlist[0] != "*" and name + "." + fromlist[0] in sys.modules:
+            name += "." + ",".join(fromlist)
+        Imports.append((name, elapsed / 1000, (elapsed - frame[0]) / 1000, kept))
+    return module
+
+
+def install():
+    """Measures every module imported from now on; gc.collect() around each import is not counted."""
+    global _import
+    if _import is None:
+        _import = builtins.__import__
+        builtins.__import__ = _profiled_import
+
+
+def finish():
+    """Stops measuring, prints the imports by their own time and saves them for the setup page."""
+    global _import
+    if _import is None:
+        return
+    builtins.__import__ = _import
+    _import = None
+    print("Imports at boot, ms / ms without nested / bytes kept:")
+    for name, ms, own_ms, kept in sorted(Imports, key=lambda i: -i[2]):
+        print(f"{name:<32}{ms:>8.1f}{own_ms:>8.1f}{kept:>8}")
+    try:
+        with open(REPORT_FILE, "w") as f:
+            f.write(json.dumps(Imports))
+    except OSError:
+        pass
+
+
+def load():
+    try:
+        with open(REPORT_FILE, "r") as f:
+            return json.loads(f.read())
+    except Exception:
+        return []
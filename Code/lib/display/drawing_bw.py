@@ -5,12 +5,16 @@ from lib.display.epd_2in13_bw import HEIGHT, WIDTH, BOTTOM, TOP
 WHITE = 1
 BLACK = 0
 
+BIGFONT = "lib/display/bigfont.fnt"     # font of large_text, see lib/display/fontfile.py
+LARGE_TEXT_CACHE = 4096     # bytes of ready to blit bigfont glyphs kept by large_text, about four digits
+
 
 class Drawing:
     def __init__(self, background=WHITE):
         self.img = bytearray((HEIGHT * WIDTH)//8)
         self.canvas = framebuf.FrameBuffer(self.img, HEIGHT, WIDTH, framebuf.MONO_VLSB)
         self.background = background
+        self.writer = None          # of large_text, created with its first use
         self.clear()
 
     def clear(self):
@@ -101,10 +105,13 @@ class Drawing:
 
     def large_text(self, string, x, y, color=BLACK):
         x -= 4
-        from lib.display.writer import Writer
-        import lib.display.bigfont as bigfont
         invert = not color
-        writer_inst = Writer(self.canvas, WIDTH, HEIGHT, bigfont)
+        writer_inst = self.writer
+        if writer_inst is None:
+            from lib.display.writer import Writer
+            from lib.display.fontfile import Font
+            writer_inst = self.writer = Writer(self.canvas, WIDTH, HEIGHT, Font(BIGFONT), verbose=False,
+                                               cache_bytes=LARGE_TEXT_CACHE)
         writer_inst.fgcolor = color
         writer_inst.bgcolor = not color
         writer_inst.set_textpos(TOP, x)
@@ -31,9 +31,8 @@
 # !! Original source file modified !!
 
 from lib.display.ssd_1680 import SSD1680
+from lib.display.frame_store import FrameStore
 from time import sleep_ms
-import os
-from nonvolatile import SEEK_END
 
 HEIGHT = 250
 WIDTH = 128
@@ -47,6 +46,9 @@ RIGHT = 249
 TOP = 6
 BOTTOM = 127
 
+FULL_WINDOW = (0, HEIGHT - 1, 0, WIDTH // 8 - 1)
+WINDOW_MERGE_GAP = 8                # dirty spans closer than this are streamed as one window
+
 
 class Epd2in13bw(SSD1680):
 
@@ -75,33 +77,37 @@ class Epd2in13bw(SSD1680):
         ]
 
         self.partial_in_use = False
-        self.max_display_filesize = IMAGE_BYTES * 20
-        self.filename = "display.dat"
-        img = self.load_display_data(IMAGE_BYTES)
-        if len(img) == IMAGE_BYTES:
-            self.load_previous(img)
-            self.force_full_upd = False
-        else:
-            self.force_full_upd = True
+        self.ram_image = bytearray(IMAGE_BYTES)     # image reordered for controller RAM, reused by every refresh
+        self.last_frame = bytearray(IMAGE_BYTES)    # frame held by the controller RAM, base for dirty windows
+        self.store = FrameStore("display.dat", IMAGE_BYTES)
+        self.force_full_upd = not self.store.load(self.last_frame)
 
     def show(self, image, partial):
-        self.save_display_data(image=image)
+        windows = None
+        if partial and not self.force_full_upd:
+            windows = self._dirty_windows(image)
+            if not windows:
+                return                              # nothing changed since the last frame sent
+        if not self.initialized:                    # the panel wakes only for a frame that changed
+            self.epd_hw_init()
+            if partial and not self.force_full_upd:
+                self.load_previous(self.last_frame)
+        self.store.save(image)
         if not partial or self.force_full_upd:
             self._show_full(image)
             self.force_full_upd = False
         else:
-            self._show_partial(image)
+            self._show_partial(image, windows)
+        self.last_frame[:] = image
 
     def _show_full(self, image):
         if self.partial_in_use:
             self.epd_hw_init()
             self.partial_in_use = False
 
-        self.send_command(0x24)
-        for j in range(self.width_end_byte, -1, -1):
-            for i in range(0, self.height):
-                self.send_int_data(image[i + j * self.height])
-        self.load_previous(image)
+        ram_image = self._to_ram_order(image)
+        self._write_ram(0x24, ram_image)
+        self._write_ram(0x26, ram_image)
         self.full_update()
 
     def _send_lut(self):
@@ -120,10 +126,13 @@ class Epd2in13bw(SSD1680):
         self.send_command(0x2C)                     # VCOM
         self.send_int_data(self.lut_partial[158])
 
-    def _show_partial(self, image):
+    def _show_partial(self, image, windows=None):
         self.reset.value(False)
         sleep_ms(1)
         self.reset.value(True)
+        # the pulse restores the default data entry mode (X first), the windows are written Y first
+        self.send_command(0x11)
+        self.send_int_data(0b00000111)
         if not self.partial_in_use:
             self._send_lut()
 
@@ -148,13 +157,13 @@ class Epd2in13bw(SSD1680):
         self.send_command(0x20)
         self.wait_busy()
 
-        self._define_ram_area(0, 0, self.width - 1, self.height - 1)
-        self._set_ram_pointer(0, 0)
-
-        self.send_command(0x24)
-        for j in range(self.width_end_byte, -1, -1):
-            for i in range(0, self.height):
-                self.send_int_data(image[i + j * self.height])
+        for window in windows or (FULL_WINDOW,):
+            x_start, x_end, row_start, row_end = window
+            ram_x_start = self.width_end_byte - row_end
+            ram_x_end = self.width_end_byte - row_start
+            self._define_ram_area(ram_x_start * 8, x_start, ram_x_end * 8, x_end)
+            self._set_ram_pointer(ram_x_start, x_start)
+            self._write_ram(0x24, self._to_ram_order(image, window))
 
         self._partial_update()
         self.wait_busy()
@@ -166,34 +175,56 @@ class Epd2in13bw(SSD1680):
         self.send_command(0x20)     # Activate Display Update Sequence
 
     def load_previous(self, image):
-        self.send_command(0x26)
-        for j in range(self.width_end_byte, -1, -1):
-            for i in range(0, self.height):
-                self.send_int_data(image[i + j * self.height])
-
-    def save_display_data(self, image):
-        try:
-            filesize = os.stat(self.filename)[6]
-        except OSError:
-            write_mode = "wb"
-            self.force_full_upd = True
-        else:
-            if filesize < self.max_display_filesize:
-                write_mode = "ab"
-            else:
-                write_mode = "wb"
-                # self.force_full_upd = True
-        with open(self.filename, write_mode) as f:
-            f.write(image)
-
-    def load_display_data(self, size):
-        try:
-            with open(self.filename, "rb") as f:
-                f.seek(0, SEEK_END)
-                # filesize = f.tell()
-                f.seek(-size, SEEK_END)
-                values_binary = f.read(size)
-        except OSError:
+        # both RAMs hold the last frame, so partial refreshes may rewrite only the changed windows
+        ram_image = self._to_ram_order(image)
+        self._write_ram(0x24, ram_image)
+        self._write_ram(0x26, ram_image)
+        self.last_frame[:] = image
+
+    def _to_ram_order(self, image, window=FULL_WINDOW):
+        # MONO_VLSB rows of 'height' bytes go to the controller from the last row to the first
+        x_start, x_end, row_start, row_end = window
+        size = x_end - x_start + 1
+        src = memoryview(image)
+        dst = self.ram_image
+        n = 0
+        for row in range(row_end, row_start - 1, -1):
+            offset = row * self.height
+            dst[n:n + size] = src[offset + x_start:offset + x_end + 1]
+            n += size
+        return memoryview(dst)[:n]
+
+    def _dirty_windows(self, image):
+        # windows (x_start, x_end, row_start, row_end) covering every byte that differs from last_frame
+        last = self.last_frame
+        if image == last:
             return []
+        height = self.height
+        spans = []
+        for row in range(self.width_end_byte + 1):
+            offset = row * height
+            end = offset + height - 1
+            if image[offset:end + 1] == last[offset:end + 1]:
+                continue
+            start = offset
+            while image[start] == last[start]:
+                start += 1
+            while image[end] == last[end]:
+                end -= 1
+            spans.append((start - offset, end - offset, row))
+        spans.sort()
+
+        windows = []
+        for x_start, x_end, row in spans:
+            if windows and x_start <= windows[-1][1] + WINDOW_MERGE_GAP:
+                window = windows[-1]
+                window[1] = max(window[1], x_end)
+                window[2] = min(window[2], row)
+                window[3] = max(window[3], row)
+            else:
+                windows.append([x_start, x_end, row, row])
+        return windows
 
-        return values_binary
+    def _write_ram(self, command, ram_image):
+        self.send_command(command)
+        self.send_buffer_data(ram_image)
@@ -0,0 +1,145 @@
+# Fonts stored in a container file, drawn by Writer like the font_to_py modules.
+#
+# File layout, little endian:
+#   header  "PIFN", version, flags (1 hmap, 2 reverse, 4 monospaced), height,
+#           baseline, max_width, min_ch, max_ch, size of the largest packed glyph
+#   index   per glyph offset (u32), packed size (u16), width (u16): the default
+#           glyph first, then min_ch .. max_ch
+#   glyphs  horizontally mapped rows, each row XORed with the one above it and
+#           the result PackBits compressed
+# Made from a font_to_py module by Host/fontpack.py.
+
+import struct
+import sys
+
+MAGIC = b"PIFN"
+VERSION = 1
+HEADER = "<4sBBHHHHHH"
+HEADER_SIZE = struct.calcsize(HEADER)
+ENTRY = "<IHH"
+ENTRY_SIZE = struct.calcsize(ENTRY)
+
+HMAP = 1
+REVERSE = 2
+MONOSPACED = 4
+
+
+def _unpack_python(packed, n, out, size, stride):
+    i = 0
+    o = 0
+    while i < n and o < size:
+        c = packed[i]
+        i += 1
+        if c < 128:                     # c + 1 bytes follow as they are
+            k = c + 1
+            out[o:o + k] = packed[i:i + k]
+            i += k
+            o += k
+        elif c > 128:                   # the next byte 257 - c times
+            v = packed[i]
+            i += 1
+            for j in range(o, o + 257 - c):
+                out[j] = v
+            o += 257 - c
+    for j in range(stride, size):
+        out[j] ^= out[j - stride]
+
+
+_unpack = _unpack_python
+
+if sys.implementation.name == "micropython":
+    import micropython
+
+    try:
+        @micropython.viper
+        def _unpack_viper(packed, n: int, out, size: int, stride: int):
+            src = ptr8(packed)
+            dst = ptr8(out)
+            i = 0
+            o = 0
+            while i < n and o < size:
+                c = src[i]
+                i += 1
+                if c < 128:
+                    k = c + 1
+                    while k > 0:
+                        dst[o] = src[i]
+                        i += 1
+                        o += 1
+                        k -= 1
+                elif c > 128:
+                    k = 257 - c
+                    v = src[i]
+                    i += 1
+                    while k > 0:
+                        dst[o] = v
+                        o += 1
+                        k -= 1
+            j = stride
+            while j < size:
+                dst[j] = dst[j] ^ dst[j - stride]
+                j += 1
+        _unpack = _unpack_viper
+    except Exception:
+        pass
+
+
+class Font:
+    """
+    Font in a container file with the functions of a font_to_py module, for Writer.
+
+    Only the header and the index stay in RAM. get_ch() reads the packed glyph
+    from flash into one reused buffer and unpacks it into another, so the glyph
+    returned is valid until the next get_ch().
+    """
+
+    def __init__(self, filename):
+        self._file = open(filename, "rb")
+        header = self._file.read(HEADER_SIZE)
+        magic, version, self._flags, self._height, self._baseline, self._max_width, self._min_ch, \
+            self._max_ch, max_packed = struct.unpack(HEADER, header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a font file: " + filename)
+        self._index = self._file.read((self._max_ch - self._min_ch + 2) * ENTRY_SIZE)
+        self._packed = bytearray(max_packed)
+        self._glyph = bytearray(((self._max_width - 1) // 8 + 1) * self._height)
+        self._mv_packed = memoryview(self._packed)
+        self._mv_glyph = memoryview(self._glyph)
+
+    def height(self):
+        return self._height
+
+    def baseline(self):
+        return self._baseline
+
+    def max_width(self):
+        return self._max_width
+
+    def hmap(self):
+        return bool(self._flags & HMAP)
+
+    def reverse(self):
+        return bool(self._flags & REVERSE)
+
+    def monospaced(self):
+        return bool(self._flags & MONOSPACED)
+
+    def min_ch(self):
+        return self._min_ch
+
+    def max_ch(self):
+        return self._max_ch
+
+    def get_ch(self, ch):
+        oc = ord(ch)
+        entry = oc - self._min_ch + 1 if self._min_ch <= oc <= self._max_ch else 0
+        offset, packed, width = struct.unpack_from(ENTRY, self._index, entry * ENTRY_SIZE)
+        stride = (width - 1) // 8 + 1
+        size = stride * self._height
+        self._file.seek(offset)
+        self._file.readinto(self._mv_packed[:packed])
+        _unpack(self._packed, packed, self._mv_glyph, size, stride)
+        return self._mv_glyph[:size], self._height, width
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,185 @@
+import struct
+from binascii import crc32
+
+MAGIC = b"PZ"
+HEADER = "<2sBHII"                  # magic, encoding, record length, sequence number, crc32 of the record
+HEADER_SIZE = struct.calcsize(HEADER)
+
+RAW = 0
+RLE = 1
+
+
+def rle_encode(src, dst):
+    """
+    Run-length encodes 'src' into 'dst', returns the encoded length or -1 when it does not fit.
+
+    Control byte 0..127 is followed by that many + 1 literal bytes,
+    control byte 128..255 repeats the next byte (control - 126) times.
+    """
+    n = len(src)
+    limit = len(dst)
+    i = 0
+    o = 0
+    while i < n:
+        value = src[i]
+        j = i + 1
+        end = min(n, i + 129)
+        while j < end and src[j] == value:
+            j += 1
+        if j - i > 1:
+            if o + 2 > limit:
+                return -1
+            dst[o] = j - i + 126
+            dst[o + 1] = value
+            o += 2
+            i = j
+            continue
+
+        start = i
+        end = min(n, i + 128)
+        i += 1
+        while i < end and (i + 1 >= n or src[i] != src[i + 1]):
+            i += 1
+        count = i - start
+        if o + 1 + count > limit:
+            return -1
+        dst[o] = count - 1
+        dst[o + 1:o + 1 + count] = src[start:i]
+        o += 1 + count
+    return o
+
+
+def rle_decode(src, dst):
+    """Decodes 'src' into 'dst', returns the decoded length or -1 when it does not fit."""
+    i = 0
+    o = 0
+    n = len(src)
+    limit = len(dst)
+    while i < n:
+        control = src[i]
+        count = control + 1 if control < 128 else control - 126
+        if o + count > limit:
+            return -1                   # a slice past the end would grow a bytearray
+        if control < 128:
+            dst[o:o + count] = src[i + 1:i + 1 + count]
+            i += 1 + count
+        else:
+            v = src[i + 1]              # filled in place: no run of bytes allocated
+            for j in range(o, o + count):
+                dst[j] = v
+            i += 2
+        o += count
+    return o
+
+
+class FrameStore:
+    """
+    Last displayed frame kept in two fixed slots of one file, overwritten in place.
+
+    Every save goes to the slot not holding the newest frame, so a power loss during
+    the write leaves the previous frame intact. On load the valid slot (magic and crc)
+    with the highest sequence number wins. Frames are stored run-length encoded,
+    or raw when encoding does not make them smaller.
+    """
+
+    def __init__(self, filename, frame_size):
+        self.filename = filename
+        self.frame_size = frame_size
+        self.slot_size = HEADER_SIZE + frame_size
+        self.slot = bytearray(self.slot_size)   # header + record, written with one call
+        self.record = memoryview(self.slot)[HEADER_SIZE:]
+        self.newest = None                      # index of the newest valid slot, None if there is none
+        self.seq = 0
+        self.frame_crc = 0                      # crc32 of the newest frame, decoded
+        self.length = 0                         # length of the newest record as stored
+
+    def load(self, frame):
+        """Reads the newest valid frame into 'frame', which is left as it was when there is none."""
+        self.newest = None
+        self.seq = 0
+        decoded = None                          # RLE records are decoded here and copied only when valid
+        try:
+            with open(self.filename, "rb") as f:
+                for index in range(2):
+                    f.seek(index * self.slot_size)
+                    if f.readinto(memoryview(self.slot)[:HEADER_SIZE]) != HEADER_SIZE:
+                        break
+                    magic, encoding, length, seq, crc = struct.unpack_from(HEADER, self.slot)
+                    if magic != MAGIC or length > self.frame_size:
+                        continue
+                    if self.newest is not None and seq <= self.seq:
+                        continue
+                    record = self.record[:length]
+                    if f.readinto(record) != length or crc32(record) != crc:
+                        continue
+                    if encoding == RLE:
+                        if decoded is None:
+                            decoded = bytearray(self.frame_size)
+                        if rle_decode(record, decoded) != self.frame_size:
+                            continue
+                        frame[:] = decoded
+                    elif encoding == RAW and length == self.frame_size:
+                        frame[:] = record
+                    else:
+                        continue
+                    self.newest = index
+                    self.seq = seq
+                    self.length = length
+        except OSError:
+            return False
+
+        if self.newest is None:
+            return False
+        self.frame_crc = crc32(frame)
+        return True
+
+    def save(self, frame):
+        frame_crc = crc32(frame)
+        length = rle_encode(frame, self.record)
+        if length < 0 or length >= self.frame_size:
+            encoding = RAW
+            length = self.frame_size
+            self.record[:] = frame
+        else:
+            encoding = RLE
+        if self.newest is not None and frame_crc == self.frame_crc and self._stored(length):
+            return False                        # same frame as the stored one
+
+        self.seq += 1
+        self.frame_crc = frame_crc
+        self.length = length
+        struct.pack_into(HEADER, self.slot, 0, MAGIC, encoding, length, self.seq, crc32(self.record[:length]))
+
+        if self.newest is None:
+            index = 0
+            mode = "wb"                         # drops whatever else the file held
+        else:
+            index = 1 - self.newest
+            mode = "r+b"
+        try:
+            f = open(self.filename, mode)
+        except OSError:
+            index = 0
+            f = open(self.filename, "wb")
+        with f:
+            f.seek(index * self.slot_size)
+            f.write(memoryview(self.slot)[:HEADER_SIZE + length])
+        self.newest = index
+        return True
+
+    def _stored(self, length):
+        """Whether the newest slot holds the record just encoded, byte for byte: the crc alone may collide."""
+        if length != self.length:
+            return False
+        chunk = bytearray(64)
+        slot = self.slot
+        try:
+            with open(self.filename, "rb") as f:
+                f.seek(self.newest * self.slot_size + HEADER_SIZE)
+                for start in range(HEADER_SIZE, HEADER_SIZE + length, len(chunk)):
+                    n = min(len(chunk), HEADER_SIZE + length - start)
+                    if f.readinto(memoryview(chunk)[:n]) != n or chunk[:n] != slot[start:start + n]:
+                        return False
+        except OSError:
+            return False
+        return True
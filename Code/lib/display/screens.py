@@ -5,42 +5,59 @@ from lib.display.widgets import Widgets
 from lib.display.epd_2in13_bw import Epd2in13bw
 from gpio_definitions import BUSY_PIN, RST_PIN, DC_PIN, CS_PIN, SPI_DISPLAY
 
-widgets = Widgets()
-eink = Epd2in13bw(BUSY_PIN, RST_PIN, DC_PIN, CS_PIN, SPI_DISPLAY)
+SETTINGS_ROWS = 12          # rows of tiny text 10 px apart that fit the panel
 
+_widgets = None
+_eink = None
 
-def show_chart(values, minimum, maximum, batt_soc, full_refresh=False):
 
-    if len(values) > 250:
-        values.pop(0)
+def display():
+    """Drawing canvas and panel, created on the first use; the panel wakes on its first refresh."""
+    global _widgets, _eink
+    if _eink is None:
+        _widgets = Widgets()
+        _eink = Epd2in13bw(BUSY_PIN, RST_PIN, DC_PIN, CS_PIN, SPI_DISPLAY)
+    return _widgets, _eink
+
+
+def __getattr__(name):      # screens.widgets and screens.eink
+    if name == "widgets":
+        return display()[0]
+    if name == "eink":
+        return display()[1]
+    raise AttributeError(name)
+
+
+def show_chart(rows, count, value, minimum, maximum, batt_soc, full_refresh=False):
+    widgets, eink = display()
     widgets.clear()
-    opt_values = widgets.chart(values, minimum, maximum)
+    wifi, mqtt, battery, text = widgets.chart(rows, count, minimum, maximum)
 
-    if len(opt_values)>62 and max(opt_values[40:62]) > 110:
+    if wifi > 110:
         widgets.wifi_indicator_coor = 40, 123
     else:
         widgets.wifi_indicator_coor = 40, 10
 
-    if len(opt_values)>101 and max(opt_values[60:101]) > 110:
-        print(opt_values[60:101])
+    if mqtt > 110:
         widgets.mqtt_indicator_coor = 60, 114
     else:
         widgets.mqtt_indicator_coor = 60, 1
 
-    if len(opt_values)>182 and max(opt_values[145:182]) > 110:
+    if battery > 110:
         widgets.battery_indicator(batt_soc, 150, 112)
     else:
         widgets.battery_indicator(batt_soc, 150, 0)
 
-    if len(opt_values)>249 and max(opt_values[218:]) > 110:
-        widgets.tiny_text(str(values[-1]), 218, 114)
+    if text > 110:
+        widgets.tiny_text(str(value), 218, 114)
     else:
-        widgets.tiny_text(str(values[-1]), 218, 0)
+        widgets.tiny_text(str(value), 218, 0)
 
     eink.show(widgets.img, partial=not full_refresh)
 
 
 def show_big_val(curr_val, battery_soc, full_refresh=False):
+    widgets, eink = display()
     value_coor = 5, 25
     batt_coor = 210, 0
     widgets.clear()
@@ -51,6 +68,7 @@ def show_big_val(curr_val, battery_soc, full_refresh=False):
 
 
 def show_gauge(curr_val, minimum, maximum, battery_soc, full_refresh=False):
+    widgets, eink = display()
     batt_coor = 215, 5
     widgets.wifi_indicator_coor = 0, 14
     widgets.mqtt_indicator_coor = 20, 5
@@ -71,7 +89,8 @@ def show_gauge(curr_val, minimum, maximum, battery_soc, full_refresh=False):
     eink.show(widgets.img, partial=not full_refresh)
 
 
-def show_overview(batt_voltage, ip, ap_ssid):
+def show_overview(batt_voltage, ip, ap_ssid, wake_mah=None, days_left=None):
+    widgets, eink = display()
     widgets.clear()
     s = os.statvfs('/')
     memory_alloc = f"RAM alloc:      {gc.mem_alloc()//1024} kB "
@@ -97,30 +116,44 @@ def show_overview(batt_voltage, ip, ap_ssid):
     widgets.tiny_text("1)Connect to AP", 130, 80)
     widgets.tiny_text("2)Scan the QR", 130, 90)
     widgets.tiny_text("3)Fill the form", 130, 100)
+    if days_left is not None:
+        widgets.tiny_text(f"Batt: {days_left:.0f} days", 130, 70)
+    if wake_mah:
+        widgets.tiny_text(f"{wake_mah:.3f}mAh/wake", 130, 110)
     eink.show(widgets.img, partial=False)
 
 
 def show_qr_code(content, x, y, size):
+    widgets, eink = display()
     widgets.clear()
     widgets.qr_code(content, x, y, size)
     eink.show(widgets.img, partial=False)
 
 
-def show_settings(settings, partial):
+def show_settings(settings, partial, page=0):
+    """
+    Shows the settings with capitalized keys. When they do not fit, one page of them
+    with its number in the last row; 'page' wraps around.
+    """
+    widgets, eink = display()
     widgets.clear()
-    i = 0
-    for k, v in settings.items():
-        if k[0].islower():
-            continue
+    keys = [k for k in settings if not k[0].islower()]
+    rows = SETTINGS_ROWS if len(keys) <= SETTINGS_ROWS else SETTINGS_ROWS - 1
+    pages = (len(keys) - 1) // rows + 1
+    page %= pages
+    for i, k in enumerate(keys[page*rows:(page+1)*rows]):
+        v = settings[k]
         if "passw" in k.lower() and v:
             v = "******"
         text = f"{k:<10}: {v}"
         widgets.tiny_text(text, 0, i*10)
-        i += 1
+    if pages > 1:
+        widgets.tiny_text(f"{page + 1}/{pages}", eink.height - 30, (SETTINGS_ROWS - 1)*10)
     eink.show(widgets.img, partial=partial)
 
 
 def text_row(text, row):
+    widgets, eink = display()
     row = (row-1)*10
     widgets.fill_rect(x=0, y=row, w=eink.height, h=8, color=1)
     widgets.tiny_text(text, 0, row)
@@ -128,5 +161,6 @@ def text_row(text, row):
 
 
 def clear_display():
+    widgets, eink = display()
     widgets.clear()
     eink.show(widgets.img, partial=False)
@@ -14,7 +14,7 @@ class SSD1680:
         self.height_end_bit = height - 1
         self.width_end_byte = (width // 8) - 1
 
-        self.epd_hw_init()
+        self.initialized = False        # epd_hw_init() runs before the first refresh
 
     def spi_write(self, value):
         self.spi.write(bytearray(value))
@@ -37,6 +37,13 @@ class SSD1680:
         self.spi_write(data)
         self.cs.value(True)
 
+    def send_buffer_data(self, buffer):
+        # whole buffer in one chip-select window, without copying it
+        self.cs.value(False)
+        self.dc.value(True)
+        self.spi.write(buffer)
+        self.cs.value(True)
+
     def wait_busy(self):
         while self.busy.value():
             sleep_ms(3)
@@ -85,6 +92,7 @@ class SSD1680:
         self.send_int_data(0x80)
 
         self.wait_busy()
+        self.initialized = True
 
     def _define_ram_area(self, x_start, y_start, x_end, y_end):
         self.send_command(0x44)
@@ -106,9 +114,13 @@ class SSD1680:
         self.send_int_data((y_start >> 8) & 0xFF)
 
     def deep_sleep(self):
+        if not self.initialized:
+            return                      # not woken since the boot, still asleep from the last one
         self.send_command(0x10)  # enter deep sleep
         self.send_int_data(0x01)
         sleep_ms(100)
+        self.initialized = False        # only epd_hw_init() wakes it, with its registers lost
+        self.partial_in_use = False
 
     def full_update(self):
         # Display Update Control
@@ -1,6 +1,17 @@
+import framebuf
+import struct
+from array import array
 from lib.display.drawing_bw import Drawing, BLACK, WHITE
-from lib.display.epd_2in13_bw import SEEN_WIDTH, SEEN_HEIGHT
-from lib.templates import Gauge, Gauge_needle_end_lookup, Gauge_axis_right_lookup, Gauge_axis_left_lookup
+from lib.display.epd_2in13_bw import SEEN_WIDTH, SEEN_HEIGHT, TOP
+
+
+CHART_ROWS = SEEN_WIDTH - 1
+# columns of the chart shared with the wifi, mqtt, battery and value indicators
+CHART_REGIONS = ((40, 60), (60, 101), (145, 182), (218, SEEN_HEIGHT))
+NO_REGION = 255
+
+QR_CACHE = "qr.dat"             # the last QR code drawn, ready to blit
+QR_HEADER = "<BBHHH"            # scale, version (0 automatic), width, height, length of the content
 
 
 class Widgets(Drawing):
@@ -9,45 +20,50 @@ class Widgets(Drawing):
         self.wifi_indicator_coor = 40, 10
         self.mqtt_indicator_coor = 60, 1
 
-    def chart(self, values, minimum, maximum, color=BLACK):
-        x = 0
-        y = SEEN_WIDTH-1
-        w = SEEN_HEIGHT-1
-        h = 0
-
-        optimized_values = [int(((val - minimum) / (maximum - minimum)) * ((y - h) + h)) for val in values]
-
-        thickness = 3
-        for thick in range(thickness):
-            self.line(x+thick, y, x+thick, h, color)  # left vertical
-
-        spread = 1
-        for index, _ in enumerate(optimized_values, start=1):
-            try:
-                value = optimized_values[-index]
-            except IndexError:
-                return
-            y1 = y - value
-            x1 = w - index*spread
-            x2 = w - ((index*spread)+spread)
-            try:
-                value = optimized_values[-index - 1]
-                y2 = y - value
-            except IndexError:
-                pass
+        self.chart_rows = array("B", bytes(SEEN_HEIGHT))      # reused by every chart render
+        self.chart_maxima = array("B", bytes(len(CHART_REGIONS)))
+        self.chart_region_of = bytearray([NO_REGION] * SEEN_HEIGHT)
+        for region, (start, end) in enumerate(CHART_REGIONS):
+            for x in range(start, end):
+                self.chart_region_of[x] = region
+
+    def chart(self, rows, count, minimum, maximum, color=BLACK):
+        # rows: 0 at the bottom .. CHART_ROWS at the top, oldest first; returns the highest row in each CHART_REGIONS
+        bottom = SEEN_WIDTH-1
+        right = SEEN_HEIGHT-1
+
+        maxima = self.chart_maxima
+        for region in range(len(maxima)):
+            maxima[region] = 0
+        region_of = self.chart_region_of
+
+        self.fill_rect(0, 0, 3, bottom+1, color)  # left vertical
+
+        first = count - right if count > right else 0
+        x = right - count + first
+        previous = rows[first]
+        for i in range(first, count):
+            row = rows[i]
+            if row > previous:
+                top, low = row, previous
             else:
-                thickness = 2
-                for thick in range(thickness):
-                    self.line(x1, y1+thick, x2, y2+thick, color)
+                top, low = previous, row
+            self.vline(x, bottom - top, top - low + 2, color)     # segment from the previous point, 2 px thick
+            region = region_of[x]
+            if region != NO_REGION and row > maxima[region]:
+                maxima[region] = row
+            previous = row
+            x += 1
 
-        self.fill_rect(x+3, h, 20, 12, WHITE)
-        self.tiny_text(str(maximum), x+5, h, color)
-        self.fill_rect(x+3, y-11, 20, 12, WHITE)
-        self.tiny_text(str(minimum), x+5, y-8, color)
+        self.fill_rect(3, 0, 20, 12, WHITE)
+        self.tiny_text(str(maximum), 5, 0, color)
+        self.fill_rect(3, bottom-11, 20, 12, WHITE)
+        self.tiny_text(str(minimum), 5, bottom-8, color)
 
-        return optimized_values
+        return maxima
 
     def gauge(self, value, minimum, maximum):
+        from lib.templates import Gauge, Gauge_needle_end_lookup, Gauge_axis_right_lookup, Gauge_axis_left_lookup
         resolution = len(Gauge_needle_end_lookup)-1
         optimized_value = int(((value - minimum) / (maximum - minimum)) * resolution)
         if optimized_value > resolution:
@@ -122,15 +138,15 @@ class Widgets(Drawing):
             else:
                 self.rect(_x, _y, w, _h)
 
-    def qr_code(self, content, x, y, scale):
-        from lib.display.uQR import QRCode
-        qr = QRCode(border=0, box_size=10)
-        qr.add_data(content)
-        matrix = qr.get_matrix()
-        for y_mat in range(len(matrix) * scale):                            # Scaling the bitmap by 2
-            for x_mat in range(len(matrix[0]) * scale):                     # because my screen is tiny.
-                value = not matrix[int(y_mat / scale)][int(x_mat / scale)]  # Inverting the values because
-                self.pixel(x_mat+x, y_mat+y, value)
+    def qr_code(self, content, x, y, scale, version=None):
+        # dark modules black, 'scale' pixels each; the bitmap is kept in QR_CACHE for the next time
+        key = (content.encode(), version or 0, scale)
+        bitmap = _qr_load(*key)
+        if bitmap is None:
+            bitmap = _qr_render(*key)
+            _qr_save(*key, *bitmap)
+        buf, width, height = bitmap
+        self.canvas.blit(framebuf.FrameBuffer(buf, width, height, framebuf.MONO_VLSB), x, y + TOP)
 
     def wifi_indicator(self, x, y, strength, color=BLACK):
         self.fill_circle(x, y, 30, color=color)
@@ -139,3 +155,52 @@ class Widgets(Drawing):
         if x is None or y is None:
             x, y = self.mqtt_indicator_coor
         self.tiny_text("!MQTT", x, y, color)
+
+
+def _qr_render(content, version, scale):
+    """MONO_VLSB bitmap of the QR code, each row of modules drawn as runs of dark ones."""
+    from lib.display.uQR import QRCode
+    qr = QRCode(version=version or None, border=0, box_size=10)
+    qr.add_data(content)
+    matrix = qr.get_matrix()
+    width = len(matrix[0]) * scale
+    height = len(matrix) * scale
+    buf = bytearray(width * ((height + 7) // 8))
+    bitmap = framebuf.FrameBuffer(buf, width, height, framebuf.MONO_VLSB)
+    bitmap.fill(WHITE)
+    for row, modules in enumerate(matrix):
+        start = None
+        for col in range(len(modules) + 1):
+            dark = col < len(modules) and modules[col]
+            if dark and start is None:
+                start = col
+            elif not dark and start is not None:
+                bitmap.fill_rect(start * scale, row * scale, (col - start) * scale, scale, BLACK)
+                start = None
+    return buf, width, height
+
+
+def _qr_load(content, version, scale):
+    """Bitmap, width and height from QR_CACHE when it holds this QR code, else None."""
+    try:
+        with open(QR_CACHE, "rb") as f:
+            stored_scale, stored_version, width, height, length = \
+                struct.unpack(QR_HEADER, f.read(struct.calcsize(QR_HEADER)))
+            if stored_scale != scale or stored_version != version or f.read(length) != content:
+                return None
+            buf = bytearray(width * ((height + 7) // 8))
+            if f.readinto(buf) != len(buf):
+                return None
+    except (OSError, ValueError):
+        return None
+    return buf, width, height
+
+
+def _qr_save(content, version, scale, buf, width, height):
+    try:
+        with open(QR_CACHE, "wb") as f:
+            f.write(struct.pack(QR_HEADER, scale, version, width, height, len(content)))
+            f.write(content)
+            f.write(buf)
+    except OSError as e:
+        print(e)
@@ -22,6 +22,7 @@
 
 
 import framebuf
+from collections import OrderedDict
 from uctypes import bytearray_at, addressof
 from sys import implementation
 
@@ -62,7 +63,7 @@ class Writer:
             s.text_col = col
         return s.text_row,  s.text_col
 
-    def __init__(self, device, dev_height, dev_width, font, verbose=True):
+    def __init__(self, device, dev_height, dev_width, font, verbose=True, cache_bytes=0):
         self.devid = _get_id(device)
         self.device = device
         if self.devid not in Writer.state:
@@ -95,6 +96,12 @@ class Writer:
         self.char_width = 0
         self.clip_width = 0
 
+        # Ready to blit glyphs keyed by (char, invert), least recently used first.
+        # Holds up to cache_bytes of glyph data, 0 disables the cache.
+        self.cache_bytes = cache_bytes
+        self.cached_bytes = 0
+        self.cache = OrderedDict()
+
     def _getstate(self):
         return Writer.state[self.devid]
 
@@ -238,14 +245,37 @@ class Writer:
         self._get_char(char, recurse)
         if self.glyph is None:
             return  # All done
+        if self.cache_bytes and self.clip_width == self.char_width:
+            fbc = self._cached(char, invert)
+        else:
+            fbc = self._render(self.clip_width, invert)[0]
+        self.device.blit(fbc, s.text_col, s.text_row + self.y_offset)
+        s.text_col += self.char_width
+        self.cpos += 1
+
+    # FrameBuffer of the current glyph and the bytes it holds
+    def _render(self, width, invert):
         buf = bytearray(self.glyph)
         if invert:
             for i, v in enumerate(buf):
                 buf[i] = 0xFF & ~ v
-        fbc = framebuf.FrameBuffer(buf, self.clip_width, self.char_height, self.map)
-        self.device.blit(fbc, s.text_col, s.text_row + self.y_offset)
-        s.text_col += self.char_width
-        self.cpos += 1
+        return framebuf.FrameBuffer(buf, width, self.char_height, self.map), len(buf)
+
+    # Current glyph from the cache, rendered and stored on a miss evicting the
+    # least recently used glyphs over cache_bytes. Glyphs over it are not kept.
+    def _cached(self, char, invert):
+        key = (char, invert)
+        cache = self.cache
+        entry = cache.pop(key, None)
+        if entry is None:
+            entry = self._render(self.char_width, invert)
+            if entry[1] > self.cache_bytes:
+                return entry[0]
+            self.cached_bytes += entry[1]
+            while self.cached_bytes > self.cache_bytes:
+                self.cached_bytes -= cache.pop(next(iter(cache)))[1]
+        cache[key] = entry
+        return entry[0]
 
     def tabsize(self, value=None):
         if value is not None:
@@ -3,22 +3,25 @@ import network
 from collections import OrderedDict
 from lib.display.screens import show_settings, clear_display
 from nonvolatile import Settings, settings_save
-from time import sleep_ms
-from gpio_definitions import BTN_1
+from time import sleep_ms, ticks_ms, ticks_diff
+from gpio_definitions import BTN_1, BTN_2
 import machine
 from sensor import sensor
 from lib.templates import websetup_style, byebye_style
 from lib.wireless.http_utils import parse_query_bytes, make_response
+from profiler import Profiler, PHASES
+import import_profiler
 
 
 AP = network.WLAN(network.AP_IF)
-S = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-S.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-S.bind(('', 80))
-S.listen(1)
+S = None                    # server socket, bound by start_web()
 
 Done = False
 SCR_partial = False
+SCR_page = 0                # page of the settings shown, BTN_2 shows the next one
+SCR_pressed = 0             # ticks_ms of the last BTN_2 press, against contact bounce
+SCR_turn = False            # BTN_2 was pressed, the web loop shows the next page
+ACCEPT_TIMEOUT_S = 0.2      # how often the web loop, waiting for a request, looks at SCR_turn
 
 
 def start_ap(ssid):
@@ -88,6 +91,15 @@ def forms_generator():
         elif k == "BLE-name":
             pattern = r'^[\x20-\x7E]{0,11}$'
             title = "Max. 11 characters."
+        elif k == "Batt-mAh":
+            pattern = r'^[1-9][0-9]{0,5}$'
+            title = "Battery capacity in mAh, for the battery life projection."
+        elif k == "Profile":
+            pattern = r'^[012]$'
+            title = "1 records the time of every wake phase, 2 also the import of every module at boot. Shown at /profile."
+        elif k == "Interval-s":
+            pattern = r'^[1-9][0-9]{0,4}$'
+            title = "Seconds between measurements. On battery the TPL5110 timer sets them: match its period."
 
         forms_general += f"""
         <form method="post" action="/" accept-charset="UTF-8">
@@ -133,6 +145,44 @@ def web_page():
     return html
 
 
+def profile_page():
+    count, stats = Profiler().stats()
+    rows = ""
+    for name in PHASES:
+        mean, maximum = stats[name]
+        rows += f"<tr><td>{name}</td><td>{mean:.1f}</td><td>{maximum:.1f}</td></tr>\n"
+    imports = ""
+    for name, ms, own_ms, kept in import_profiler.load():
+        imports += f"<tr><td>{name}</td><td>{ms:.1f}</td><td>{own_ms:.1f}</td><td>{kept}</td></tr>\n"
+    profile = f"""
+    <!DOCTYPE HTML>
+<html>
+<head>
+    <meta charset="utf-8" name="viewport" content="width=device-width, initial-scale=1">
+    <title>Picoink</title>
+    <style>
+        {websetup_style}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <p>Wake phases of the last {count} wakes</p>
+        <table>
+            <tr><th>phase</th><th>mean ms</th><th>max ms</th></tr>
+            {rows}
+        </table>
+        <p>Imports at the last profiled boot</p>
+        <table>
+            <tr><th>module</th><th>ms</th><th>own ms</th><th>bytes</th></tr>
+            {imports}
+        </table>
+    </div>
+</body>
+</html>
+    """
+    return profile
+
+
 def byebye_page():
     byebye = f"""
     <!DOCTYPE HTML>
@@ -170,6 +220,43 @@ def parse_request(request: dict):
     return True
 
 
+def all_settings():
+    settings = OrderedDict()
+    settings.update(sensor.settings)
+    settings.update(Settings)
+    return settings
+
+
+def next_settings_page(_):
+    # IRQ handler: only marks the press, the display is driven from the web loop in show_page()
+    global SCR_page, SCR_pressed, SCR_turn
+    if ticks_diff(ticks_ms(), SCR_pressed) < 500:
+        return
+    SCR_pressed = ticks_ms()
+    SCR_page += 1
+    SCR_turn = True
+
+
+def show_page():
+    global SCR_partial, SCR_turn
+    SCR_turn = False
+    show_settings(all_settings(), partial=SCR_partial, page=SCR_page)
+    SCR_partial = True
+
+
+def accept():
+    """Next connection to the server socket, showing the pages BTN_2 asks for while waiting."""
+    while True:
+        if SCR_turn:
+            show_page()
+        try:
+            conn, addr = S.accept()
+        except OSError:         # ACCEPT_TIMEOUT_S passed
+            continue
+        conn.settimeout(None)
+        return conn, addr
+
+
 def save_and_restart(_):
     global Done
     if not Done:
@@ -183,16 +270,23 @@ def save_and_restart(_):
 
 
 def start_web():
-    global SCR_partial
+    global S
+
+    S = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    S.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    S.bind(('', 80))
+    S.listen(1)
+    S.settimeout(ACCEPT_TIMEOUT_S)
 
     while not BTN_1.value():
         sleep_ms(200)
     sleep_ms(2000)
     BTN_1.irq(trigger=machine.Pin.IRQ_FALLING, handler=save_and_restart)
+    BTN_2.irq(trigger=machine.Pin.IRQ_FALLING, handler=next_settings_page)
 
     while True:
         server_in_progress = True
-        conn, addr = S.accept()
+        conn, addr = accept()
 
         request = bytes()
         while True:
@@ -202,11 +296,16 @@ def start_web():
                 break
             if not request:
                 conn.close()
-                conn, addr = S.accept()
+                conn, addr = accept()
 
         header, body = request.split(b'\r\n\r\n')
         print(header)
 
+        if header.startswith(b'GET /profile'):
+            conn.send(make_response(profile_page()).encode())
+            conn.close()
+            continue
+
         if header.startswith(b'POST'):
             content_length_pos = header.find(b'Content-Length')
             chunk_size = 4096
@@ -233,11 +332,7 @@ def start_web():
         else:
             response = make_response(byebye_page())
 
-        all_settings = OrderedDict()
-        all_settings.update(sensor.settings)
-        all_settings.update(Settings)
-        show_settings(all_settings, partial=SCR_partial)
-        SCR_partial = True
+        show_page()
 
         conn.send(response.encode())
         conn.close()
@@ -4,8 +4,16 @@ from time import sleep
 from nonvolatile import Settings
 
 
-ble = bluetooth.BLE()
-ble.active(True)
+_ble = None
+
+
+def ble():
+    """BLE radio, activated on the first use."""
+    global _ble
+    if _ble is None:
+        _ble = bluetooth.BLE()
+        _ble.active(True)
+    return _ble
 
 
 def ble_advert(characteristics):
@@ -24,4 +32,9 @@ def ble_advert(characteristics):
     msg_part_2 = length_part_2 + msg_part_2
 
     msg = msg_part_1 + msg_part_2
-    ble.gap_advertise(100_000, msg)
+    ble().gap_advertise(100_000, msg)
+
+
+def ble_stop():
+    if _ble is not None:
+        _ble.gap_advertise(None)
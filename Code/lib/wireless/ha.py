@@ -1,11 +1,17 @@
 import json
 import machine
+from binascii import crc32
 from lib.wireless.umqtt_simple import MQTTClient
 from nonvolatile import Settings
 
 BOARD_ID = machine.unique_id().hex()
 DISCOVERY_PREFIX = "homeassistant"
 DEVICE_NAME = Settings["MQTT-name"]
+SW_VERSION = "1.0.0"
+DISCOVERY_FILE = "discovery.json"   # hashes of the discovery configs the broker acknowledged
+BACKLOG_BATCH = 8           # states in one backlog message
+BACKLOG_BURSTS = 4          # backlog messages sent in one connection at most
+ACK_TIMEOUT_MS = 3_000      # longest wait for all PUBACKs, shorter than the client's message_timeout
 
 MQTT = MQTTClient(client_id=BOARD_ID,
                   server=Settings["MQTT-brokr"],
@@ -14,7 +20,7 @@ MQTT = MQTTClient(client_id=BOARD_ID,
                   password=Settings["MQTT-passw"],
                   keepalive=60,
                   ssl=False,
-                  socket_timeout=None
+                  socket_timeout=5
                   )
 
 
@@ -27,7 +33,7 @@ def send_discovery(name, unit, device_class=None):
               "unit_of_measurement": unit,
               "device": {"identifiers": BOARD_ID,
                          "name": DEVICE_NAME,
-                         "sw_version": "1.0.0",
+                         "sw_version": SW_VERSION,
                          "model": "PicoInk",
                          "manufacturer": "JardaDvorak"
                          },
@@ -38,26 +44,112 @@ def send_discovery(name, unit, device_class=None):
     if device_class:
         config["device_class"] = device_class
     msg = json.dumps(config).encode("utf-8")
-    MQTT.publish(topic, msg, retain=True, qos=1)
+    return MQTT.publish(topic, msg, retain=True, qos=1)
+
+
+def sensor_entities(units_classes):
+    """(name, unit, device_class) of every entity the device reports."""
+    entities = [(name, unit, device_class) for name, (unit, device_class) in units_classes.items()]
+    entities.append(("soc", "%", "battery"))
+    entities.append(("signal", "dBm", "signal_strength"))
+    entities.append(("wake_mah", "mAh", None))
+    entities.append(("days_left", "d", "duration"))
+    return entities
+
+
+def discovery_hash(name, unit, device_class=None):
+    """Hash of everything the discovery config of one entity is made of."""
+    return crc32("\0".join((name, unit, device_class or "", DEVICE_NAME, SW_VERSION, BOARD_ID)).encode("utf-8"))
+
+
+def update_discovery(entities):
+    """
+    Publishes the discovery config of the entities that are new or changed since their config
+    was last acknowledged, back to back in the current connection, and remembers the acknowledged ones.
+    When nothing changed it only compares the hashes. Returns True when all entities are up to date.
+    """
+    try:
+        with open(DISCOVERY_FILE, "r") as f:
+            hashes = json.loads(f.read())
+    except Exception:
+        hashes = {}
+
+    sent = []
+    complete = True
+    try:
+        for name, unit, device_class in entities:
+            digest = discovery_hash(name, unit, device_class)
+            if hashes.get(name) != digest:
+                sent.append((send_discovery(name, unit, device_class), name, digest))
+        if not sent:
+            return True
+        MQTT.wait_for_acks(ACK_TIMEOUT_MS)
+    except Exception as e:
+        print(e)
+        complete = False
+
+    delivered = 0
+    for pid, name, digest in sent:
+        if MQTT.acked(pid):
+            hashes[name] = digest
+            delivered += 1
+    if delivered:
+        with open(DISCOVERY_FILE, "w") as f:
+            f.write(json.dumps(hashes))
+    return complete and delivered == len(sent)
 
 
 def send_state(**kwargs):
+    """Publishes the state with QoS1 without waiting for the PUBACK, returns its PID or False."""
     try:
         topic = f"{DEVICE_NAME}/sensor".encode("utf-8")
         payload = kwargs
         payload["uid"] = BOARD_ID
         msg = json.dumps(payload).encode("utf-8")
-        MQTT.publish(topic, msg, retain=False, qos=1)
+        return MQTT.publish(topic, msg, retain=False, qos=1)
     except Exception as e:
         print(e)
         return False
-    else:
-        return True
 
 
-def connect_mqtt():
+def send_backlog(outbox):
+    """
+    Publishes the oldest states of the outbox as JSON arrays of up to BACKLOG_BATCH states,
+    up to BACKLOG_BURSTS QoS1 messages back to back, then waits once for all PUBACKs
+    (including those of messages published before) and drops the acknowledged batches.
+    Returns True when the outbox was emptied.
+    """
+    topic = f"{DEVICE_NAME}/sensor/backlog".encode("utf-8")
+    sent = []
+    try:
+        start = 0
+        for _ in range(BACKLOG_BURSTS):
+            count = outbox.read(BACKLOG_BATCH, start)
+            if not count:
+                break
+            states = [outbox.state(i) for i in range(count)]
+            for state in states:
+                state["uid"] = BOARD_ID
+            sent.append((MQTT.publish(topic, json.dumps(states).encode("utf-8"), retain=False, qos=1), count))
+            start += count
+        MQTT.wait_for_acks(ACK_TIMEOUT_MS)
+    except Exception as e:
+        print(e)
+
+    delivered = 0
+    for pid, count in sent:
+        if not MQTT.acked(pid):
+            break                   # states stay in order, the rest goes with the next connection
+        delivered += count
+    if delivered:
+        outbox.drop(delivered)
+    return not len(outbox)
+
+
+def connect_mqtt(clean_session=True):
+    """With clean_session=False the broker resumes the session kept from the previous wake."""
     try:
-        MQTT.connect()
+        MQTT.connect(clean_session=clean_session)
         return True
     except Exception as e:
         print(e)
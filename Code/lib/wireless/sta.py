@@ -1,11 +1,81 @@
-from time import sleep_ms, time
+from time import sleep_ms, ticks_ms, ticks_diff
+import json
 import network
 from nonvolatile import Settings
 
 STA = network.WLAN(network.STA_IF)
 
+CACHE_FILE = "wifi.json"    # access point and address of the last successful connection
+FAST_CONNECT_MS = 3_000     # time for the connection from the cache before falling back to a full one
+LEASE_WAKES = 72            # wakes a cached DHCP lease is reused before asking DHCP again, 12 h at 10 min
+LINK_NOIP = 2               # cyw43 link status: associated, no address yet
 
-def wifi_connect():
+Timings = {}                # ms from wifi_connect to the phases of this wake: assoc, ip, publish
+Fast = False                # connecting with the cached access point and address
+_start = 0
+_cache = None
+_lease = False              # a cached DHCP lease is set as a static address
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, "r") as f:
+            cache = json.loads(f.read())
+    except Exception:
+        return None
+    if cache.get("ssid") != Settings["WiFi-SSID"] or cache.get("static") != Settings["WiFi-IP"]:
+        return None
+    return cache
+
+
+def save_cache():
+    cache = {"ssid": Settings["WiFi-SSID"], "static": Settings["WiFi-IP"], "timings": Timings}
+    if Fast and _cache.get("bssid"):
+        cache["bssid"] = _cache["bssid"]
+        cache["channel"] = _cache["channel"]
+    else:
+        _access_point(cache)
+    if not Settings["WiFi-IP"]:
+        wakes = _cache.get("lease_wakes", 0) + 1 if Fast and _lease else 0
+        if wakes < LEASE_WAKES:
+            cache["ifconfig"] = STA.ifconfig()  # DHCP lease reused as a static address
+            cache["lease_wakes"] = wakes        # the RTC starts again at every power on, so wakes, not time
+    with open(CACHE_FILE, "w") as f:
+        f.write(json.dumps(cache))
+
+
+def _access_point(cache):
+    """BSSID and channel of the strongest access point with the SSID, for a connect without the scan."""
+    ssid = Settings["WiFi-SSID"].encode()
+    try:
+        found = [ap for ap in STA.scan() if ap[0] == ssid]
+    except OSError:
+        return
+    if found:
+        ap = max(found, key=lambda ap: ap[3])
+        cache["bssid"] = ap[1].hex()
+        cache["channel"] = ap[2]
+
+
+def clear_cache():
+    try:
+        with open(CACHE_FILE, "w") as f:
+            f.write("{}")
+    except OSError:
+        pass
+
+
+def wifi_connect(fast=True):
+    global _start
+    _start = ticks_ms()
+    Timings.clear()
+    _connect(load_cache() if fast else None)
+
+
+def _connect(cache):
+    global Fast, _lease, _cache
+    Fast = cache is not None
+    _cache = cache
     STA.active(True)
     STA.config(pm=0xa11140)  # Diable powersave mode
     if Settings["WiFi-IP"]:
@@ -17,25 +87,65 @@ def wifi_connect():
                    str((0x0000ff00 & mask) >> 8) + '.' +
                    str((0x000000ff & mask)))
         STA.ifconfig((ip, netmask, '0.0.0.0', '0.0.0.0'))
+    elif Fast and cache.get("ifconfig"):
+        STA.ifconfig(tuple(cache["ifconfig"]))  # no DHCP
+        _lease = True
+    elif _lease:
+        STA.ifconfig("dhcp")
+        _lease = False
+
+    directed = {}                   # no scan for the access point
+    if Fast and cache.get("bssid"):
+        directed["bssid"] = bytes.fromhex(cache["bssid"])
+        directed["channel"] = cache["channel"]
     if Settings["WiFi-passw"]:
-        STA.connect(Settings["WiFi-SSID"], Settings["WiFi-passw"])
+        STA.connect(Settings["WiFi-SSID"], Settings["WiFi-passw"], **directed)
     else:
         STA.config(security=0)
-        STA.connect(Settings["WiFi-SSID"])
+        STA.connect(Settings["WiFi-SSID"], **directed)
 
 
 def wait_for_wifi_connection():
-    start_time = time()
-    try_time_s = 10
-    while STA.status() != network.STAT_GOT_IP:
-        sleep_ms(100)
-        if time() > start_time + try_time_s:
+    global _start
+    try_time_ms = 10_000
+    while True:
+        status = STA.status()
+        elapsed = ticks_diff(ticks_ms(), _start)
+        if status >= LINK_NOIP and "assoc" not in Timings:
+            Timings["assoc"] = elapsed
+        if status == network.STAT_GOT_IP:
+            break
+        if Fast and (status < 0 or elapsed > FAST_CONNECT_MS):
+            STA.disconnect()            # cached access point or lease did not work, full connect, whole try_time_ms
+            clear_cache()
+            Timings.clear()
+            _start = ticks_ms()
+            _connect(None)
+            continue
+        if elapsed > try_time_ms:
             STA.disconnect()
             return False
-    else:
-        sleep_ms(200)
-        rssi = STA.status("rssi")
-        return rssi
+        sleep_ms(10)
+
+    Timings["ip"] = ticks_diff(ticks_ms(), _start)
+    if "assoc" not in Timings:
+        Timings["assoc"] = Timings["ip"]
+    rssi = STA.status("rssi")
+    return rssi
+
+
+def published():
+    """Marks the first acknowledged publish and keeps the connection for the next wake."""
+    Timings["publish"] = ticks_diff(ticks_ms(), _start)
+    save_cache()
+    print("WiFi timings ms:", Timings, "fast" if Fast else "full")
+
+
+def publish_failed():
+    """The broker was not reachable, maybe with a lease that is no longer valid: connect fully next time."""
+    if Fast:
+        clear_cache()
+
 
 # def wait_for_wifi_connection():
 #     max_s_wait = 5
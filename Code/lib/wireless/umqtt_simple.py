@@ -7,12 +7,19 @@ class MQTTException(Exception):
     pass
 
 
+PKT_SIZE = 256
+
+
 def pid_gen(pid=0):
     while True:
         pid = pid + 1 if pid < 65535 else 1
         yield pid
 
 
+def _to_bytes(s):
+    return s.encode() if isinstance(s, str) else s
+
+
 class MQTTClient:
 
     def __init__(self, client_id, server, port=0, user=None, password=None, keepalive=0,
@@ -70,6 +77,7 @@ class MQTTClient:
         self.lw_qos = 0
         self.lw_retain = False
         self.rcv_pids = {}  # PUBACK and SUBACK pids awaiting ACK response
+        self.lost_pids = set()  # pids whose ACK did not come within message_timeout
 
         self.last_ping = ticks_ms()  # Time of the last PING sent
         self.last_cpacket = ticks_ms()  # Time of last Control Packet
@@ -77,6 +85,8 @@ class MQTTClient:
         self.socket_timeout = socket_timeout
         self.message_timeout = message_timeout
 
+        self.pkt = bytearray(PKT_SIZE)  # every CONNECT and PUBLISH packet is assembled here and written at once
+
     def _read(self, n):
         """
         Private class method.
@@ -147,6 +157,30 @@ class MQTTClient:
         self._write(len(s).to_bytes(2, 'big'))
         self._write(s)
 
+    def _pkt_reserve(self, size):
+        """
+        Private class method.
+        Returns the packet buffer, enlarged if it has less than size bytes.
+        """
+        if len(self.pkt) < size:
+            self.pkt = bytearray(size)
+        return self.pkt
+
+    def _pkt_str(self, offset, s):
+        """
+        Private class method.
+        Puts a length prefixed string into the packet buffer.
+        :return: Offset after the string
+        :rtype int
+        """
+        n = len(s)
+        assert n < 65536
+        pkt = self.pkt
+        pkt[offset] = n >> 8
+        pkt[offset + 1] = n & 0xFF
+        pkt[offset + 2:offset + 2 + n] = s
+        return offset + 2 + n
+
     def _recv_len(self):
         """
         Private class method.
@@ -295,41 +329,47 @@ class MQTTClient:
         # 11,12 - keepalive
         # 13,14 - client ID length
         # 15-15+len(client_id) - byte(client_id)
-        premsg = bytearray(b"\x10\0\0\0\0\0")
-        msg = bytearray(b"\0\x04MQTT\x04\0\0\0")
-
-        sz = 10 + 2 + len(self.client_id)
-
-        msg[7] = bool(clean_session) << 1
+        client_id = _to_bytes(self.client_id)
+        user = _to_bytes(self.user)
+        pswd = _to_bytes(self.pswd)
+        lw_topic = _to_bytes(self.lw_topic)
+        lw_msg = _to_bytes(self.lw_msg)
+
+        sz = 10 + 2 + len(client_id)
+        flags = bool(clean_session) << 1
         # Clean session = True, remove current session
         if bool(clean_session):
             self.rcv_pids.clear()
-        if self.user is not None:
-            sz += 2 + len(self.user)
-            msg[7] |= 1 << 7  # User Name Flag
-            if self.pswd is not None:
-                sz += 2 + len(self.pswd)
-                msg[7] |= 1 << 6  # # Password Flag
+            self.lost_pids.clear()
+        if user is not None:
+            sz += 2 + len(user)
+            flags |= 1 << 7  # User Name Flag
+            if pswd is not None:
+                sz += 2 + len(pswd)
+                flags |= 1 << 6  # # Password Flag
         if self.keepalive:
             assert self.keepalive < 65536
-            msg[8] |= self.keepalive >> 8
-            msg[9] |= self.keepalive & 0x00FF
-        if self.lw_topic:
-            sz += 2 + len(self.lw_topic) + 2 + len(self.lw_msg)
-            msg[7] |= 0x4 | (self.lw_qos & 0x1) << 3 | (self.lw_qos & 0x2) << 3
-            msg[7] |= self.lw_retain << 5
-
-        plen = self._varlen_encode(sz, premsg, 1)
-        self._write(premsg, plen)
-        self._write(msg)
-        self._send_str(self.client_id)
-        if self.lw_topic:
-            self._send_str(self.lw_topic)
-            self._send_str(self.lw_msg)
-        if self.user is not None:
-            self._send_str(self.user)
-            if self.pswd is not None:
-                self._send_str(self.pswd)
+        if lw_topic:
+            sz += 2 + len(lw_topic) + 2 + len(lw_msg)
+            flags |= 0x4 | (self.lw_qos & 0x1) << 3 | (self.lw_qos & 0x2) << 3
+            flags |= self.lw_retain << 5
+
+        pkt = self._pkt_reserve(5 + sz)
+        pkt[0] = 0x10
+        o = self._varlen_encode(sz, pkt, 1)
+        pkt[o:o + 7] = b"\0\x04MQTT\x04"
+        pkt[o + 7] = flags
+        pkt[o + 8] = self.keepalive >> 8
+        pkt[o + 9] = self.keepalive & 0x00FF
+        o = self._pkt_str(o + 10, client_id)
+        if lw_topic:
+            o = self._pkt_str(o, lw_topic)
+            o = self._pkt_str(o, lw_msg)
+        if user is not None:
+            o = self._pkt_str(o, user)
+            if pswd is not None:
+                o = self._pkt_str(o, pswd)
+        self._write(pkt, o)
         resp = self._read(4)
         if not (resp[0] == 0x20 and resp[1] == 0x02):  # control packet type, Remaining Length == 2
             raise MQTTException(29)
@@ -389,20 +429,25 @@ class MQTTClient:
         :return: None
         """
         assert qos in (0, 1)
-        pkt = bytearray(b"\x30\0\0\0\0")
-        pkt[0] |= qos << 1 | retain | int(dup) << 3
+        topic = _to_bytes(topic)
+        msg = _to_bytes(msg)
         sz = 2 + len(topic) + len(msg)
         if qos > 0:
             sz += 2
-        plen = self._varlen_encode(sz, pkt, 1)
-        self._write(pkt, plen)
-        self._send_str(topic)
+        pkt = self._pkt_reserve(5 + sz)
+        pkt[0] = 0x30 | qos << 1 | retain | int(dup) << 3
+        o = self._varlen_encode(sz, pkt, 1)
+        o = self._pkt_str(o, topic)
         if qos > 0:
             pid = next(self.newpid)
-            self._write(pid.to_bytes(2, 'big'))
-        self._write(msg)
+            pkt[o] = pid >> 8
+            pkt[o + 1] = pid & 0xFF
+            o += 2
+        pkt[o:o + len(msg)] = msg
+        self._write(pkt, o + len(msg))
         if qos > 0:
             self.rcv_pids[pid] = ticks_add(ticks_ms(), self.message_timeout * 1000)
+            self.lost_pids.discard(pid)
             return pid
 
     def subscribe(self, topic, qos=0):
@@ -427,15 +472,30 @@ class MQTTClient:
         self._send_str(topic)
         self._write(qos.to_bytes(1, "little"))  # maximum QOS value that can be given by the server to the client
         self.rcv_pids[pid] = ticks_add(ticks_ms(), self.message_timeout * 1000)
+        self.lost_pids.discard(pid)
         return pid
 
     def _message_timeout(self):
         curr_tick = ticks_ms()
-        for pid, timeout in self.rcv_pids.items():
+        for pid, timeout in list(self.rcv_pids.items()):
             if ticks_diff(timeout, curr_tick) <= 0:
                 self.rcv_pids.pop(pid)
+                self.lost_pids.add(pid)
                 self.cbstat(pid, 0)
 
+    def acked(self, pid):
+        """
+        Whether the server acknowledged the QoS=1 message or subscription with this PID.
+
+        A PID is neither awaited in rcv_pids nor acknowledged once its message_timeout
+        passed: it is kept in lost_pids until reused or until a clean session.
+
+        :param pid: PID returned by publish() or subscribe().
+        :return: True if its PUBACK or SUBACK came.
+        :rtype: bool
+        """
+        return bool(pid) and pid not in self.rcv_pids and pid not in self.lost_pids
+
     def check_msg(self):
         """
         Checks whether a pending message from server is available.
@@ -540,6 +600,36 @@ class MQTTClient:
         elif op & 6 == 6:  # 3.3.1.2 QoS - Reserved – must not be used
             raise MQTTException(-1)
 
+    def wait_for_acks(self, timeout_ms):
+        """
+        Processes packets from the server until every QoS=1 message and subscription sent so far
+        is acknowledged, or until timeout_ms passes. Never blocks longer, whatever the socket_timeout.
+
+        Messages can be published back to back and their PUBACKs collected by one call,
+        so the time spent waiting does not grow with the number of round trips.
+
+        :param timeout_ms: The longest time to wait, in milliseconds.
+        :type timeout_ms: int
+        :return: True if nothing is left unacknowledged. The PIDs still waiting stay in rcv_pids,
+            those that timed out are in lost_pids, see acked().
+        :rtype: bool
+        """
+        if not self.sock:
+            return not self.rcv_pids
+        lost = len(self.lost_pids)
+        deadline = ticks_add(ticks_ms(), timeout_ms)
+        st_old = self.socket_timeout
+        try:
+            while self.rcv_pids:
+                remaining = ticks_diff(deadline, ticks_ms())
+                if remaining <= 0 or not self.poller_r.poll(remaining):
+                    break
+                self.socket_timeout = remaining / 1000     # a packet split on the way must not block longer
+                self.check_msg()
+        finally:
+            self.socket_timeout = st_old
+        return not self.rcv_pids and len(self.lost_pids) == lost
+
     def wait_msg(self):
         """
         This method waits for a message from the server.
@@ -1,6 +1,17 @@
-from measurement import batt_voltage, voltage_to_soc
+from nonvolatile import Settings, settings_save, settings_load
+settings_load()
+profile_imports = Settings["Profile"] == "2"
+if profile_imports:                                         # time and RAM of every module imported at boot
+    import import_profiler
+    import_profiler.install()
+
+from profiler import Profiler
+profiler = Profiler()                                       # records only when enabled in the settings
+profiler.start("battery")
+from measurement import batt_voltage, filtered_voltage, voltage_to_soc
 
 battery_voltage = batt_voltage()
+profiler.stop("battery")
 if battery_voltage < 2.6:                                   # turn off immediatelly to prevent draining battery
     from machine import Pin
     Pin(9, Pin.OUT).value(1)
@@ -25,7 +36,7 @@ if battery_voltage < 2.7:                                 # show battery dead sc
     screens.eink.epd_hw_init()
 
 
-from gpio_definitions import BTN_1, BTN_2, BTN_3, GREEN_LED, DONE_PIN, RED_LED
+from gpio_definitions import BTN_1, BTN_2, BTN_3, GREEN_LED, DONE_PIN, RED_LED, VBUS_SENSE
 from time import sleep_ms
 if not BTN_1.value() and not BTN_2.value():
     count_down = 5
@@ -77,29 +88,26 @@ if not BTN_1.value() and not BTN_2.value():
                         reset()
 
 
-# Start Wireless ASAP
-from nonvolatile import Settings, settings_save, settings_load
-settings_load()
-wifi_active = Settings["WiFi-SSID"]
-if wifi_active:
-    from lib.wireless.sta import STA, wait_for_wifi_connection, wifi_connect
-    wifi_connect()
+profiler.enabled = Settings["Profile"] != "0"
+wifi_active = Settings["WiFi-SSID"]                         # started after the sensor read, only when reporting
 ble_active = Settings["BLE-name"]
 if ble_active:
-    from lib.wireless.ble_advert import ble_advert, ble
+    from lib.wireless.ble_advert import ble_advert, ble_stop     # BLE is activated by the first advert
 
 
-from lib.display import screens
-from sensor import sensor
+from lib.display import screens                             # the panel wakes with its first refresh
 
 if __name__ == '__main__':
     device_run = True
     full_refresh = False
 
+    battery_voltage = filtered_voltage(battery_voltage)     # the raw reading only guards the cutoffs above
     bat_soc = voltage_to_soc(battery_voltage)
 
     if not BTN_1.value():
         from modes.mode_setup import start_setup
+        if profile_imports:
+            import_profiler.finish()
         start_setup("PICOINK", battery_voltage)
 
     elif not BTN_2.value():
@@ -123,64 +131,123 @@ if __name__ == '__main__':
         Settings["widget"] += 1
         if Settings["widget"] > 2:
             Settings["widget"] = 0
+            Settings["channel"] += 1                        # next measured quantity, wrapped by mode_regular
         settings_save()
         sleep_ms(1000)
         full_refresh = True
 
     if device_run:
-        from modes.mode_regular import load_show_save
+        from modes.mode_regular import read_sensor, show_save
+        from scheduler import Scheduler, ADAPT_CHANGE
+        from energy import Energy
+        from sensor import sensor
+        if profile_imports:
+            import_profiler.finish()
+        scheduler = Scheduler(DONE_PIN, VBUS_SENSE, int(Settings["Interval-s"]))
+        energy = Energy()
+        if wifi_active:
+            from report import Reporter
+            from outbox import Outbox
+            reporter = Reporter(sensor.units_classes)
+            outbox = Outbox("outbox.dat", list(sensor.units_classes) + ["soc"])
         while True:
             DONE_PIN.value(0)
             rssi = False
             mqtt_ok = False
-            sensor_ok = load_show_save(full_refresh, bat_soc, sensor)
+            profiler.start("sensor")
+            sensor_ok = read_sensor(sensor)
+            profiler.stop("sensor")
+            if sensor_ok:
+                scheduler.adapt(next(iter(sensor.last_values.values())),
+                                (sensor.displ_max - sensor.displ_min) * ADAPT_CHANGE)
             sensor.last_values["soc"] = bat_soc
-            if wifi_active:
-                if sensor_ok:
-                    rssi = wait_for_wifi_connection()
-                else:
-                    STA.disconnect()
-                    rssi = None
+
+            transmit = wifi_active and sensor_ok and reporter.should_report(sensor.last_values)
+            if transmit:
+                from lib.wireless.sta import STA, wait_for_wifi_connection, wifi_connect, published, publish_failed
+                profiler.start("wifi")
+                wifi_connect()                              # associates while the display refreshes
+                profiler.stop("wifi")
+            if sensor_ok is not None:
+                profiler.start("display")
+                show_save(full_refresh, bat_soc, sensor)
+                profiler.stop("display")
+
+            if transmit:
+                delivered = False
+                profiler.start("wifi")
+                rssi = wait_for_wifi_connection()
+                profiler.stop("wifi")
                 if rssi:
                     screens.widgets.signal_indicator(rssi)
                     screens.eink.show(screens.widgets.img, partial=True)
-                    from lib.wireless.ha import send_state, connect_mqtt, MQTT
-                    if connect_mqtt():
+                    from lib.wireless.ha import send_state, send_backlog, connect_mqtt, MQTT, ACK_TIMEOUT_MS
+                    from lib.wireless.ha import update_discovery, sensor_entities
+                    profiler.start("mqtt")
+                    mqtt_connected = connect_mqtt()
+                    profiler.stop("mqtt")
+                    if mqtt_connected:
+                        profiler.start("publish")
+                        update_discovery(sensor_entities(sensor.units_classes))    # only new or changed entities
                         sensor.last_values["signal"] = rssi
-                        if not send_state(**sensor.last_values):
+                        sensor.last_values["wake_mah"] = round(energy.mah, 4)     # of the last wake
+                        days_left = energy.days_left(battery_voltage, bat_soc, int(Settings["Batt-mAh"]),
+                                                     scheduler.wake_period_s())
+                        if days_left is not None:
+                            sensor.last_values["days_left"] = round(days_left, 1)
+                        if profiler.enabled:
+                            sensor.last_values["profile"] = profiler.last()     # ms per phase of the last wake
+                        pid = send_state(**sensor.last_values)
+                        if pid and len(outbox):
+                            send_backlog(outbox)            # pipelined behind the state, waits for all PUBACKs
+                        else:
+                            MQTT.wait_for_acks(ACK_TIMEOUT_MS)
+                        delivered = MQTT.acked(pid)
+                        profiler.stop("publish")
+                        if delivered:
+                            published()                     # first publish timing, connection cached
+                            reporter.reported(sensor.last_values)
+                        else:
                             screens.widgets.mqtt_indicator()
                             screens.eink.show(screens.widgets.img, partial=True)
-                        MQTT.wait_msg()
                         MQTT.disconnect()
                         sleep_ms(200)
                         mqtt_ok = True
                     else:
                         screens.widgets.mqtt_indicator()
                         screens.eink.show(screens.widgets.img, partial=True)
+                    if not delivered:
+                        publish_failed()
                 STA.disconnect()
+                if not delivered:
+                    outbox.put(sensor.last_values)              # sent with the next successful publish
+            elif wifi_active and sensor_ok:
+                reporter.skipped()
 
             if ble_active and sensor_ok:
                 ble_advert(sensor.get_ble_characteristics())
                 sleep_ms(500)
-                ble.gap_advertise(None)
+                ble_stop()
 
-            if wifi_active:
+            if transmit:
                 sleep_ms(1000)
 
-            if sensor_ok and bat_soc > 10 and ((rssi and mqtt_ok) or not wifi_active):
+            if sensor_ok and bat_soc > 10 and ((rssi and mqtt_ok) or not transmit):
                 GREEN_LED.value(1)
             else:
                 RED_LED.value(1)
 
+            profiler.start("eink_sleep")
             screens.eink.deep_sleep()
+            profiler.stop("eink_sleep")
             sleep_ms(100)
             GREEN_LED.value(0)
             RED_LED.value(0)
-            DONE_PIN.value(1)
-            sleep_ms(10_000)
-
+            profiler.save()                                 # sets the total of the wake
+            energy.update(profiler.durations, battery_voltage)
             if wifi_active:
-                wifi_connect()
-                # wifi_active = wifi_connect()
+                outbox.tick(scheduler.wake_period_s())     # the board time starts again at every power-on
+            scheduler.sleep()                               # power off, lightsleep or deepsleep
+            profiler.wake()
 
             full_refresh = False
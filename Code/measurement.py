@@ -1,29 +1,62 @@
-from gpio_definitions import BATT_ADC, TEMPER_ADC
+import struct
+from gpio_definitions import BATT_ADC, BATT_ADC_CHANNEL, TEMPER_ADC, TEMPER_ADC_CHANNEL
+from sampling import oversample, TRIMMED_MEAN
 
+NUM_OF_SAMPLES = 32
+VOLTAGE_FILE = "battery.dat"
+VOLTAGE_ALPHA = 0.3         # weight of a new reading in the filtered battery voltage
+VOLTAGE_STEP = 0.3          # a bigger change is a battery swap or charge, the filter starts over
 
-def measure_analog(pin):
-    num_of_measurements = 1000
-    n = 0
-    measured = 0
-    while n < num_of_measurements:
-        measured += pin.read_u16()
-        n += 1
-    voltage = (measured / num_of_measurements) * (3.3 / 65535)
+# LiPo open circuit voltage, V: state of charge, %
+SOC_CURVE = (
+    (3.27, 0), (3.61, 5), (3.69, 10), (3.71, 15), (3.73, 20), (3.75, 25), (3.77, 30),
+    (3.79, 35), (3.80, 40), (3.82, 45), (3.84, 50), (3.85, 55), (3.87, 60), (3.91, 65),
+    (3.95, 70), (3.98, 75), (4.02, 80), (4.08, 85), (4.11, 90), (4.15, 95), (4.20, 100),
+)
+
+
+def measure_analog(pin, channel=None):
+    """Mean of the middle half of NUM_OF_SAMPLES sorted readings, spikes and sags fall outside."""
+    measured, n = oversample(pin, NUM_OF_SAMPLES, TRIMMED_MEAN, channel)
+    voltage = measured * (3.3 / 65535)
     return voltage
 
 
 def batt_voltage():
-    return round(measure_analog(BATT_ADC)*2 + 0.465, 2)
+    return round(measure_analog(BATT_ADC, BATT_ADC_CHANNEL)*2 + 0.465, 2)
+
+
+def filtered_voltage(voltage):
+    """Exponentially filtered battery voltage, kept over wakes."""
+    try:
+        with open(VOLTAGE_FILE, "rb") as f:
+            last = struct.unpack("<f", f.read(4))[0]
+    except (OSError, ValueError):
+        last = None
+    if last is None or not 2.0 < last < 5.0 or abs(voltage - last) > VOLTAGE_STEP:
+        last = voltage
+    filtered = last + VOLTAGE_ALPHA * (voltage - last)
+    try:
+        with open(VOLTAGE_FILE, "wb") as f:
+            f.write(struct.pack("<f", filtered))
+    except OSError:
+        pass
+    return round(filtered, 3)
+
+
 def voltage_to_soc(voltage):
-    max_batt_volt = 4.20
-    min_batt_volt = 2.80
-    soc = int(((voltage - min_batt_volt) / (max_batt_volt - min_batt_volt)) * 100)
-    soc = max(0, min(soc, 100))
-    return soc
+    if voltage <= SOC_CURVE[0][0]:
+        return 0
+    for i in range(1, len(SOC_CURVE)):
+        v_high, soc_high = SOC_CURVE[i]
+        if voltage < v_high:
+            v_low, soc_low = SOC_CURVE[i - 1]
+            return int(soc_low + (voltage - v_low) / (v_high - v_low) * (soc_high - soc_low))
+    return 100
 
 
 def onboard_temperature():
-    temper_onboard_voltage = measure_analog(TEMPER_ADC)
+    temper_onboard_voltage = measure_analog(TEMPER_ADC, TEMPER_ADC_CHANNEL)
     temperature = (27 - (temper_onboard_voltage - 0.706) / 0.001721)
     temperature = round(temperature, 1)
     return temperature
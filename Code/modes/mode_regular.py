@@ -1,35 +1,50 @@
 import lib.display.screens as screens
-from nonvolatile import Settings, save_value, get_last_values, num_to_byte, byte_to_num
+from nonvolatile import Settings
+from history import History, sensor_channels, to_rows
+from lib.display.widgets import CHART_ROWS
 
+# display range of channels other than the sensor's own, by device class
+DISPLAY_RANGES = {
+    "temperature": (0, 40),
+    "humidity": (0, 100),
+    "moisture": (0, 100),
+    "carbon_dioxide": (400, 2000),
+}
 
-def load_show_save(full_refresh, bat_soc, sensor):
-    minimum = sensor.displ_min
-    maximum = sensor.displ_max
+
+def read_sensor(sensor):
+    """True for a valid reading, False for an invalid one and None when the sensor failed."""
     try:
-        sensor_ok = sensor.get_values()
+        return sensor.get_values()
     except Exception as e:
         print(e)
-        sensor_ok = False
-        return sensor_ok
+        return None
 
-    value = list(sensor.last_values.items())[0][1]
 
-    filesize, byte_values = get_last_values(249, "temperatures.dat")
+def show_save(full_refresh, bat_soc, sensor):
+    channels = sensor_channels(sensor)
+    history = History("history.dat", channels)
+    history.import_legacy("temperatures.dat", 249, sensor.displ_min, sensor.displ_max)
 
-    values = [byte_to_num(val, minimum, maximum) for val in byte_values]
-    values.append(value)
+    channel = Settings["channel"] % len(channels)
+    name = channels[channel][0]
+    if channel == 0:
+        minimum, maximum = sensor.displ_min, sensor.displ_max
+    else:
+        minimum, maximum = DISPLAY_RANGES.get(sensor.units_classes[name][1], channels[channel][1:])
+    value = sensor.last_values[name]
 
-    if full_refresh or filesize % 100 == 0:
+    if full_refresh or history.seq % 100 == 0:
         full_refresh = True
 
     if Settings["widget"] == 0:
-        screens.show_chart(values, minimum, maximum, bat_soc, full_refresh)
+        rows = screens.widgets.chart_rows
+        count = history.last_rows(len(rows) - 1, name, minimum, maximum, CHART_ROWS, rows)
+        to_rows((value,), memoryview(rows)[count:], 1, 0, minimum, maximum, CHART_ROWS)
+        screens.show_chart(rows, count + 1, value, minimum, maximum, bat_soc, full_refresh)
     elif Settings["widget"] == 1:
         screens.show_big_val(value, bat_soc, full_refresh)
     elif Settings["widget"] == 2:
         screens.show_gauge(value, minimum, maximum, bat_soc, full_refresh)
 
-    one_byte_value = num_to_byte(value, minimum, maximum)
-    save_value(one_byte_value, "temperatures.dat")
-
-    return sensor_ok
+    history.append(sensor.last_values)
@@ -1,8 +1,17 @@
 from lib.wireless.ap import start_ap, start_web
 from lib.display import screens
+from energy import Energy
+from measurement import voltage_to_soc
+from nonvolatile import Settings
+from scheduler import Scheduler
+from gpio_definitions import DONE_PIN, VBUS_SENSE
 
 
 def start_setup(ap_ssid, batt_voltage):
     ip = start_ap(ap_ssid)
-    screens.show_overview(batt_voltage, ip, ap_ssid)
+    energy = Energy()
+    scheduler = Scheduler(DONE_PIN, VBUS_SENSE, int(Settings["Interval-s"]))   # same wake period as main.py
+    days_left = energy.days_left(batt_voltage, voltage_to_soc(batt_voltage),
+                                 int(Settings["Batt-mAh"]), scheduler.wake_period_s())
+    screens.show_overview(batt_voltage, ip, ap_ssid, energy.mah, days_left)
     start_web()
@@ -1,6 +1,6 @@
 from utime import sleep_ms, time
 from lib.display.screens import text_row
-from lib.wireless.ha import MQTT, send_discovery
+from lib.wireless.ha import MQTT, send_discovery, sensor_entities
 from lib.wireless.sta import STA, wifi_connect
 from lib.wireless.ble_advert import ble_advert
 from sensor import sensor
@@ -80,7 +80,7 @@ def check_settings():
 
 
 def check_wifi():
-    wifi_connect()
+    wifi_connect(fast=False)
     text_row(f"Connecting to {Settings['WiFi-SSID']}", 3)
     start_time = time()
     try_time_s = 10
@@ -116,11 +116,8 @@ def check_mqtt():
 
 def try_ha_discovery():
     try:
-        for name, (unit, devclass) in sensor.units_classes.items():
+        for name, unit, devclass in sensor_entities(sensor.units_classes):
             send_discovery(name=name, unit=unit, device_class=devclass)
-
-        send_discovery(name="soc", unit="%", device_class="battery")
-        send_discovery(name="signal", unit="dBm", device_class="signal_strength")
         text_row("MQTT HA discovery published", 8)
     except Exception as e:
         if str(e).isdigit():
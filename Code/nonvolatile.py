@@ -15,38 +15,6 @@ def byte_to_num(byte, minimum, maximum):
     return num
 
 
-def get_last_values(num_of_vals, filename, max_filesize=1024 * 100):
-    try:
-        with open(filename, "rb") as f:
-            f.seek(0, SEEK_END)
-            filesize = f.tell()
-            if filesize < num_of_vals:
-                f.seek(-filesize, SEEK_END)
-                values_binary = f.read(filesize)
-            else:
-                f.seek(-num_of_vals, SEEK_END)
-                values_binary = f.read(num_of_vals)
-            values = [vb for vb in values_binary]
-    except OSError:
-        return 0, []
-
-    if filesize > max_filesize:
-        with open(filename, "wb") as f:
-            f.write(values_binary)
-    return filesize, values
-
-
-def save_value(value, filename):
-    val_unsigned = value
-    val_binary = val_unsigned.to_bytes(1, "big")
-    try:
-        with open(filename, "ab") as f:
-            f.write(val_binary)
-    except OSError:
-        with open(filename, "wb") as f:
-            f.write(val_binary)
-
-
 Settings = OrderedDict()
 Settings["WiFi-SSID"] = ""
 Settings["WiFi-passw"] = ""
@@ -56,7 +24,11 @@ Settings["MQTT-user"] = ""
 Settings["MQTT-passw"] = ""
 Settings["MQTT-name"] = ""
 Settings["BLE-name"] = ""
+Settings["Interval-s"] = "600"
+Settings["Profile"] = "0"
+Settings["Batt-mAh"] = "1000"
 Settings["widget"] = 0
+Settings["channel"] = 0
 
 
 def settings_load():
@@ -0,0 +1,144 @@
+import struct
+
+MAGIC = b"PO"
+HEADER = "<2sBHHHII"        # magic, channels, capacity, index of the oldest record, count, records ever put, clock
+HEADER_SIZE = struct.calcsize(HEADER)
+NAME = "<12s"
+NAME_SIZE = struct.calcsize(NAME)
+NAN = float("nan")
+
+
+class Outbox:
+    """
+    States that could not be published, kept on flash until the next connection.
+
+    Records hold a sequence number, the outbox clock and one float per channel
+    (NaN for a missing value), in a ring of 'capacity' fixed-size records; when
+    it is full the oldest state is overwritten. Reading takes the oldest records
+    into one preallocated buffer, they are dropped only after they were delivered.
+
+    The time of the board starts again at every power-on by the TPL5110, so the
+    outbox keeps its own clock in the file: the seconds of the wake periods
+    passed while it held states, see tick(). A state is sent with its age, the
+    seconds since it was put, which the receiver subtracts from its own time.
+    """
+
+    def __init__(self, filename, names, capacity=96, max_read=8):
+        self.filename = filename
+        self.names = list(names)
+        self.capacity = capacity
+        self.record = "<II" + "f" * len(self.names)     # sequence number, time, values
+        self.record_size = struct.calcsize(self.record)
+        self.data_offset = HEADER_SIZE + len(self.names) * NAME_SIZE
+        self.head = 0
+        self.count = 0
+        self.seq = 0
+        self.clock = 0
+        self.header = bytearray(HEADER_SIZE)
+        self.slot = bytearray(self.record_size)
+        self.max_read = max_read
+        self.buffer = bytearray(max_read * self.record_size)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.filename, "rb") as f:
+                if f.readinto(self.header) != HEADER_SIZE:
+                    return False
+                magic, channels, capacity, head, count, seq, clock = struct.unpack(HEADER, self.header)
+                if magic != MAGIC or channels != len(self.names) or capacity != self.capacity:
+                    return False
+                names = [struct.unpack(NAME, f.read(NAME_SIZE))[0].rstrip(b"\0").decode()
+                         for _ in range(channels)]
+        except OSError:
+            return False
+        if sorted(names) != sorted(self.names):
+            return False
+        self.names = names
+        self.head = head
+        self.count = count
+        self.seq = seq
+        self.clock = clock
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def put(self, values):
+        """Stores one state of this wake, 'values' maps channel names to values."""
+        if not self.seq and not self.count:
+            self._create()
+        index = (self.head + self.count) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.head = (self.head + 1) % self.capacity     # full, the oldest state is lost
+
+        struct.pack_into("<II", self.slot, 0, self.seq, self.clock)
+        for i, name in enumerate(self.names):
+            value = values.get(name)
+            struct.pack_into("<f", self.slot, 8 + 4 * i, NAN if value is None else value)
+        self.seq += 1
+        with open(self.filename, "r+b") as f:
+            f.seek(self.data_offset + index * self.record_size)
+            f.write(self.slot)
+            f.seek(0)
+            f.write(self._pack_header())
+
+    def tick(self, seconds):
+        """
+        Advances the clock by the wake period at the end of a wake. Written only
+        while states wait: the ages are counted from the first of them.
+        """
+        if not self.count:
+            return
+        self.clock += seconds
+        with open(self.filename, "r+b") as f:
+            f.write(self._pack_header())
+
+    def read(self, num_of_records, skip=0):
+        """
+        Reads up to 'num_of_records' oldest records, after the 'skip' oldest ones,
+        into the buffer, returns how many.
+        """
+        n = min(num_of_records, self.count - skip, self.max_read)
+        if n <= 0:
+            return 0
+        start = (self.head + skip) % self.capacity
+        first = min(n, self.capacity - start)
+        size = self.record_size
+        with open(self.filename, "rb") as f:
+            f.seek(self.data_offset + start * size)
+            f.readinto(memoryview(self.buffer)[:first * size])
+            if first < n:
+                f.seek(self.data_offset)
+                f.readinto(memoryview(self.buffer)[first * size:n * size])
+        return n
+
+    def state(self, i):
+        """Record 'i' of the buffer as a dict of the values, 'seq' and 'age' in seconds."""
+        fields = struct.unpack_from(self.record, self.buffer, i * self.record_size)
+        state = {"seq": fields[0], "age": self.clock - fields[1]}
+        for name, value in zip(self.names, fields[2:]):
+            if value == value:                              # NaN is a missing value
+                state[name] = round(value, 2)
+        return state
+
+    def drop(self, num_of_records):
+        """Removes the oldest records after they were delivered."""
+        n = min(num_of_records, self.count)
+        self.head = (self.head + n) % self.capacity
+        self.count -= n
+        with open(self.filename, "r+b") as f:
+            f.write(self._pack_header())
+
+    def _create(self):
+        with open(self.filename, "wb") as f:
+            f.write(self._pack_header())
+            for name in self.names:
+                f.write(struct.pack(NAME, name.encode()))
+
+    def _pack_header(self):
+        struct.pack_into(HEADER, self.header, 0, MAGIC, len(self.names), self.capacity,
+                         self.head, self.count, self.seq, self.clock)
+        return self.header
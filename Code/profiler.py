@@ -0,0 +1,117 @@
+import struct
+from array import array
+from time import ticks_us, ticks_diff
+
+MAGIC = b"PP"
+HEADER = "<2sBHHHI"         # magic, phases, capacity, index of the record written next, count, wakes ever recorded
+HEADER_SIZE = struct.calcsize(HEADER)
+
+# phases of a wake, in order; a record holds the microseconds spent in each
+PHASES = ("battery", "sensor", "display", "wifi", "mqtt", "publish", "eink_sleep", "total")
+
+
+class Profiler:
+    """
+    Wake cycle timing: microseconds spent in every phase, one record per wake.
+
+    start() and stop() only store ticks into a preallocated array, so measuring
+    costs a few microseconds per phase. When enabled, save() appends the record
+    of the wake to a ring of 'capacity' records in one file, written in place;
+    disabled, nothing is written at all.
+    """
+
+    def __init__(self, filename="profile.dat", capacity=64, enabled=False):
+        self.filename = filename
+        self.capacity = capacity
+        self.enabled = enabled
+        self.index = {name: i for i, name in enumerate(PHASES)}
+        self.started = array("i", bytes(4 * len(PHASES)))
+        self.durations = array("I", bytes(4 * len(PHASES)))
+        self.record = "<I" + "I" * len(PHASES)      # wake number, durations
+        self.record_size = struct.calcsize(self.record)
+        self.slot = bytearray(self.record_size)
+        self.header = bytearray(HEADER_SIZE)
+        self.wake_start = ticks_us()
+
+    def start(self, phase):
+        self.started[self.index[phase]] = ticks_us()
+
+    def stop(self, phase):
+        i = self.index[phase]
+        self.durations[i] += ticks_diff(ticks_us(), self.started[i])
+
+    def _load_header(self, f):
+        if f.readinto(self.header) != HEADER_SIZE:
+            return None
+        magic, phases, capacity, head, count, seq = struct.unpack(HEADER, self.header)
+        if magic != MAGIC or phases != len(PHASES) or capacity != self.capacity:
+            return None
+        return head, count, seq
+
+    def wake(self):
+        """Starts the record of a wake that follows a sleep."""
+        for i in range(len(PHASES)):
+            self.durations[i] = 0
+        self.wake_start = ticks_us()
+
+    def save(self):
+        """Ends the record of this wake and stores it when enabled; durations keep it until wake()."""
+        self.durations[self.index["total"]] = ticks_diff(ticks_us(), self.wake_start)
+        if self.enabled:
+            try:
+                f = open(self.filename, "r+b")
+                state = self._load_header(f)
+            except OSError:
+                f = open(self.filename, "wb")
+                state = None
+            with f:
+                head, count, seq = state if state else (0, 0, 0)
+                struct.pack_into("<I", self.slot, 0, seq)
+                for i in range(len(PHASES)):
+                    struct.pack_into("<I", self.slot, 4 + 4 * i, self.durations[i])
+                f.seek(HEADER_SIZE + head * self.record_size)
+                f.write(self.slot)
+                struct.pack_into(HEADER, self.header, 0, MAGIC, len(PHASES), self.capacity,
+                                 (head + 1) % self.capacity, min(count + 1, self.capacity), seq + 1)
+                f.seek(0)
+                f.write(self.header)
+
+    def records(self, num_of_records=None):
+        """Last stored records, oldest first, as (wake number, durations) tuples."""
+        try:
+            with open(self.filename, "rb") as f:
+                state = self._load_header(f)
+                if not state:
+                    return
+                head, count, seq = state
+                if num_of_records is not None:
+                    count = min(count, num_of_records)
+                for k in range(count):
+                    f.seek(HEADER_SIZE + ((head - count + k) % self.capacity) * self.record_size)
+                    f.readinto(self.slot)
+                    fields = struct.unpack(self.record, self.slot)
+                    yield fields[0], fields[1:]
+        except OSError:
+            return
+
+    def last(self):
+        """Milliseconds of every phase of the last stored wake, {} if there is none."""
+        last = {}
+        for seq, durations in self.records(1):
+            last = {name: durations[i] // 1000 for i, name in enumerate(PHASES)}
+        return last
+
+    def stats(self):
+        """Number of stored wakes and mean and maximum milliseconds of every phase over them."""
+        count = 0
+        sums = [0] * len(PHASES)
+        maxima = [0] * len(PHASES)
+        for seq, durations in self.records():
+            count += 1
+            for i in range(len(PHASES)):
+                sums[i] += durations[i]
+                maxima[i] = max(maxima[i], durations[i])
+        stats = {}
+        for i, name in enumerate(PHASES):
+            stats[name] = (sums[i] / count / 1000 if count else 0, maxima[i] / 1000)
+        return count, stats
@@ -0,0 +1,72 @@
+import json
+
+# smallest change worth publishing, by device class; channels of other classes report every change
+DEADBANDS = {
+    "temperature": 0.2,
+    "humidity": 1.0,
+    "moisture": 1.0,
+    "carbon_dioxide": 25,
+    "battery": 5,
+}
+HEARTBEAT_WAKES = 6             # publish at least every 6th wake, even when nothing changed
+
+
+class Reporter:
+    """
+    Report by exception: decides whether a wake publishes at all.
+
+    The values last published are kept in a file, together with the number of
+    wakes since. A wake publishes when any channel moved by more than its deadband
+    from the published value, or when it has been silent for 'heartbeat' wakes,
+    so Home Assistant still sees the device alive. The board has no clock running
+    while the TPL5110 keeps it powered off, so the silence is counted in wakes.
+    """
+
+    def __init__(self, units_classes, filename="report.json", heartbeat=HEARTBEAT_WAKES):
+        self.filename = filename
+        self.heartbeat = heartbeat
+        self.deadbands = {"soc": DEADBANDS["battery"]}
+        for name, (unit, device_class) in units_classes.items():
+            self.deadbands[name] = DEADBANDS.get(device_class, 0)
+        self.published = {}
+        self.silent = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.filename, "r") as f:
+                state = json.loads(f.read())
+            self.published = state["published"]
+            self.silent = int(state["silent"])
+        except Exception as e:
+            print(e)
+            return False
+        return True
+
+    def save(self):
+        with open(self.filename, "w") as f:
+            f.write(json.dumps({"published": self.published, "silent": self.silent}))
+
+    def changed(self, values):
+        """Names of the channels that moved by more than their deadband since the last publish."""
+        changed = []
+        for name, deadband in self.deadbands.items():
+            value = values.get(name)
+            if value is None:
+                continue
+            last = self.published.get(name)
+            if last is None or abs(value - last) > deadband:
+                changed.append(name)
+        return changed
+
+    def should_report(self, values):
+        return self.silent + 1 >= self.heartbeat or bool(self.changed(values))
+
+    def reported(self, values):
+        self.published = {name: values[name] for name in self.deadbands if values.get(name) is not None}
+        self.silent = 0
+        self.save()
+
+    def skipped(self):
+        self.silent += 1
+        self.save()
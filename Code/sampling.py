@@ -0,0 +1,125 @@
+import sys
+from array import array
+
+MAX_SAMPLES = 256
+BLOCK = 8                   # samples taken between checks of the early stop
+
+MEAN = 0
+TRIMMED_MEAN = 1
+MEDIAN = 2
+
+_buffer = array("H", bytes(2 * MAX_SAMPLES))
+
+
+def _read_python(adc, buffer, start, n):
+    for i in range(start, start + n):
+        buffer[i] = adc.read_u16()
+
+
+_read = _read_python
+_read_channel = None
+
+if sys.implementation.name == "micropython":
+    import micropython
+    from micropython import const
+
+    ADC_CS = const(0x4004C000)          # RP2040 ADC control and status, RESULT follows
+
+    try:
+        @micropython.native
+        def _read_native(adc, buffer, start, n):
+            read = adc.read_u16
+            for i in range(start, start + n):
+                buffer[i] = read()
+        _read = _read_native
+    except Exception:
+        pass
+
+    if sys.platform == "rp2":
+        @micropython.viper
+        def _read_rp2(channel: int, buffer, start: int, n: int):
+            # same conversion as ADC.read_u16(), without a method call per sample
+            cs = ptr32(ADC_CS)
+            result = ptr32(ADC_CS + 4)
+            out = ptr16(buffer)
+            select = (channel & 7) << 12
+            i = start
+            end = start + n
+            while i < end:
+                cs[0] = (cs[0] & 0x8FFB) | select | 4       # AINSEL, START_ONCE
+                while not (cs[0] & 0x100):                  # READY
+                    pass
+                raw = result[0] & 0xFFF
+                out[i] = (raw << 4) | (raw >> 8)
+                i += 1
+        _read_channel = _read_rp2
+
+
+def read(adc, buffer, start, n, channel=None):
+    """Fills buffer[start:start + n] with read_u16() samples, straight from the ADC registers when 'channel' is given."""
+    if channel is not None and _read_channel is not None:
+        _read_channel(channel, buffer, start, n)
+    else:
+        _read(adc, buffer, start, n)
+
+
+def trimmed_mean(samples, n, trim=4):
+    """Mean of the first n samples without the 1/trim lowest and 1/trim highest."""
+    ordered = sorted(samples[:n])
+    cut = n // trim
+    total = 0
+    for i in range(cut, n - cut):
+        total += ordered[i]
+    return total / (n - 2 * cut)
+
+
+def median(samples, n):
+    ordered = sorted(samples[:n])
+    middle = n // 2
+    if n & 1:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def mean(samples, n):
+    total = 0
+    for i in range(n):
+        total += samples[i]
+    return total / n
+
+
+def oversample(adc, count=32, method=TRIMMED_MEAN, channel=None, tolerance=0, min_count=BLOCK):
+    """
+    Reads up to 'count' samples of an ADC and reduces them to one read_u16() scale value.
+
+    With a tolerance, sampling stops once at least 'min_count' samples were taken and
+    the standard error of their mean is below 'tolerance' (in read_u16() units).
+    Returns the value and the number of samples taken.
+    """
+    count = min(count, MAX_SAMPLES)
+    buffer = _buffer
+    n = 0
+    first = 0
+    total = 0                   # of the differences from the first sample: their squares stay small ints
+    squares = 0
+    while n < count:
+        block = min(BLOCK, count - n)
+        read(adc, buffer, n, block, channel)
+        if tolerance:
+            if not n:
+                first = buffer[0]
+            for i in range(n, n + block):
+                value = buffer[i] - first
+                total += value
+                squares += value * value
+        n += block
+        if tolerance and n >= min_count:
+            variance = (squares - total * total / n) / (n - 1)
+            if variance <= tolerance * tolerance * n:
+                break
+
+    if method == MEDIAN:
+        return median(buffer, n), n
+    if method == TRIMMED_MEAN and n >= 4:
+        return trimmed_mean(buffer, n), n
+    return mean(buffer, n), n
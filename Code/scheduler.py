@@ -0,0 +1,159 @@
+import struct
+
+POWER_OFF = "power off"
+LIGHT_SLEEP = "lightsleep"
+DEEP_SLEEP = "deepsleep"
+
+STATE = "<IIfB"                 # configured interval, current interval, last value, last value valid
+STATE_SIZE = struct.calcsize(STATE)
+POWER_OFF_GRACE_MS = 1_000      # the TPL5110 cuts the power right after DONE, still running means it did not
+DEEP_SLEEP_FROM_S = 300         # deepsleep reboots the board, shorter intervals are cheaper in lightsleep
+ADAPT_CHANGE = 0.02             # change of the value, as a part of the display range, that shortens the interval
+
+
+class Clock:
+    """Time and sleep of the board."""
+
+    def __init__(self):
+        import machine
+        from time import ticks_ms, ticks_diff, sleep_ms
+        self.machine = machine
+        self.ticks_ms = ticks_ms
+        self.ticks_diff = ticks_diff
+        self.sleep_ms = sleep_ms
+
+    def lightsleep(self, ms):
+        self.machine.lightsleep(ms)
+
+    def deepsleep(self, ms):
+        self.machine.deepsleep(ms)      # does not return, the board boots again
+
+
+class FakeClock:
+    """Clock for running the scheduler on a host, sleeping only moves its time on."""
+
+    def __init__(self, now_ms=0):
+        self.now_ms = now_ms
+        self.sleeps = []                # (mode, ms) of every lightsleep and deepsleep
+
+    def ticks_ms(self):
+        return self.now_ms
+
+    @staticmethod
+    def ticks_diff(end, start):
+        return end - start
+
+    def sleep_ms(self, ms):
+        self.now_ms += ms
+
+    def lightsleep(self, ms):
+        self.sleeps.append((LIGHT_SLEEP, ms))
+        self.now_ms += ms
+
+    def deepsleep(self, ms):
+        self.sleeps.append((DEEP_SLEEP, ms))
+        self.now_ms += ms
+
+
+class Scheduler:
+    """
+    Ends every wake in the cheapest way the power source allows.
+
+    On battery the TPL5110 timer is told to cut the power (DONE pin), so the
+    measuring interval is given by its resistor. When the board is still running
+    after that, it is powered from USB (or no timer is fitted) and sleeps by
+    itself for the rest of the interval: in lightsleep for short intervals,
+    in deepsleep, which reboots the board, for long ones.
+
+    The interval adapts to the measured value between interval/4 and interval*4:
+    it halves when the value moved by more than 'change' since the last wake and
+    grows by half when it did not. The state is kept in a file over deepsleep.
+    """
+
+    def __init__(self, done_pin, vbus_pin, interval_s, clock=None, filename="schedule.dat"):
+        self.done_pin = done_pin
+        self.vbus_pin = vbus_pin
+        self.clock = clock if clock is not None else Clock()
+        self.filename = filename
+        self.configured = interval_s
+        self.min_interval = max(1, interval_s // 4)
+        self.max_interval = interval_s * 4
+        self.interval = interval_s
+        self.last = None
+        self.wake_start = self.clock.ticks_ms()
+        self.state = bytearray(STATE_SIZE)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.filename, "rb") as f:
+                if f.readinto(self.state) != STATE_SIZE:
+                    return False
+        except OSError:
+            return False
+        configured, interval, last, valid = struct.unpack(STATE, self.state)
+        if configured != self.configured:
+            return False                # interval changed in the settings, start over
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+        self.last = last if valid else None
+        return True
+
+    def save(self):
+        struct.pack_into(STATE, self.state, 0, self.configured, self.interval,
+                         0.0 if self.last is None else self.last, self.last is not None)
+        with open(self.filename, "wb") as f:
+            f.write(self.state)
+
+    def adapt(self, value, change):
+        """Sets the interval of the next sleep from the value measured in this wake."""
+        if value is None:
+            return self.interval
+        if self.last is not None and abs(value - self.last) > change:
+            self.interval = max(self.min_interval, self.interval // 2)
+        else:
+            self.interval = min(self.max_interval, self.interval + (self.interval + 1) // 2)
+        self.last = value
+        return self.interval
+
+    def usb_powered(self):
+        return bool(self.vbus_pin.value())
+
+    def wake_period_s(self):
+        """
+        Seconds from one wake to the next: on battery the TPL5110 period, which the
+        configured interval has to match, from USB the adapted interval.
+        """
+        return self.interval if self.usb_powered() else self.configured
+
+    def mode(self, remaining_ms):
+        if not self.usb_powered():
+            return POWER_OFF
+        if remaining_ms >= DEEP_SLEEP_FROM_S * 1000:
+            return DEEP_SLEEP
+        return LIGHT_SLEEP
+
+    def remaining_ms(self):
+        """Rest of the interval, measured from the start of the wake."""
+        awake = self.clock.ticks_diff(self.clock.ticks_ms(), self.wake_start)
+        return max(0, self.interval * 1000 - awake)
+
+    def sleep(self):
+        """
+        Ends the wake and returns the sleep mode used when the board is still running afterwards,
+        the next wake starts then. Does not return from deepsleep on the board.
+        """
+        mode = self.mode(self.remaining_ms())
+        if mode == POWER_OFF:
+            self.done_pin.value(1)
+            self.clock.sleep_ms(POWER_OFF_GRACE_MS)
+            self.done_pin.value(0)
+            mode = LIGHT_SLEEP if self.remaining_ms() < DEEP_SLEEP_FROM_S * 1000 else DEEP_SLEEP
+
+        remaining = self.remaining_ms()
+        if mode == DEEP_SLEEP:
+            self.save()
+            self.clock.deepsleep(remaining)
+        elif remaining:
+            self.clock.lightsleep(remaining)
+        self.wake_start = self.clock.ticks_ms()
+        return mode
@@ -22,7 +22,7 @@ sensor = DS18B20(Pin(0), filename="sensors/ds18b20_1.json")
 # from sensors.soil_moisture import SoilMoisture
 #
 # adc = ADC(26)
-# sensor = SoilMoisture(adc, "sensors/moisture_1.json")
+# sensor = SoilMoisture(adc, "sensors/moisture_1.json", channel=0)
 
 # _____________________DHT22_____________________________________________________
 #
@@ -1,11 +1,15 @@
 from collections import OrderedDict
 import json
 import struct
+from sampling import oversample, MEDIAN
 
+NUM_OF_SAMPLES = 128
+TOLERANCE = 16              # read_u16() units; a steady probe stops sampling early
 
 class SoilMoisture:
-    def __init__(self, adc, filename):
+    def __init__(self, adc, filename, channel=None):
         self.adc = adc
+        self.channel = channel      # ADC input (GPIO26 is 0), read from the registers when given
 
         self.displ_min = 0
         self.displ_max = 100
@@ -19,13 +23,7 @@ class SoilMoisture:
         self.last_values = {}
 
     def _measure(self):
-        num_of_measurements = 1000
-        n = 0
-        measured = 0
-        while n < num_of_measurements:
-            measured += self.adc.read_u16()
-            n += 1
-        value = (measured / num_of_measurements)
+        value, n = oversample(self.adc, NUM_OF_SAMPLES, MEDIAN, self.channel, TOLERANCE)
         return 65535-int(value)
 
     def cont_measure(self):
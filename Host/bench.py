@@ -0,0 +1,220 @@
+"""
+Wake-cycle benchmarks of the firmware on the emulated board.
+
+    python3 Host/bench.py                   # compares with Host/bench_baseline.json
+    python3 Host/bench.py --save            # the results become the baseline
+    python3 Host/bench.py --threshold 5 --only scd4x
+
+Every sensor runs main.py with every widget: the first wake creates the files
+and refreshes the whole display, the metrics are of the wakes after it, which
+the device repeats for months. The measured value changes every wake, so each
+one redraws the display; mqtt/ also publishes it every wake. adc/ measures the
+oversampling of Code/sampling.py alone.
+
+Metrics, per wake:
+    host_ms      interpreter time on the host, the best of --repeat runs
+    board_ms     modeled time on the board
+    refreshes    display refreshes, 1 when every wake redraws as it should
+    spi_calls    SPI transfers to the display, board.counters.spi_writes
+    spi_bytes, i2c_bytes, onewire_bytes, flash_bytes, socket_writes, socket_bytes
+    heap_peak    most bytes allocated at once, by tracemalloc, with the garbage
+                 collected only by the gc.collect() calls of the firmware
+
+A metric that grows by more than --threshold percent over the baseline (the
+times by --time-threshold, being noisy) is a regression and the run fails.
+Times depend on the host: save the baseline on the machine that compares.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import emulator                                     # noqa: E402
+from emulator import devices                        # noqa: E402
+from emulator.board import ADC_VREF                 # noqa: E402
+from emulator.broker import Broker                  # noqa: E402
+from emulator.sensors import SENSORS                # noqa: E402
+
+BASELINE = os.path.dirname(os.path.abspath(__file__)) + "/bench_baseline.json"
+WAKES = 6
+WIDGETS = (0, 1, 2)
+TIMES = ("host_ms", "board_ms")               # board time runs with the host, as noisy
+COUNTERS = ("refreshes", "spi_bytes", "i2c_bytes", "onewire_bytes", "flash_bytes", "socket_writes", "socket_bytes")
+ADC_CALLS = 1000
+# the quantity shown and its change between wakes, so every wake redraws the display
+CHANGES = {
+    "ds18b20": ("temperature", 0.5),
+    "scd4x": ("co2", 50),
+    "sht4x": ("temperature", 0.5),
+    "dht22": ("temperature", 0.5),
+    "soil_moisture": ("volts", -ADC_VREF / 4095),  # one ADC step: 16 % on the uncalibrated 0..100 scale
+}
+
+
+class _Level:
+    """Analog input of the soil moisture probe that can be changed between wakes."""
+
+    def __init__(self, volts):
+        self.volts = volts
+
+    def __call__(self):
+        return self.volts
+
+
+def _wake_cycle(kind, widget=0, wifi=False, heap=False):
+    """Metrics of the steady wakes of one fresh board."""
+    with tempfile.TemporaryDirectory(prefix="picoink-bench-") as fs_dir, \
+            contextlib.redirect_stdout(io.StringIO()):
+        board = emulator.install(fs_dir)
+        try:
+            if kind == "soil_moisture":
+                device = emulator.sensor(kind, volts=_Level(ADC_VREF))     # full scale: 0 % until calibrated
+            else:
+                device = emulator.sensor(kind)
+            quantity, step = CHANGES[kind]
+            values = {"widget": widget}
+            if wifi:
+                values.update(WiFi_SSID="picoink", WiFi_passw="password", MQTT_brokr="192.168.1.2",
+                              MQTT_name="picoink")
+                board.wifi["ssid"] = "picoink"
+                board.broker = Broker()
+            emulator.settings(**values)
+            emulator.boot(1)
+            if heap:
+                gc.disable()                    # collections only where the firmware asks: the same every run
+                tracemalloc.start()
+            records = []
+            for wake in range(WAKES - 1):
+                setattr(device, quantity, getattr(device, quantity) + step)     # beyond the deadbands
+                records += emulator.boot(1)
+            peak = 0
+            if heap:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                gc.enable()
+        finally:
+            emulator.uninstall()                        # back out of fs_dir before it is removed
+    metrics = {
+        "host_ms": sum(record["host_ms"] for record in records) / len(records),
+        "board_ms": sum(record["ms"] for record in records) / len(records),
+    }
+    for name in COUNTERS:
+        metrics[name] = sum(record[name] for record in records) / len(records)
+    metrics["spi_calls"] = sum(record["spi_writes"] for record in records) / len(records)
+    if heap:
+        metrics["heap_peak"] = peak
+    return metrics
+
+
+def _adc(method, count, tolerance, noise):
+    """Host time of one oversample() of a noisy input and the samples it took."""
+    with tempfile.TemporaryDirectory(prefix="picoink-bench-") as fs_dir:
+        emulator.install(fs_dir)
+        try:
+            from machine import ADC
+            import sampling
+            rnd = random.Random(1)
+            devices.attach_analog(0, lambda: rnd.gauss(1.5, noise))
+            adc = ADC(26)
+            method = getattr(sampling, method)
+            clock = emulator.board.clock
+            samples = 0
+            start = clock.real_us()
+            for i in range(ADC_CALLS):
+                value, n = sampling.oversample(adc, count, method, 0, tolerance)
+                samples += n
+            host_us = clock.real_us() - start
+        finally:
+            emulator.uninstall()
+    return {"host_ms": host_us / 1000 / ADC_CALLS, "samples": samples / ADC_CALLS}
+
+
+def scenarios():
+    """Name: function returning the metrics of one run."""
+    runs = {}
+    for kind in sorted(SENSORS):
+        for widget in WIDGETS:
+            runs["{}/widget{}".format(kind, widget)] = \
+                lambda heap, kind=kind, widget=widget: _wake_cycle(kind, widget, heap=heap)
+    runs["mqtt/sht4x"] = lambda heap: _wake_cycle("sht4x", wifi=True, heap=heap)
+    # measurement.measure_analog() of the battery and SoilMoisture._measure()
+    runs["adc/battery"] = lambda heap: _adc("TRIMMED_MEAN", 32, 0, 0.002)
+    runs["adc/soil_moisture"] = lambda heap: _adc("MEDIAN", 128, 16, 0.002)
+    return runs
+
+
+def measure(run, repeat):
+    """Counters and heap of one run, host_ms the best of 'repeat' runs without tracemalloc."""
+    metrics = run(True)
+    host_ms = [run(False)["host_ms"] for i in range(repeat)]
+    metrics["host_ms"] = min(host_ms)
+    return {name: round(value, 3) for name, value in metrics.items()}
+
+
+def compare(results, baseline, threshold, time_threshold):
+    """Lines of the report and the number of regressions."""
+    lines = []
+    regressions = 0
+    for name, metrics in results.items():
+        base = baseline.get(name, {})
+        for metric, value in metrics.items():
+            was = base.get(metric)
+            if was is None:
+                lines.append("{:28} {:14} {:>12}  new".format(name, metric, value))
+                continue
+            limit = time_threshold if metric in TIMES else threshold
+            change = (value - was) / was * 100 if was else (0.0 if value == was else float("inf"))
+            status = ""
+            if value > was and change > limit:
+                status = "REGRESSION"
+                regressions += 1
+            lines.append("{:28} {:14} {:>12} {:>12} {:+8.1f}%  {}".format(name, metric, value, was, change, status))
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wake-cycle benchmarks of Code/ on the emulated PicoInk.")
+    parser.add_argument("--baseline", help="JSON with the results to compare with, bench_baseline.json if not given")
+    parser.add_argument("--save", action="store_true", help="writes the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent a metric may grow")
+    parser.add_argument("--time-threshold", type=float, default=25.0, help="percent host_ms and board_ms may grow")
+    parser.add_argument("--repeat", type=int, default=5, help="runs timed per scenario")
+    parser.add_argument("--only", help="runs the scenarios with this in their name")
+    args = parser.parse_args()
+    path = os.path.abspath(args.baseline or BASELINE)     # before the scenarios change the working directory
+    baseline = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            baseline = json.load(f)
+    elif args.baseline and not args.save:
+        parser.error("baseline {} not found".format(path))
+
+    results = {}
+    for name, run in scenarios().items():
+        if args.only and args.only not in name:
+            continue
+        results[name] = measure(run, args.repeat)
+
+    lines, regressions = compare(results, baseline, args.threshold, args.time_threshold)
+    print("\n".join(lines))
+
+    if args.save:
+        baseline.update(results)
+        with open(path, "w") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print("baseline saved to", path)
+    elif regressions:
+        print("{} regressions over the baseline".format(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
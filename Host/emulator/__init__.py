@@ -0,0 +1,227 @@
+"""
+Emulated PicoInk board for running the firmware of Code/ on a host.
+
+install() copies Code/ to a directory standing for the flash filesystem
+and puts fake MicroPython modules (machine, network, bluetooth, rp2,
+_onewire, usocket, uselect, uerrno, uctypes, micropython, time and, on
+CPython, framebuf, gc, uos and ure) into sys.modules ahead of the firmware.
+boot() then runs main.py wake after wake: a power cut by the TPL5110,
+machine.reset() or deepsleep boots it again with fresh modules, lightsleep
+continues its loop. uninstall() gives the host back its own modules, open(),
+sys.path and working directory.
+
+The board, its buses and the device models on them are in emulator.board;
+the modeled time, traffic and flash writes of every wake in board.wake_log.
+"""
+import builtins
+import os
+import re
+import sys
+
+from emulator.board import Board, PowerOff, Reset, Halt
+
+board = None
+
+
+def _absolute(path):
+    return path if path.startswith("/") else os.getcwd() + "/" + path
+
+
+CODE_DIR = _absolute(__file__).rsplit("/", 3)[0] + "/Code"
+TPL5110_S = 600                 # timer period between power cuts
+
+_MODULES = ("machine", "network", "bluetooth", "rp2", "_onewire", "usocket", "uselect", "uerrno",
+            "uctypes", "micropython")
+_fs_dir = None
+_open = builtins.open
+_main = None
+_saved = None                   # what install() replaced on the host, for uninstall()
+_MISSING = object()
+
+
+class _FlashFile:
+    """A file opened for writing on the emulated flash, counting what is written."""
+
+    def __init__(self, f):
+        self._f = f
+
+    def write(self, data):
+        board.counters.flash_writes += 1
+        board.counters.flash_bytes += len(data)
+        return self._f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+    def __iter__(self):
+        return iter(self._f)
+
+
+def _flash_open(file, mode="r", *args, **kwargs):
+    f = _open(file, mode, *args, **kwargs)
+    if isinstance(file, str) and ("w" in mode or "a" in mode or "+" in mode):
+        if not file.startswith("/") or file.startswith(_fs_dir):
+            return _FlashFile(f)
+    return f
+
+
+def _is_dir(path):
+    return os.stat(path)[0] & 0x4000
+
+
+def _copy_tree(source, target):
+    try:
+        os.mkdir(target)
+    except OSError:
+        pass
+    for name in os.listdir(source):
+        if name in ("__pycache__", "README.md"):
+            continue
+        path = source + "/" + name
+        if _is_dir(path):
+            _copy_tree(path, target + "/" + name)
+        else:
+            with _open(path, "rb") as src, _open(target + "/" + name, "wb") as dst:
+                dst.write(src.read())
+
+
+def install(fs_dir, code_dir=CODE_DIR):
+    """
+    Creates the board with the e-ink panel, copies the firmware into 'fs_dir'
+    (the flash) and makes it the working directory, like / on the board.
+    Can be called again for a new board with another flash.
+    """
+    global board, _fs_dir, _main, _saved
+    from emulator import clock, panel
+    if _fs_dir is not None:                 # installed before: forget the firmware of the last flash
+        _fresh_modules()
+        if _fs_dir in sys.path:
+            sys.path.remove(_fs_dir)
+    replaced = _MODULES + ("time", "utime", "framebuf", "gc", "uos", "ure")
+    if _saved is None:
+        _saved = {"modules": {name: sys.modules.get(name, _MISSING) for name in replaced},
+                  "path": list(sys.path), "bytecode": sys.dont_write_bytecode, "cwd": os.getcwd()}
+    board = Board()
+    clock.use(board.clock)
+    panel.attach(board)
+
+    _fs_dir = _absolute(fs_dir).rstrip("/")
+    _copy_tree(code_dir, _fs_dir)
+    os.chdir(_fs_dir)
+    if _fs_dir not in sys.path:
+        sys.path.insert(0, _fs_dir)
+
+    for name in _MODULES:
+        module = __import__("emulator." + name, None, None, [name])
+        sys.modules[name] = module
+    sys.modules["time"] = sys.modules["utime"] = clock
+    if sys.implementation.name != "micropython":
+        from emulator import framebuf, gc
+        sys.modules["framebuf"] = framebuf
+        sys.modules["gc"] = gc
+        sys.modules["uos"] = os
+        sys.modules["ure"] = re
+    sys.dont_write_bytecode = True          # the board compiles every .py it imports, at every boot
+    builtins.open = _flash_open
+    _main = None
+    return board
+
+
+def uninstall():
+    """Undoes install(): unloads the firmware and restores what it replaced on the host."""
+    global board, _fs_dir, _main, _saved
+    if _saved is None:
+        return
+    _fresh_modules()
+    for name, module in _saved["modules"].items():
+        if module is _MISSING:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+    sys.path[:] = _saved["path"]
+    sys.dont_write_bytecode = _saved["bytecode"]
+    builtins.open = _open
+    os.chdir(_saved["cwd"])
+    board = _fs_dir = _main = _saved = None
+
+
+def sensor(kind, **model):
+    """Writes sensor.py for one of the sensors in emulator.sensors and attaches the model of the device."""
+    from emulator.sensors import SENSORS
+    source, attach = SENSORS[kind]
+    with _open(_fs_dir + "/sensor.py", "w") as f:
+        f.write(source)
+    return attach(**model)
+
+
+def settings(**values):
+    """Stores values into settings.json, keys with '_' standing for '-' (WiFi_SSID is WiFi-SSID)."""
+    import json
+    stored = {}
+    try:
+        with _open(_fs_dir + "/settings.json") as f:
+            stored = json.loads(f.read())
+    except OSError:
+        pass
+    for key, value in values.items():
+        stored[key.replace("_", "-")] = value
+    with _open(_fs_dir + "/settings.json", "w") as f:
+        f.write(json.dumps(stored))
+
+
+def _power_cycle():
+    """The TPL5110 cuts the power for its period and turns it on again."""
+    board.panel.power_cycle()
+    for devices in (board.onewire, board.i2c, board.pio):
+        for device in devices.values():
+            if hasattr(device, "power_cycle"):
+                device.power_cycle()
+    board.clock.advance_us(TPL5110_S * 1_000_000)
+    board.clock.power_on()
+
+
+def _fresh_modules():
+    """What a boot starts with: no firmware module loaded, a radio that forgot everything."""
+    from emulator import network
+    loaded = []
+    for name, module in sys.modules.items():
+        files = [getattr(module, "__file__", None) or ""] + list(getattr(module, "__path__", None) or ())
+        if any(file.startswith(_fs_dir) for file in files):     # lib/ and the like are namespace packages
+            loaded.append(name)
+    for name in loaded:
+        del sys.modules[name]
+    network.reset()
+
+
+def boot(wakes=1):
+    """
+    Runs main.py until 'wakes' more wakes have ended. On battery every wake is a
+    boot that ends with the power cut; on USB the firmware loops in lightsleep.
+    Returns the records of the wakes run, see board.wake_log.
+    """
+    global _main
+    if _main is None:
+        path = _fs_dir + "/main.py"
+        with _open(path) as f:
+            _main = compile(f.read(), path, "exec")
+    first = len(board.wake_log)
+    board.max_wakes = board.wakes + wakes
+    while board.wakes < board.max_wakes:
+        _fresh_modules()
+        board.start_wake()
+        try:
+            exec(_main, {"__name__": "__main__", "__file__": _fs_dir + "/main.py"})
+            board.end_wake("returned")
+        except PowerOff:
+            _power_cycle()
+        except Reset:
+            pass
+        except Halt:
+            break
+    return board.wake_log[first:]
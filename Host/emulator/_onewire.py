@@ -0,0 +1,47 @@
+"""_onewire module: the bit and byte primitives of the 1-Wire bus on a pin."""
+import emulator
+from emulator.devices import dallas_crc8
+
+SLOT_US = 65                    # one time slot
+RESET_US = 960
+
+
+def _device(pin):
+    return emulator.board.onewire.get(pin.id)
+
+
+def reset(pin):
+    emulator.board.clock.advance_us(RESET_US)
+    device = _device(pin)
+    return device.reset() if device is not None else False
+
+
+def readbit(pin):
+    emulator.board.clock.advance_us(SLOT_US)
+    device = _device(pin)
+    return device.read_bit() if device is not None else 1
+
+
+def writebit(pin, value):
+    emulator.board.clock.advance_us(SLOT_US)
+    device = _device(pin)
+    if device is not None:
+        device.write_bit(1 if value else 0)
+
+
+def readbyte(pin):
+    emulator.board.counters.onewire_bytes += 1
+    value = 0
+    for i in range(8):
+        value |= readbit(pin) << i
+    return value
+
+
+def writebyte(pin, value):
+    emulator.board.counters.onewire_bytes += 1
+    for i in range(8):
+        writebit(pin, (value >> i) & 1)
+
+
+def crc8(data):
+    return dallas_crc8(data)
@@ -0,0 +1,34 @@
+"""bluetooth module: BLE advertisements are recorded on the board."""
+import emulator
+
+
+class UUID:
+    def __init__(self, value):
+        self.value = value
+
+
+class BLE:
+    def __init__(self):
+        self._active = False
+
+    def active(self, value=None):
+        if value is None:
+            return self._active
+        self._active = bool(value)
+        if self._active:
+            emulator.board.clock.advance_us(200_000)       # radio firmware start
+
+    def config(self, *args, **kwargs):
+        if args:
+            return {"mac": (0, b"\x28\xcd\xc1\x00\x00\x01"), "gap_name": b"PicoInk"}.get(args[0])
+
+    def irq(self, handler):
+        pass
+
+    def gap_advertise(self, interval_us, adv_data=None, resp_data=None, connectable=True):
+        if not self._active:
+            raise OSError(19)
+        board = emulator.board
+        if interval_us is not None:
+            board.counters.adverts += 1
+            board.ble_adverts.append((board.clock.us() // 1000, bytes(adv_data or b"")))
@@ -0,0 +1,145 @@
+from emulator.clock import Clock
+
+# pins of Code/gpio_definitions.py
+DONE_PIN = 9
+VBUS_PIN = "WL_GPIO2"
+BUSY_PIN = 10
+RST_PIN = 11
+DC_PIN = 12
+CS_PIN = 13
+DISPLAY_SPI = 1
+BUTTONS = (19, 18, 16)          # BTN_1, BTN_2, BTN_3, active low
+
+BATT_ADC_CHANNEL = 2
+TEMPER_ADC_CHANNEL = 4
+ADC_VREF = 3.3
+
+
+class PowerOff(BaseException):
+    """The TPL5110 cut the power: the wake is over."""
+
+
+class Reset(BaseException):
+    """machine.reset() or the end of a deepsleep: the board boots again."""
+
+
+class Halt(BaseException):
+    """The emulation ran all the wakes it was asked for."""
+
+
+class Counters:
+    """Traffic of the board since it was created; subtract two snapshots for a wake."""
+
+    NAMES = ("spi_writes", "spi_bytes", "i2c_transfers", "i2c_bytes", "onewire_bytes",
+             "flash_writes", "flash_bytes", "socket_writes", "socket_bytes", "refreshes", "adverts")
+
+    def __init__(self):
+        for name in self.NAMES:
+            setattr(self, name, 0)
+
+    def snapshot(self):
+        return {name: getattr(self, name) for name in self.NAMES}
+
+
+class Board:
+    """
+    State of the emulated PicoInk: time, pins, buses and the devices on them.
+
+    The fake MicroPython modules only keep references to their board objects;
+    what a pin reads, what a bus answers and how long it takes is decided here
+    and by the device models attached to it.
+    """
+
+    def __init__(self):
+        self.clock = Clock()
+        self.counters = Counters()
+        self.pins = {}              # pin id: [value, mode, pull]
+        self.inputs = {}            # pin id: function returning the level, for pins driven from outside
+        self.outputs = {}           # pin id: function called with every level written
+        self.spi = {}               # bus id: device with write(buf, board)
+        self.i2c = {}               # address: device with write(buf) and read(n)
+        self.onewire = {}           # pin id: device
+        self.pio = {}               # pin id: device answering a PIO state machine
+        self.analog = {}            # ADC channel: function returning volts
+        self.ble_adverts = []       # (ms, data) of every advertisement started
+        self.usb = False            # powered from USB: DONE does not cut the power
+        self.battery_v = 3.9
+        self.chip_temperature = 25.0
+        self.pressed = set()        # buttons held down
+        self.wifi = {
+            "ssid": None,           # the access point in range, None for any
+            "rssi": -60,
+            "scan_ms": 1500,        # scanning for the access point, not with a cached BSSID
+            "assoc_ms": 300,
+            "dhcp_ms": 1200,
+            "rtt_ms": 20,           # to the broker
+        }
+        self.broker = None
+        self.panel = None
+        self.wakes = 0
+        self.max_wakes = 1
+        self.wake_log = []          # counters and times of every finished wake
+        self._wake_start = None
+
+        self.inputs[VBUS_PIN] = lambda: 1 if self.usb else 0
+        for button in BUTTONS:
+            self.inputs[button] = lambda button=button: 0 if button in self.pressed else 1
+        self.outputs[DONE_PIN] = self._done
+        self.analog[BATT_ADC_CHANNEL] = lambda: (self.battery_v - 0.465) / 2
+        self.analog[TEMPER_ADC_CHANNEL] = lambda: 0.706 - (self.chip_temperature - 27) * 0.001721
+
+    # pins
+
+    def pin_read(self, pin_id):
+        source = self.inputs.get(pin_id)
+        if source is not None:
+            return source()
+        state = self.pins.get(pin_id)
+        return state[0] if state else 0
+
+    def pin_write(self, pin_id, value):
+        value = 1 if value else 0
+        state = self.pins.setdefault(pin_id, [0, None, None])
+        previous = state[0]
+        state[0] = value
+        hook = self.outputs.get(pin_id)
+        if hook is not None and value != previous:
+            hook(value)
+
+    def _done(self, value):
+        if value and not self.usb:
+            self.end_wake("power off")
+            raise PowerOff()
+
+    def adc_u16(self, channel):
+        source = self.analog.get(channel)
+        volts = source() if source is not None else 0.0
+        raw = int(volts / ADC_VREF * 4095 + 0.5)           # 12 bit converter, scaled like ADC.read_u16()
+        raw = max(0, min(raw, 4095))
+        return (raw << 4) | (raw >> 8)
+
+    # wakes
+
+    def start_wake(self):
+        self._wake_start = (self.clock.us(), self.clock.real_us(), self.counters.snapshot())
+
+    def end_wake(self, how):
+        """Records the wake that ends now; raises Halt when it was the last one asked for."""
+        if self._wake_start is None:
+            return
+        us, real_us, counters = self._wake_start
+        record = {"end": how, "ms": (self.clock.us() - us) / 1000, "host_ms": (self.clock.real_us() - real_us) / 1000}
+        now = self.counters.snapshot()
+        for name in Counters.NAMES:
+            record[name] = now[name] - counters[name]
+        self.wake_log.append(record)
+        self._wake_start = None
+        self.wakes += 1
+
+    def sleep(self, how, ms):
+        """lightsleep or deepsleep of the firmware: the next wake starts after 'ms' of board time."""
+        self.end_wake(how)
+        self.clock.advance_us(ms * 1000)
+        if self.wakes >= self.max_wakes:
+            raise Halt()
+        self.start_wake()
@@ -0,0 +1,120 @@
+import struct
+
+CONNECT = 1
+PUBLISH = 3
+PUBACK = 4
+PUBREC = 5
+PUBREL = 6
+SUBSCRIBE = 8
+PINGREQ = 12
+DISCONNECT = 14
+
+
+class Broker:
+    """
+    MQTT 3.1.1 broker in the emulation, one connection at a time.
+
+    It answers CONNECT, PUBLISH (QoS 0-2), SUBSCRIBE and PINGREQ and keeps every
+    message published. 'acks' False drops the PUBACKs, as with a connection
+    that breaks after the publish, 'drop' only those of the next that many
+    messages; 'refuse' sets a CONNACK return code.
+    """
+
+    def __init__(self):
+        self.messages = []          # (topic, payload, qos, retain)
+        self.retained = {}
+        self.sessions = 0
+        self.acks = True
+        self.drop = 0
+        self.refuse = 0
+        self.connection = None
+
+    def connect(self):
+        self.connection = Connection(self)
+        self.sessions += 1
+        return self.connection
+
+    def topics(self, suffix=""):
+        return [topic for topic, payload, qos, retain in self.messages if topic.endswith(suffix)]
+
+
+class Connection:
+    def __init__(self, broker):
+        self.broker = broker
+        self.pending = bytearray()  # from the client, not a whole packet yet
+        self.closed = False
+
+    def receive(self, data):
+        """Bytes from the client; returns the bytes the broker answers with."""
+        self.pending += data
+        out = bytearray()
+        while True:
+            packet = self._packet()
+            if packet is None:
+                return bytes(out)
+            out += self._handle(*packet)
+
+    def _packet(self):
+        data = self.pending
+        if len(data) < 2:
+            return None
+        length = 0
+        shift = 0
+        i = 1
+        while True:
+            if i >= len(data):
+                return None
+            byte = data[i]
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            i += 1
+            if not byte & 0x80:
+                break
+        if len(data) < i + length:
+            return None
+        header = data[0]
+        body = bytes(data[i:i + length])
+        self.pending = data[i + length:]
+        return header, body
+
+    def _handle(self, header, body):
+        broker = self.broker
+        kind = header >> 4
+        if kind == CONNECT:
+            return bytes([0x20, 2, 0, broker.refuse])
+        if kind == PUBLISH:
+            qos = (header >> 1) & 3
+            topic_len = struct.unpack(">H", body[:2])[0]
+            topic = body[2:2 + topic_len].decode()
+            i = 2 + topic_len
+            pid = None
+            if qos:
+                pid = body[i:i + 2]
+                i += 2
+            payload = body[i:]
+            retain = bool(header & 1)
+            broker.messages.append((topic, payload, qos, retain))
+            if retain:
+                broker.retained[topic] = payload
+            if qos and broker.drop:
+                broker.drop -= 1
+                return b""
+            if qos == 1 and broker.acks:
+                return bytes([PUBACK << 4, 2]) + pid
+            if qos == 2 and broker.acks:
+                return bytes([PUBREC << 4, 2]) + pid
+            return b""
+        if kind == PUBREL:
+            return bytes([0x70, 2]) + body[:2]
+        if kind == SUBSCRIBE:
+            topics = 0
+            i = 2
+            while i < len(body):
+                i += 2 + struct.unpack(">H", body[i:i + 2])[0] + 1
+                topics += 1
+            return bytes([0x90, 2 + topics]) + body[:2] + bytes(topics)
+        if kind == PINGREQ:
+            return bytes([0xD0, 0])
+        if kind == DISCONNECT:
+            self.closed = True
+        return b""
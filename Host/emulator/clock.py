@@ -0,0 +1,125 @@
+import sys
+import time as _time
+
+TICKS_PERIOD = 1 << 30          # ticks_ms() and ticks_us() wrap like on the board
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD // 2
+RP2_EPOCH = 1609459200          # 2021-01-01 00:00:00 UTC, where the RTC of the RP2040 starts at power-on
+
+if sys.implementation.name == "micropython":
+    _last = _time.ticks_us()
+    _real = 0
+
+    def _real_us():
+        global _last, _real
+        now = _time.ticks_us()
+        _real += _time.ticks_diff(now, _last)
+        _last = now
+        return _real
+else:
+    _start = _time.perf_counter_ns()
+
+    def _real_us():
+        return (_time.perf_counter_ns() - _start) // 1000
+
+
+class Clock:
+    """
+    Time of the emulated board.
+
+    It runs with the host (the firmware really spends that time interpreting)
+    plus everything modeled: sleeps, bus transfers, panel refreshes. Modeled
+    time passes instantly, so a wake of several seconds on the board takes
+    only its interpreter time on the host.
+
+    The wall clock, time(), is the RTC: without 'epoch' it starts at
+    RP2_EPOCH and again at every power_on(), as nothing sets it on the board.
+    """
+
+    def __init__(self, epoch=None):
+        self.modeled_us = 0
+        self.epoch = epoch
+        if epoch is None:
+            self.power_on()
+
+    def power_on(self):
+        """The RTC starts again at RP2_EPOCH."""
+        self.epoch = RP2_EPOCH - self.us() / 1_000_000
+
+    def us(self):
+        return _real_us() + self.modeled_us
+
+    def real_us(self):
+        return _real_us()
+
+    def advance_us(self, us):
+        if us > 0:
+            self.modeled_us += int(us)
+
+    def advance_to(self, us):
+        self.advance_us(us - self.us())
+
+
+# firmware time module: the functions of MicroPython's time on the emulated clock
+_clock = Clock()
+
+
+def use(clock):
+    global _clock
+    _clock = clock
+
+
+def ticks_us():
+    return _clock.us() & TICKS_MAX
+
+
+def ticks_ms():
+    return (_clock.us() // 1000) & TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+
+def ticks_diff(end, start):
+    return ((end - start + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+
+def sleep_us(us):
+    _clock.advance_us(us)
+
+
+def sleep_ms(ms):
+    _clock.advance_us(ms * 1000)
+
+
+def sleep(s):
+    _clock.advance_us(s * 1_000_000)
+
+
+def time():
+    return int(_clock.epoch + _clock.us() / 1_000_000)
+
+
+def time_ns():
+    return int(_clock.epoch * 1_000_000_000 + _clock.us() * 1000)
+
+
+def localtime(secs=None):
+    return _time.localtime(time() if secs is None else secs)
+
+
+def gmtime(secs=None):
+    return _time.gmtime(time() if secs is None else secs)
+
+
+def mktime(t):
+    return int(_time.mktime(t))
+
+
+def __getattr__(name):      # everything else of the host time module, for the libraries imported later
+    return getattr(_time, name)
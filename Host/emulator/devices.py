@@ -0,0 +1,277 @@
+"""Models of the sensors Code/sensors drives, attached to the board by pin or address."""
+import struct
+import emulator
+
+
+def _value(source):
+    return source() if callable(source) else source
+
+
+def dallas_crc8(data):
+    crc = 0
+    for byte in data:
+        for _ in range(8):
+            mix = (crc ^ byte) & 0x01
+            crc >>= 1
+            if mix:
+                crc ^= 0x8C
+            byte >>= 1
+    return crc
+
+
+def sensirion_crc8(data):
+    crc = 0xFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+class DS18B20:
+    """
+    1-Wire thermometer: ROM commands with the search algorithm, conversion,
+    scratchpad and its EEPROM copy (the resolution survives power cycles).
+    'temperature' is a number or a function returning one.
+    """
+
+    CONVERSION_MS = {9: 94, 10: 188, 11: 375, 12: 750}
+
+    def __init__(self, temperature=21.5, serial=b"\x01\x02\x03\x04\x05\x06"):
+        self.temperature = temperature
+        rom = b"\x28" + serial
+        self.rom = rom + bytes([dallas_crc8(rom)])
+        self.eeprom = bytearray(b"\x4b\x46\x7f")        # TH, TL, 12 bit
+        self.power_cycle()
+
+    def power_cycle(self):
+        self.scratch = bytearray(b"\x50\x05") + self.eeprom + bytearray(b"\xff\x0c\x10")
+        self.ready_at = 0
+        self.reset()
+
+    @property
+    def resolution(self):
+        return ((self.scratch[4] >> 5) & 0x03) + 9
+
+    def reset(self):
+        self.state = "rom"
+        self.bits = []              # bits of the byte being written by the master
+        self.out = []               # bits queued for the master to read
+        self.search_bit = 0
+        self.search_phase = 0
+        self.expected = 0           # bytes still expected by a match ROM or write scratchpad
+        return True
+
+    # master writes
+
+    def write_bit(self, bit):
+        if self.state == "search":
+            if self.search_phase != 2:
+                return
+            mine = (self.rom[self.search_bit >> 3] >> (self.search_bit & 7)) & 1
+            if bit != mine:
+                self.state = "idle"
+                return
+            self.search_bit += 1
+            self.search_phase = 0
+            if self.search_bit == 64:
+                self.state = "idle"
+            return
+        self.bits.append(bit & 1)
+        if len(self.bits) == 8:
+            byte = 0
+            for i, b in enumerate(self.bits):
+                byte |= b << i
+            self.bits = []
+            self._byte(byte)
+
+    def _byte(self, byte):
+        if self.state == "rom":
+            if byte == 0xCC:
+                self.state = "function"
+            elif byte == 0x55:
+                self.state = "match"
+                self.expected = 8
+                self.matched = bytearray()
+            elif byte == 0xF0:
+                self.state = "search"
+            elif byte == 0x33:
+                self._queue(self.rom)
+                self.state = "idle"
+        elif self.state == "match":
+            self.matched.append(byte)
+            self.expected -= 1
+            if not self.expected:
+                self.state = "function" if bytes(self.matched) == self.rom else "idle"
+        elif self.state == "function":
+            if byte == 0x44:
+                self._convert()
+                self.state = "idle"
+            elif byte == 0xBE:
+                crc = dallas_crc8(self.scratch[:8])
+                self._queue(bytes(self.scratch[:8]) + bytes([crc]))
+                self.state = "idle"
+            elif byte == 0x4E:
+                self.state = "write"
+                self.expected = 3
+                self.written = 0
+            elif byte == 0x48:
+                self.eeprom[:] = self.scratch[2:5]
+                self.state = "idle"
+        elif self.state == "write":
+            self.scratch[2 + self.written] = byte if self.written < 2 else (byte & 0x60) | 0x1F
+            self.written += 1
+            if self.written == self.expected:
+                self.state = "idle"
+
+    def _convert(self):
+        drop = 12 - self.resolution                 # undefined low bits read as zeros
+        raw = int(round(_value(self.temperature) * 16)) >> drop << drop
+        self.scratch[0:2] = struct.pack("<h", raw)
+        clock = emulator.board.clock
+        self.ready_at = clock.us() + self.CONVERSION_MS[self.resolution] * 1000
+
+    def _queue(self, data):
+        for byte in data:
+            for i in range(8):
+                self.out.append((byte >> i) & 1)
+
+    # master reads
+
+    def read_bit(self):
+        if self.state == "search":
+            mine = (self.rom[self.search_bit >> 3] >> (self.search_bit & 7)) & 1
+            phase = self.search_phase
+            self.search_phase = min(phase + 1, 2)
+            return mine if phase == 0 else mine ^ 1
+        if self.out:
+            return self.out.pop(0)
+        if self.state == "idle" and self.ready_at:
+            return 1 if emulator.board.clock.us() >= self.ready_at else 0      # conversion done
+        return 1
+
+
+class SCD4X:
+    """Sensirion SCD41 CO2 sensor: single shot measurement, data ready, settings words with CRC."""
+
+    MEASURE_MS = 5000
+
+    def __init__(self, co2=600, temperature=22.0, humidity=45.0):
+        self.co2 = co2
+        self.temperature = temperature
+        self.humidity = humidity
+        self.serial = (0x1234, 0x5678, 0x9ABC)
+        self.offset_word = 1498         # 4 degrees
+        self.altitude = 0
+        self.reply = b""
+        self.ready_at = None
+
+    def _words(self, *words):
+        out = bytearray()
+        for word in words:
+            pair = struct.pack(">H", word & 0xFFFF)
+            out += pair + bytes([sensirion_crc8(pair)])
+        self.reply = bytes(out)
+
+    def write(self, buf):
+        command = buf[0] << 8 | buf[1]
+        now = emulator.board.clock.us()
+        if command == 0x219D:           # measure single shot
+            self.ready_at = now + self.MEASURE_MS * 1000
+        elif command == 0xE4B8:         # get data ready status
+            ready = self.ready_at is not None and now >= self.ready_at
+            self._words(0x8006 if ready else 0x8000)
+        elif command == 0xEC05:         # read measurement
+            temperature = int((_value(self.temperature) + 45) * 65536 / 175)
+            humidity = int(_value(self.humidity) * 65536 / 100)
+            self._words(int(_value(self.co2)), temperature, humidity)
+            self.ready_at = None
+        elif command == 0x3682:
+            self._words(*self.serial)
+        elif command == 0x2318:
+            self._words(self.offset_word)
+        elif command == 0x2322:
+            self._words(self.altitude)
+        elif command == 0x241D and len(buf) >= 4:
+            self.offset_word = buf[2] << 8 | buf[3]
+        elif command == 0x2427 and len(buf) >= 4:
+            self.altitude = buf[2] << 8 | buf[3]
+
+    def read(self, n):
+        reply, self.reply = self.reply[:n], self.reply[n:]
+        return reply + bytes(n - len(reply))
+
+
+class SHT4X:
+    """Sensirion SHT4x: one byte commands, six bytes of temperature and humidity with CRCs."""
+
+    def __init__(self, temperature=22.0, humidity=45.0):
+        self.temperature = temperature
+        self.humidity = humidity
+        self.reply = b""
+
+    def write(self, buf):
+        command = buf[0]
+        if command in (0xFD, 0xF6, 0xE0, 0x39, 0x32, 0x2F, 0x24, 0x1E, 0x15):
+            t = int((_value(self.temperature) + 45) * 65535 / 175)
+            h = int((_value(self.humidity) + 6) * 65535 / 125)
+            self.reply = self._words(t, h)
+        elif command == 0x89:
+            self.reply = self._words(0x1234, 0x5678)
+
+    @staticmethod
+    def _words(*words):
+        out = bytearray()
+        for word in words:
+            pair = struct.pack(">H", max(0, min(word, 0xFFFF)))
+            out += pair + bytes([sensirion_crc8(pair)])
+        return bytes(out)
+
+    def read(self, n):
+        reply, self.reply = self.reply[:n], self.reply[n:]
+        return reply + bytes(n - len(reply))
+
+
+class DHT22:
+    """DHT22 answering the PIO program of sensors/dht22.py: five bytes per start, the last a checksum."""
+
+    READ_MS = 5
+
+    def __init__(self, temperature=22.0, humidity=45.0):
+        self.temperature = temperature
+        self.humidity = humidity
+        self.out = []
+
+    def start(self):
+        humidity = int(round(_value(self.humidity) * 10))
+        temperature = int(round(_value(self.temperature) * 10))
+        t = abs(temperature) | (0x8000 if temperature < 0 else 0)
+        data = [humidity >> 8, humidity & 0xFF, t >> 8, t & 0xFF]
+        self.out = data + [sum(data) & 0xFF]
+        emulator.board.clock.advance_us(self.READ_MS * 1000)
+
+    def get(self):
+        if not self.out:
+            self.start()
+        return self.out.pop(0)
+
+
+def attach_onewire(pin_id, device):
+    emulator.board.onewire[pin_id] = device
+    return device
+
+
+def attach_i2c(address, device):
+    emulator.board.i2c[address] = device
+    return device
+
+
+def attach_pio(pin_id, device):
+    emulator.board.pio[pin_id] = device
+    return device
+
+
+def attach_analog(channel, volts):
+    """'volts' is a number or a function returning one."""
+    source = emulator.board.analog[channel] = volts if callable(volts) else lambda: volts
+    return source
@@ -0,0 +1,101 @@
+"""
+8x8 cells for FrameBuffer.text(): a 5x7 font, legible in the rendered PNG.
+
+The widths and advance are those of MicroPython's built-in font, the shapes
+are not; lowercase letters are drawn as capitals.
+"""
+
+_ROWS = {
+    " ": ".....|.....|.....|.....|.....|.....|.....",
+    "!": "..#..|..#..|..#..|..#..|..#..|.....|..#..",
+    '"': ".#.#.|.#.#.|.....|.....|.....|.....|.....",
+    "#": ".#.#.|#####|.#.#.|.#.#.|#####|.#.#.|.....",
+    "$": "..#..|.####|#.#..|.###.|..#.#|####.|..#..",
+    "%": "##..#|##.#.|...#.|..#..|.#...|.#.##|#..##",
+    "&": ".##..|#..#.|.##..|.#...|#.#.#|#..#.|.##.#",
+    "'": "..#..|..#..|.....|.....|.....|.....|.....",
+    "(": "...#.|..#..|.#...|.#...|.#...|..#..|...#.",
+    ")": ".#...|..#..|...#.|...#.|...#.|..#..|.#...",
+    "*": ".....|..#..|#.#.#|.###.|#.#.#|..#..|.....",
+    "+": ".....|..#..|..#..|#####|..#..|..#..|.....",
+    ",": ".....|.....|.....|.....|.##..|..#..|.#...",
+    "-": ".....|.....|.....|#####|.....|.....|.....",
+    ".": ".....|.....|.....|.....|.....|.##..|.##..",
+    "/": "....#|...#.|...#.|..#..|.#...|.#...|#....",
+    "0": ".###.|#...#|#..##|#.#.#|##..#|#...#|.###.",
+    "1": "..#..|.##..|..#..|..#..|..#..|..#..|.###.",
+    "2": ".###.|#...#|....#|...#.|..#..|.#...|#####",
+    "3": "#####|...#.|..#..|...#.|....#|#...#|.###.",
+    "4": "...#.|..##.|.#.#.|#..#.|#####|...#.|...#.",
+    "5": "#####|#....|####.|....#|....#|#...#|.###.",
+    "6": "..##.|.#...|#....|####.|#...#|#...#|.###.",
+    "7": "#####|....#|...#.|..#..|.#...|.#...|.#...",
+    "8": ".###.|#...#|#...#|.###.|#...#|#...#|.###.",
+    "9": ".###.|#...#|#...#|.####|....#|...#.|.##..",
+    ":": ".....|.##..|.##..|.....|.##..|.##..|.....",
+    ";": ".....|.##..|.##..|.....|.##..|..#..|.#...",
+    "<": "...#.|..#..|.#...|#....|.#...|..#..|...#.",
+    "=": ".....|.....|#####|.....|#####|.....|.....",
+    ">": ".#...|..#..|...#.|....#|...#.|..#..|.#...",
+    "?": ".###.|#...#|....#|...#.|..#..|.....|..#..",
+    "@": ".###.|#...#|....#|.##.#|#.#.#|#.#.#|.###.",
+    "A": ".###.|#...#|#...#|#####|#...#|#...#|#...#",
+    "B": "####.|#...#|#...#|####.|#...#|#...#|####.",
+    "C": ".###.|#...#|#....|#....|#....|#...#|.###.",
+    "D": "###..|#..#.|#...#|#...#|#...#|#..#.|###..",
+    "E": "#####|#....|#....|####.|#....|#....|#####",
+    "F": "#####|#....|#....|####.|#....|#....|#....",
+    "G": ".###.|#...#|#....|#.###|#...#|#...#|.####",
+    "H": "#...#|#...#|#...#|#####|#...#|#...#|#...#",
+    "I": ".###.|..#..|..#..|..#..|..#..|..#..|.###.",
+    "J": "..###|...#.|...#.|...#.|...#.|#..#.|.##..",
+    "K": "#...#|#..#.|#.#..|##...|#.#..|#..#.|#...#",
+    "L": "#....|#....|#....|#....|#....|#....|#####",
+    "M": "#...#|##.##|#.#.#|#.#.#|#...#|#...#|#...#",
+    "N": "#...#|#...#|##..#|#.#.#|#..##|#...#|#...#",
+    "O": ".###.|#...#|#...#|#...#|#...#|#...#|.###.",
+    "P": "####.|#...#|#...#|####.|#....|#....|#....",
+    "Q": ".###.|#...#|#...#|#...#|#.#.#|#..#.|.##.#",
+    "R": "####.|#...#|#...#|####.|#.#..|#..#.|#...#",
+    "S": ".####|#....|#....|.###.|....#|....#|####.",
+    "T": "#####|..#..|..#..|..#..|..#..|..#..|..#..",
+    "U": "#...#|#...#|#...#|#...#|#...#|#...#|.###.",
+    "V": "#...#|#...#|#...#|#...#|#...#|.#.#.|..#..",
+    "W": "#...#|#...#|#...#|#.#.#|#.#.#|#.#.#|.#.#.",
+    "X": "#...#|#...#|.#.#.|..#..|.#.#.|#...#|#...#",
+    "Y": "#...#|#...#|#...#|.#.#.|..#..|..#..|..#..",
+    "Z": "#####|....#|...#.|..#..|.#...|#....|#####",
+    "[": ".###.|.#...|.#...|.#...|.#...|.#...|.###.",
+    "\\": "#....|.#...|.#...|..#..|...#.|...#.|....#",
+    "]": ".###.|...#.|...#.|...#.|...#.|...#.|.###.",
+    "^": "..#..|.#.#.|#...#|.....|.....|.....|.....",
+    "_": ".....|.....|.....|.....|.....|.....|#####",
+    "`": ".#...|..#..|.....|.....|.....|.....|.....",
+    "{": "...#.|..#..|..#..|.#...|..#..|..#..|...#.",
+    "|": "..#..|..#..|..#..|..#..|..#..|..#..|..#..",
+    "}": ".#...|..#..|..#..|...#.|..#..|..#..|.#...",
+    "~": ".....|.....|.#...|#.#.#|...#.|.....|.....",
+    "°": ".##..|#..#.|.##..|.....|.....|.....|.....",
+}
+_UNKNOWN = "#####|#...#|#...#|#...#|#...#|#...#|#####"
+
+_cells = {}
+
+
+def _cell(rows):
+    rows = rows.split("|")
+    columns = bytearray(8)
+    for y, row in enumerate(rows):
+        for x, dot in enumerate(row):
+            if dot == "#":
+                columns[x + 1] |= 1 << y
+    return bytes(columns)
+
+
+def glyph(ch):
+    """8 columns of the character, the top pixel in bit 0."""
+    cell = _cells.get(ch)
+    if cell is None:
+        cell = _cell(_ROWS.get(ch.upper(), _UNKNOWN))
+        _cells[ch] = cell
+    return cell
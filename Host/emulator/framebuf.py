@@ -0,0 +1,141 @@
+"""Pure Python framebuf for the monochrome formats, pixel exact with MicroPython's."""
+from emulator.font import glyph
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+MVLSB = MONO_VLSB
+
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format not in (MONO_VLSB, MONO_HLSB, MONO_HMSB):
+            raise ValueError("invalid format")
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+        self.format = format
+        self.stride = width if stride is None else stride
+        self.row_bytes = (self.stride + 7) // 8
+
+    def _set(self, x, y, c):
+        buf = self.buffer
+        if self.format == MONO_VLSB:
+            i = (y >> 3) * self.stride + x
+            mask = 1 << (y & 7)
+        elif self.format == MONO_HLSB:
+            i = y * self.row_bytes + (x >> 3)
+            mask = 0x80 >> (x & 7)
+        else:
+            i = y * self.row_bytes + (x >> 3)
+            mask = 1 << (x & 7)
+        if c:
+            buf[i] |= mask
+        else:
+            buf[i] &= ~mask & 0xFF
+
+    def _get(self, x, y):
+        buf = self.buffer
+        if self.format == MONO_VLSB:
+            return (buf[(y >> 3) * self.stride + x] >> (y & 7)) & 1
+        if self.format == MONO_HLSB:
+            return (buf[y * self.row_bytes + (x >> 3)] >> (7 - (x & 7))) & 1
+        return (buf[y * self.row_bytes + (x >> 3)] >> (x & 7)) & 1
+
+    def pixel(self, x, y, c=-1):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        if c == -1:
+            return self._get(x, y)
+        self._set(x, y, c & 1)
+
+    def fill(self, c):
+        if self.format == MONO_VLSB and self.stride == self.width:
+            value = 0xFF if c & 1 else 0
+            buf = self.buffer
+            for i in range(((self.height + 7) >> 3) * self.stride):
+                buf[i] = value
+        else:
+            self.fill_rect(0, 0, self.width, self.height, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = min(self.width, x + w)
+        y1 = min(self.height, y + h)
+        c &= 1
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self._set(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+        elif w > 0 and h > 0:
+            self.fill_rect(x, y, w, 1, c)
+            self.fill_rect(x, y + h - 1, w, 1, c)
+            self.fill_rect(x, y, 1, h, c)
+            self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        # Bresenham, the same points as MicroPython's framebuf
+        dx = x2 - x1
+        sx = 1 if dx > 0 else -1
+        dx = abs(dx)
+        dy = y2 - y1
+        sy = 1 if dy > 0 else -1
+        dy = abs(dy)
+        steep = dy > dx
+        if steep:
+            x1, y1 = y1, x1
+            dx, dy = dy, dx
+            sx, sy = sy, sx
+        e = 2 * dy - dx
+        for i in range(dx):
+            if steep:
+                self.pixel(y1, x1, c)
+            else:
+                self.pixel(x1, y1, c)
+            while e >= 0:
+                y1 += sy
+                e -= 2 * dx
+            x1 += sx
+            e += 2 * dy
+        self.pixel(x2, y2, c)
+
+    def text(self, s, x, y, c=1):
+        for ch in s:
+            columns = glyph(ch)
+            for j in range(8):
+                column = columns[j]
+                yy = y
+                while column:
+                    if column & 1:
+                        self.pixel(x + j, yy, c)
+                    column >>= 1
+                    yy += 1
+            x += 8
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        for yy in range(max(0, -y), min(fbuf.height, self.height - y)):
+            for xx in range(max(0, -x), min(fbuf.width, self.width - x)):
+                c = fbuf._get(xx, yy)
+                if palette is not None:
+                    c = palette._get(c, 0)
+                if c != key:
+                    self._set(x + xx, y + yy, c)
+
+    def scroll(self, xstep, ystep):
+        copy = FrameBuffer(bytearray(self.buffer), self.width, self.height, self.format, self.stride)
+        for yy in range(self.height):
+            for xx in range(self.width):
+                sx = xx - xstep
+                sy = yy - ystep
+                if 0 <= sx < self.width and 0 <= sy < self.height:
+                    self._set(xx, yy, copy._get(sx, sy))
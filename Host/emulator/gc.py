@@ -0,0 +1,39 @@
+"""gc module with MicroPython's heap figures, from tracemalloc when it traces (CPython only)."""
+import gc as _gc
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+HEAP_BYTES = 192 * 1024         # MicroPython heap of the Pico W
+
+
+def collect():
+    return _gc.collect()
+
+
+def enable():
+    _gc.enable()
+
+
+def disable():
+    _gc.disable()
+
+
+def isenabled():
+    return _gc.isenabled()
+
+
+def mem_alloc():
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return 0
+
+
+def mem_free():
+    return HEAP_BYTES - mem_alloc()
+
+
+def threshold(amount=None):
+    return -1
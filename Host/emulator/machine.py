@@ -0,0 +1,199 @@
+"""machine module of the emulated board."""
+import emulator
+from emulator.board import Reset
+
+CPU_HZ = 125_000_000
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    ALT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.handler = None
+        self.init(mode, pull, value)
+
+    def init(self, mode=-1, pull=-1, value=None):
+        state = emulator.board.pins.setdefault(self.id, [0, None, None])
+        if mode != -1:
+            state[1] = mode
+        if pull != -1:
+            state[2] = pull
+            if pull == Pin.PULL_UP and value is None and state[1] != Pin.OUT:
+                state[0] = 1
+        if value is not None:
+            emulator.board.pin_write(self.id, value)
+
+    def value(self, value=None):
+        if value is None:
+            return emulator.board.pin_read(self.id)
+        emulator.board.pin_write(self.id, value)
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def high(self):
+        self.value(1)
+
+    def low(self):
+        self.value(0)
+
+    def toggle(self):
+        self.value(not self.value())
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self.handler = handler
+
+    def __repr__(self):
+        return "Pin({!r})".format(self.id)
+
+
+class SPI:
+    def __init__(self, id, baudrate=1_000_000, polarity=0, phase=0, bits=8, firstbit=0, sck=None, mosi=None, miso=None):
+        self.id = id
+        self.baudrate = baudrate
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate:
+            self.baudrate = baudrate
+
+    def write(self, buf):
+        board = emulator.board
+        n = len(buf)
+        board.counters.spi_writes += 1
+        board.counters.spi_bytes += n
+        board.clock.advance_us(n * 8_000_000 // self.baudrate)
+        device = board.spi.get(self.id)
+        if device is not None:
+            device.write(buf)
+
+    def read(self, n, write=0):
+        self.write(bytes([write]) * n)
+        return bytes(n)
+
+    def readinto(self, buf, write=0):
+        self.write(bytes([write]) * len(buf))
+
+    def write_readinto(self, write_buf, read_buf):
+        self.write(write_buf)
+
+
+class I2C:
+    def __init__(self, id, scl=None, sda=None, freq=400_000, timeout=50_000):
+        self.id = id
+        self.freq = freq
+
+    def _device(self, addr, n):
+        board = emulator.board
+        board.counters.i2c_transfers += 1
+        board.counters.i2c_bytes += n
+        board.clock.advance_us((n + 1) * 9 * 1_000_000 // self.freq)      # address byte and data, with ACKs
+        device = board.i2c.get(addr)
+        if device is None:
+            raise OSError(5)        # EIO: no acknowledge
+        return device
+
+    def scan(self):
+        return sorted(emulator.board.i2c)
+
+    def writeto(self, addr, buf, stop=True):
+        self._device(addr, len(buf)).write(bytes(buf))
+        return len(buf)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        return self._device(addr, nbytes).read(nbytes)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        data = self._device(addr, len(buf)).read(len(buf))
+        buf[:len(data)] = data
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self.writeto(addr, bytes([memaddr]) + bytes(buf))
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        self.writeto(addr, bytes([memaddr]), False)
+        return self.readfrom(addr, nbytes)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        self.writeto(addr, bytes([memaddr]), False)
+        self.readfrom_into(addr, buf)
+
+
+class ADC:
+    CORE_TEMP = 4
+
+    def __init__(self, id):
+        if isinstance(id, Pin):
+            id = id.id
+        self.channel = id - 26 if isinstance(id, int) and id >= 26 else id
+
+    def read_u16(self):
+        board = emulator.board
+        board.clock.advance_us(2)                           # 500 kS/s converter
+        return board.adc_u16(self.channel)
+
+
+class WDT:
+    def __init__(self, id=0, timeout=5000):
+        pass
+
+    def feed(self):
+        pass
+
+
+def freq(hz=None):
+    if hz is None:
+        return CPU_HZ
+
+
+def unique_id():
+    return b"\xe6\x61\x41\x04\x03\x2e\x4f\x2c"
+
+
+def reset():
+    emulator.board.end_wake("reset")
+    raise Reset()
+
+
+def soft_reset():
+    reset()
+
+
+def reset_cause():
+    return 1
+
+
+def idle():
+    pass
+
+
+def lightsleep(ms=None):
+    emulator.board.sleep("lightsleep", ms or 0)
+
+
+def deepsleep(ms=None):
+    board = emulator.board
+    board.end_wake("deepsleep")
+    board.clock.advance_us((ms or 0) * 1000)
+    raise Reset()
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state=0):
+    pass
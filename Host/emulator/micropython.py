@@ -0,0 +1,53 @@
+"""micropython module: the code emitters are plain Python on the host."""
+
+
+def const(value):
+    return value
+
+
+def native(function):
+    return function
+
+
+def viper(function):
+    return function
+
+
+def asm_thumb(function):
+    return function
+
+
+def opt_level(level=None):
+    return 0
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def schedule(function, argument):
+    function(argument)
+
+
+def mem_info(verbose=None):
+    pass
+
+
+def qstr_info(verbose=None):
+    pass
+
+
+def stack_use():
+    return 0
+
+
+def heap_lock():
+    return 0
+
+
+def heap_unlock():
+    return 0
+
+
+def kbd_intr(char):
+    pass
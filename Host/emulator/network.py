@@ -0,0 +1,110 @@
+"""network module: a CYW43 WLAN joining the access point modeled by board.wifi."""
+import emulator
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_NOIP = 2
+STAT_GOT_IP = 3
+STAT_CONNECT_FAIL = -1
+STAT_NO_AP_FOUND = -2
+STAT_WRONG_PASSWORD = -3
+
+AP_BSSID = b"\x3c\x84\x6a\x11\x22\x33"
+AP_CHANNEL = 6
+WRONG_BSSID_MS = 500            # a directed connect to a BSSID not in range gives up after this
+
+_interfaces = {}
+
+
+def WLAN(interface=STA_IF):
+    """One object per interface, like on the board."""
+    wlan = _interfaces.get(interface)
+    if wlan is None:
+        wlan = _interfaces[interface] = _WLAN(interface)
+    return wlan
+
+
+def reset():
+    """Power cycle: the radio forgets everything."""
+    _interfaces.clear()
+
+
+class _WLAN:
+    def __init__(self, interface):
+        self.interface = interface
+        self._active = False
+        self.started = None         # board us of the connect
+        self.directed = False
+        self.wrong_bssid = False
+        self.wrong_ssid = False
+        self.static = None
+        self.cfg = {"ssid": "", "channel": AP_CHANNEL, "mac": b"\x28\xcd\xc1\x00\x00\x01", "pm": 0, "security": 0,
+                    "hostname": "PicoW"}
+        self.log = []               # connect() arguments, for checking what the firmware asked for
+
+    def active(self, value=None):
+        if value is None:
+            return self._active
+        if value and not self._active:
+            emulator.board.clock.advance_us(50_000)     # firmware upload to the radio
+        self._active = bool(value)
+
+    def config(self, *args, **kwargs):
+        if args:
+            if args[0] not in self.cfg:
+                raise ValueError("unknown config param")    # as cyw43, which has no "bssid" either
+            return self.cfg[args[0]]
+        self.cfg.update(kwargs)
+
+    def ifconfig(self, config=None):
+        if config is None:
+            if self.interface == AP_IF:
+                return ("192.168.4.1", "255.255.255.0", "192.168.4.1", "0.0.0.0")
+            return self.static or ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+        self.static = None if config == "dhcp" else tuple(config)
+
+    def ipconfig(self, *args, **kwargs):
+        return self.ifconfig()
+
+    def scan(self):
+        wifi = emulator.board.wifi
+        emulator.board.clock.advance_us(wifi["scan_ms"] * 1000)
+        ssid = (wifi["ssid"] or "picoink").encode()
+        return [(ssid, AP_BSSID, AP_CHANNEL, wifi["rssi"], 3, False)]
+
+    def connect(self, ssid=None, key=None, bssid=None, channel=None):
+        self.log.append({"ssid": ssid, "bssid": bssid, "channel": channel})
+        wifi = emulator.board.wifi
+        self.started = emulator.board.clock.us()
+        self.directed = bssid is not None
+        self.wrong_bssid = self.directed and bytes(bssid) != AP_BSSID
+        self.wrong_ssid = wifi["ssid"] is not None and ssid != wifi["ssid"]
+
+    def disconnect(self):
+        self.started = None
+
+    def isconnected(self):
+        return self.status() == STAT_GOT_IP
+
+    def status(self, param=None):
+        wifi = emulator.board.wifi
+        if param == "rssi":
+            return wifi["rssi"]
+        if param is not None:
+            raise ValueError("unknown status param")
+        if self.started is None:
+            return STAT_IDLE
+        ms = (emulator.board.clock.us() - self.started) // 1000
+        if self.wrong_bssid:
+            return STAT_NO_AP_FOUND if ms > WRONG_BSSID_MS else STAT_CONNECTING
+        link_ms = wifi["assoc_ms"] + (0 if self.directed else wifi["scan_ms"])
+        if self.wrong_ssid:
+            return STAT_NO_AP_FOUND if ms > link_ms else STAT_CONNECTING
+        if ms < link_ms:
+            return STAT_CONNECTING
+        if self.static is None and ms < link_ms + wifi["dhcp_ms"]:
+            return STAT_NOIP
+        return STAT_GOT_IP
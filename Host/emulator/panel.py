@@ -0,0 +1,165 @@
+import emulator
+from emulator import png
+from emulator.board import BUSY_PIN, RST_PIN, DC_PIN, DISPLAY_SPI
+
+SOURCES = 128                   # panel width: X addresses are bytes of 8 sources
+GATES = 250
+X_BYTES = SOURCES // 8
+
+# refresh times of the SSD1680 driving the 2.13" panel, ms
+FULL_REFRESH_MS = 2000
+PARTIAL_REFRESH_MS = 300
+POWER_ON_MS = 80                # update sequence without displaying, e.g. 0xC0
+SW_RESET_MS = 10
+
+
+class Panel:
+    """
+    SSD1680 e-ink controller on the display SPI.
+
+    Interprets the command stream the way the controller does (RAM windows,
+    address counters with the data entry mode, update sequences, deep sleep,
+    resets) and keeps the image the panel shows, which survives power cuts.
+    BUSY is held for the modeled time of every operation.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.ram = {0x24: bytearray(X_BYTES * GATES), 0x26: bytearray(X_BYTES * GATES)}
+        self.shown = bytearray(b"\xff" * (X_BYTES * GATES))    # what the panel displays, in RAM layout
+        self.full_refreshes = 0
+        self.partial_refreshes = 0
+        self.power_cycle()
+        board.spi[DISPLAY_SPI] = self
+        board.inputs[BUSY_PIN] = self.busy
+        board.outputs[RST_PIN] = self._reset_pin
+
+    def power_cycle(self):
+        """The controller loses its RAM and registers, the panel keeps its image."""
+        for ram in self.ram.values():
+            ram[:] = bytes(len(ram))
+        self._registers()
+        self.asleep = False
+        self.busy_until = 0
+
+    def _registers(self):
+        self.command = None
+        self.args = bytearray()
+        self.entry_mode = 0b011
+        self.x_start, self.x_end = 0, X_BYTES - 1
+        self.y_start, self.y_end = 0, GATES - 1
+        self.x = 0
+        self.y = 0
+        self.update_option = 0xFF
+
+    def busy(self):
+        return 1 if self.board.clock.us() < self.busy_until else 0
+
+    def _hold_busy(self, ms):
+        self.busy_until = max(self.busy_until, self.board.clock.us()) + ms * 1000
+
+    def _reset_pin(self, level):
+        if not level:
+            self._registers()
+            self.asleep = False
+
+    def write(self, buf):
+        if self.asleep:
+            return                              # deep sleep: only a hardware reset wakes the controller
+        if not self.board.pin_read(DC_PIN):
+            for byte in buf:
+                self._command(byte)
+            return
+        if self.command in (0x24, 0x26):
+            self._write_ram(self.ram[self.command], buf)
+            return
+        for byte in buf:
+            self.args.append(byte)
+            self._argument()
+
+    def _command(self, command):
+        self.command = command
+        self.args = bytearray()
+        if command == 0x12:                     # SW reset
+            self._registers()
+            self._hold_busy(SW_RESET_MS)
+        elif command == 0x20:                   # master activation
+            self._update()
+
+    def _argument(self):
+        command, args = self.command, self.args
+        if command == 0x10 and args[0] & 0x03:
+            self.asleep = True
+        elif command == 0x11:
+            self.entry_mode = args[0] & 0x07
+        elif command == 0x44 and len(args) == 2:
+            self.x_start, self.x_end = args[0], args[1]
+        elif command == 0x45 and len(args) == 4:
+            self.y_start = args[0] | args[1] << 8
+            self.y_end = args[2] | args[3] << 8
+        elif command == 0x4E:
+            self.x = args[0]
+        elif command == 0x4F and len(args) == 2:
+            self.y = args[0] | args[1] << 8
+        elif command == 0x22:
+            self.update_option = args[0]
+
+    def _write_ram(self, ram, buf):
+        x, y = self.x, self.y
+        x_step = 1 if self.entry_mode & 0b001 else -1
+        y_step = 1 if self.entry_mode & 0b010 else -1
+        y_first = self.entry_mode & 0b100
+        for byte in buf:
+            if 0 <= x < X_BYTES and 0 <= y < GATES:
+                ram[x * GATES + y] = byte
+            if y_first:
+                y += y_step
+                if y > self.y_end or y < self.y_start:
+                    y = self.y_start if y_step > 0 else self.y_end
+                    x += x_step
+                    if x > self.x_end or x < self.x_start:
+                        x = self.x_start if x_step > 0 else self.x_end
+            else:
+                x += x_step
+                if x > self.x_end or x < self.x_start:
+                    x = self.x_start if x_step > 0 else self.x_end
+                    y += y_step
+                    if y > self.y_end or y < self.y_start:
+                        y = self.y_start if y_step > 0 else self.y_end
+        self.x, self.y = x, y
+
+    def _update(self):
+        option = self.update_option
+        if not option & 0x04:
+            self._hold_busy(POWER_ON_MS)
+            return
+        self.shown[:] = self.ram[0x24]
+        self.board.counters.refreshes += 1
+        if option & 0x08:                       # display mode 2: partial waveform
+            self.partial_refreshes += 1
+            self._hold_busy(PARTIAL_REFRESH_MS)
+        else:
+            self.full_refreshes += 1
+            self._hold_busy(FULL_REFRESH_MS)
+
+    def image(self, ram=None):
+        """
+        The shown image (or a controller RAM, 0x24 or 0x26) in the firmware's
+        canvas layout: MONO_VLSB, 250 x 128, white 1.
+        """
+        source = self.shown if ram is None else self.ram[ram]
+        image = bytearray(X_BYTES * GATES)
+        for page in range(X_BYTES):
+            x = X_BYTES - 1 - page              # the firmware sends the rows from the last to the first
+            image[page * GATES:(page + 1) * GATES] = source[x * GATES:(x + 1) * GATES]
+        return image
+
+    def png(self, filename, ram=None, scale=2):
+        image = self.image(ram)
+        png.write_mono(filename, GATES, SOURCES, lambda x, y: (image[(y >> 3) * GATES + x] >> (y & 7)) & 1, scale)
+
+
+def attach(board=None):
+    board = board or emulator.board
+    board.panel = Panel(board)
+    return board.panel
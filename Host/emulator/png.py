@@ -0,0 +1,52 @@
+import struct
+from binascii import crc32
+
+try:
+    from zlib import compress
+except ImportError:             # MicroPython without zlib: stored deflate blocks
+    compress = None
+
+
+def _adler32(data):
+    a, b = 1, 0
+    for byte in data:
+        a = (a + byte) % 65521
+        b = (b + a) % 65521
+    return (b << 16) | a
+
+
+def _stored(data):
+    out = bytearray(b"\x78\x01")
+    for start in range(0, len(data), 65535):
+        block = data[start:start + 65535]
+        final = 1 if start + 65535 >= len(data) else 0
+        out += struct.pack("<BHH", final, len(block), len(block) ^ 0xFFFF)
+        out += block
+    out += struct.pack(">I", _adler32(data))
+    return bytes(out)
+
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc32(kind + data) & 0xFFFFFFFF)
+
+
+def write_mono(filename, width, height, pixel, scale=1):
+    """1 bit PNG of width x height pixels, pixel(x, y) returning 1 for white."""
+    w = width * scale
+    row_bytes = (w + 7) // 8
+    raw = bytearray()
+    for y in range(height):
+        row = bytearray(row_bytes)
+        for x in range(width):
+            if pixel(x, y):
+                for k in range(x * scale, x * scale + scale):
+                    row[k >> 3] |= 0x80 >> (k & 7)
+        for _ in range(scale):
+            raw.append(0)                   # no filter
+            raw += row
+    data = compress(bytes(raw)) if compress else _stored(bytes(raw))
+    with open(filename, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", w, height * scale, 1, 0, 0, 0, 0)))
+        f.write(_chunk(b"IDAT", data))
+        f.write(_chunk(b"IEND", b""))
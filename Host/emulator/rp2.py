@@ -0,0 +1,77 @@
+"""rp2 module: PIO programs are not executed, a state machine talks to the device model on its pin."""
+import emulator
+
+
+class PIO:
+    IN_LOW = 0
+    IN_HIGH = 1
+    OUT_LOW = 2
+    OUT_HIGH = 3
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+    JOIN_NONE = 0
+    JOIN_TX = 1
+    JOIN_RX = 2
+    IRQ_SM0 = 0x100
+
+    def __init__(self, id):
+        self.id = id
+
+
+class Program:
+    def __init__(self, function, options):
+        self.function = function
+        self.options = options
+
+
+def asm_pio(**options):
+    def assemble(function):
+        return Program(function, options)
+    return assemble
+
+
+class StateMachine:
+    def __init__(self, id, program=None, freq=-1, **pins):
+        self.id = id
+        self.device = None
+        self.running = False
+        self.tx = []
+        if program is not None:
+            self.init(program, freq, **pins)
+
+    def init(self, program, freq=-1, in_base=None, out_base=None, set_base=None, jmp_pin=None,
+             sideset_base=None, **options):
+        pin = in_base or jmp_pin or set_base or out_base
+        self.device = emulator.board.pio.get(pin.id) if pin is not None else None
+
+    def active(self, value=None):
+        if value is None:
+            return self.running
+        self.running = bool(value)
+
+    def put(self, value, shift=0):
+        self.tx.append(value)
+
+    def get(self, buf=None, shift=0):
+        if self.device is None:
+            raise OSError(110)      # the board would block forever, a timeout is friendlier
+        return self.device.get()
+
+    def rx_fifo(self):
+        return 0 if self.device is None else len(self.device.out)
+
+    def tx_fifo(self):
+        return len(self.tx)
+
+    def exec(self, instruction):
+        pass
+
+    def restart(self):
+        pass
+
+    def irq(self, handler=None, trigger=0, hard=False):
+        pass
+
+
+def bootsel_button():
+    return 0
@@ -0,0 +1,39 @@
+"""sensor.py of every sensor in Code/sensors, as in the examples of Code/sensor.py, with the device model to attach."""
+from emulator import devices
+
+SENSORS = {
+    "ds18b20": (
+        "from sensors.ds18b20 import DS18B20\n"
+        "from machine import Pin\n"
+        "sensor = DS18B20(Pin(0), filename=\"sensors/ds18b20_1.json\")\n",
+        lambda **model: devices.attach_onewire(0, devices.DS18B20(**model)),
+    ),
+    "scd4x": (
+        "from machine import I2C, Pin\n"
+        "from sensors.scd4x import SCD4X\n"
+        "I2c = I2C(1, scl=Pin(7), sda=Pin(6), freq=400_000)\n"
+        "sensor = SCD4X(I2c)\n",
+        lambda **model: devices.attach_i2c(0x62, devices.SCD4X(**model)),
+    ),
+    "sht4x": (
+        "from machine import I2C, Pin\n"
+        "from sensors.sht4x import SHT4X\n"
+        "I2c = I2C(1, scl=Pin(7), sda=Pin(6), freq=400_000)\n"
+        "sensor = SHT4X(I2c, filename=\"sensors/sht41.json\")\n",
+        lambda **model: devices.attach_i2c(0x44, devices.SHT4X(**model)),
+    ),
+    "dht22": (
+        "from machine import Pin\n"
+        "from sensors.dht22 import PicoDHT22\n"
+        "dht_data = Pin(8, Pin.IN, Pin.PULL_UP)\n"
+        "sensor = PicoDHT22(dataPin=dht_data, filename=\"sensors/dht22_1.json\")\n",
+        lambda **model: devices.attach_pio(8, devices.DHT22(**model)),
+    ),
+    "soil_moisture": (
+        "from machine import ADC\n"
+        "from sensors.soil_moisture import SoilMoisture\n"
+        "adc = ADC(26)\n"
+        "sensor = SoilMoisture(adc, \"sensors/moisture_1.json\", channel=0)\n",
+        lambda volts=1.2: devices.attach_analog(0, volts),
+    ),
+}
@@ -0,0 +1,20 @@
+"""uctypes module: addresses are object ids, no memory is shared through them."""
+LITTLE_ENDIAN = 0
+BIG_ENDIAN = 1
+NATIVE = 2
+
+
+def addressof(obj):
+    return id(obj)
+
+
+def bytearray_at(address, size):
+    return bytearray(size)
+
+
+def bytes_at(address, size):
+    return bytes(size)
+
+
+def sizeof(struct, layout_type=NATIVE):
+    raise NotImplementedError("uctypes structures are not emulated")
@@ -0,0 +1,25 @@
+"""uerrno module with the numbers MicroPython uses."""
+EPERM = 1
+ENOENT = 2
+EIO = 5
+EBADF = 9
+EAGAIN = 11
+ENOMEM = 12
+EACCES = 13
+EEXIST = 17
+ENODEV = 19
+EISDIR = 21
+EINVAL = 22
+EOPNOTSUPP = 95
+EADDRINUSE = 98
+ECONNABORTED = 103
+ECONNRESET = 104
+ENOBUFS = 105
+ENOTCONN = 107
+ETIMEDOUT = 110
+ECONNREFUSED = 111
+EHOSTUNREACH = 113
+EALREADY = 114
+EINPROGRESS = 115
+
+errorcode = {value: name for name, value in globals().items() if name.isupper()}
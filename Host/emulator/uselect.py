@@ -0,0 +1,63 @@
+"""uselect module for the emulated sockets: waiting moves the board clock on."""
+import emulator
+
+POLLIN = 0x0001
+POLLOUT = 0x0004
+POLLERR = 0x0008
+POLLHUP = 0x0010
+
+
+class _Poll:
+    def __init__(self):
+        self.registered = {}
+
+    def register(self, obj, eventmask=POLLIN | POLLOUT):
+        self.registered[id(obj)] = (obj, eventmask)
+
+    def unregister(self, obj):
+        self.registered.pop(id(obj), None)
+
+    def modify(self, obj, eventmask):
+        self.register(obj, eventmask)
+
+    def _ready(self):
+        now = emulator.board.clock.us()
+        ready = []
+        for obj, mask in self.registered.values():
+            flags = 0
+            if mask & POLLOUT and not obj.closed:
+                flags |= POLLOUT
+            at = obj.readable_at()
+            if mask & POLLIN and at is not None and at <= now:
+                flags |= POLLIN
+            if obj.connection is not None and obj.connection.closed and at is None:
+                flags |= POLLHUP
+            if flags:
+                ready.append((obj, flags))
+        return ready
+
+    def poll(self, timeout=-1):
+        ready = self._ready()
+        if ready or timeout == 0:
+            return ready
+        clock = emulator.board.clock
+        deadline = None if timeout < 0 else clock.us() + timeout * 1000
+        soonest = None
+        for obj, mask in self.registered.values():
+            at = obj.readable_at()
+            if mask & POLLIN and at is not None and (soonest is None or at < soonest):
+                soonest = at
+        if soonest is not None and (deadline is None or soonest <= deadline):
+            clock.advance_to(soonest)
+            return self._ready()
+        if deadline is None:
+            raise OSError(110)          # nothing will ever arrive; the board would hang here
+        clock.advance_to(deadline)
+        return []
+
+    def ipoll(self, timeout=-1, flags=0):
+        return iter(self.poll(timeout))
+
+
+def poll():
+    return _Poll()
@@ -0,0 +1,99 @@
+"""usocket module: TCP to the broker of the emulation, delayed by board.wifi["rtt_ms"]."""
+import emulator
+from emulator import network
+from emulator.uerrno import EINPROGRESS, EHOSTUNREACH, ENOTCONN, EAGAIN
+
+AF_INET = 2
+SOCK_STREAM = 1
+SOCK_DGRAM = 2
+IPPROTO_TCP = 6
+SOL_SOCKET = 1
+SO_REUSEADDR = 4
+
+
+def getaddrinfo(host, port, af=0, type=0, proto=0, flags=0):
+    if not network.WLAN(network.STA_IF).isconnected():
+        raise OSError(-2)           # no DNS without a network
+    return [(AF_INET, SOCK_STREAM, IPPROTO_TCP, "", (host, port))]
+
+
+class socket:
+    def __init__(self, af=AF_INET, type=SOCK_STREAM, proto=IPPROTO_TCP):
+        self.blocking = True
+        self.timeout = None
+        self.connection = None
+        self.incoming = []          # [board us when readable, bytes]
+        self.closed = False
+
+    def setblocking(self, flag):
+        self.blocking = flag
+
+    def settimeout(self, value):
+        self.timeout = value
+        self.blocking = value is None
+
+    def setsockopt(self, level, option, value):
+        pass
+
+    def connect(self, address):
+        board = emulator.board
+        if board.broker is None or not network.WLAN(network.STA_IF).isconnected():
+            raise OSError(EHOSTUNREACH)
+        self.connection = board.broker.connect()
+        self.connected_at = board.clock.us() + board.wifi["rtt_ms"] * 1000     # SYN, SYN-ACK
+        if not self.blocking:
+            raise OSError(EINPROGRESS)
+        board.clock.advance_to(self.connected_at)
+
+    def write(self, buf, length=-1):
+        if self.connection is None or self.closed:
+            raise OSError(ENOTCONN)
+        data = bytes(buf if length < 0 else memoryview(buf)[:length])
+        board = emulator.board
+        board.counters.socket_writes += 1
+        board.counters.socket_bytes += len(data)
+        answer = self.connection.receive(data)
+        if answer:
+            self.incoming.append([board.clock.us() + board.wifi["rtt_ms"] * 1000, answer])
+        return len(data)
+
+    send = write
+
+    def sendall(self, buf):
+        self.write(buf)
+
+    def readable_at(self):
+        return self.incoming[0][0] if self.incoming else None
+
+    def read(self, n=-1):
+        board = emulator.board
+        if self.blocking and self.incoming:
+            board.clock.advance_to(self.incoming[0][0])
+        if not self.incoming or self.incoming[0][0] > board.clock.us():
+            if self.connection is not None and self.connection.closed:
+                return b""
+            if not self.blocking:
+                return None
+            raise OSError(EAGAIN)
+        ready, data = self.incoming[0]
+        if n < 0 or n >= len(data):
+            self.incoming.pop(0)
+            return data
+        self.incoming[0][1] = data[n:]
+        return data[:n]
+
+    def recv(self, n):
+        data = self.read(n)
+        return b"" if data is None else data
+
+    def readinto(self, buf, n=-1):
+        data = self.read(len(buf) if n < 0 else n)
+        if not data:
+            return data
+        buf[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.closed = True
+        if self.connection is not None:
+            self.connection.closed = True
@@ -0,0 +1,94 @@
+"""
+Packs a font_to_py module into the font container read by Code/lib/display/fontfile.py.
+
+    python3 Host/fontpack.py Host/fonts/bigfont.py Code/lib/display/bigfont.fnt
+
+The module is made by font_to_py.py with -x (horizontal mapping), any size and
+character set. Glyphs with the same bitmap, like the missing characters all
+drawn as the default one, are stored once.
+"""
+import argparse
+import importlib.util
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/Code")
+
+from lib.display import fontfile                    # noqa: E402
+
+
+def packbits(data):
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        run = 1
+        while i + run < n and run < 128 and data[i + run] == data[i]:
+            run += 1
+        if run > 1:
+            out += bytes((257 - run, data[i]))
+            i += run
+            continue
+        start = i
+        while i < n and i - start < 128 and not (i + 1 < n and data[i + 1] == data[i]):
+            i += 1
+        out.append(i - start - 1)
+        out += data[start:i]
+    return bytes(out)
+
+
+def pack_glyph(glyph, width, height):
+    stride = (width - 1) // 8 + 1
+    data = bytes(glyph[:stride * height])
+    rows = bytearray(data)
+    for i in range(stride, len(rows)):
+        rows[i] = data[i] ^ data[i - stride]
+    return packbits(rows)
+
+
+def pack(font):
+    if not font.hmap():
+        raise ValueError("Font must be horizontally mapped (font_to_py.py -x).")
+    height = font.height()
+    chars = [chr(0)] + [chr(oc) for oc in range(font.min_ch(), font.max_ch() + 1)]     # default glyph first
+    flags = fontfile.HMAP | (fontfile.REVERSE if font.reverse() else 0) | \
+        (fontfile.MONOSPACED if font.monospaced() else 0)
+
+    data_start = fontfile.HEADER_SIZE + len(chars) * fontfile.ENTRY_SIZE
+    index = bytearray()
+    data = bytearray()
+    stored = {}                                     # packed glyph: offset
+    for ch in chars:
+        glyph, glyph_height, width = font.get_ch(ch)
+        if glyph_height != height:
+            raise ValueError("Glyph {!r} is not {} px high.".format(ch, height))
+        packed = pack_glyph(glyph, width, height)
+        offset = stored.get(packed)
+        if offset is None:
+            offset = stored[packed] = data_start + len(data)
+            data += packed
+        index += struct.pack(fontfile.ENTRY, offset, len(packed), width)
+
+    header = struct.pack(fontfile.HEADER, fontfile.MAGIC, fontfile.VERSION, flags, height, font.baseline(),
+                         font.max_width(), font.min_ch(), font.max_ch(), max(len(packed) for packed in stored))
+    return header + index + data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packs a font_to_py module into a font container file.")
+    parser.add_argument("module", help="font made by font_to_py.py -x")
+    parser.add_argument("output", help="font container file, e.g. Code/lib/display/bigfont.fnt")
+    args = parser.parse_args()
+
+    spec = importlib.util.spec_from_file_location("font", args.module)
+    font = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(font)
+    packed = pack(font)
+    with open(args.output, "wb") as f:
+        f.write(packed)
+    print("{}: {} characters, {} bytes".format(args.output, font.max_ch() - font.min_ch() + 1, len(packed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Runs the firmware of Code/ on the emulated board.
+
+    python3 Host/run.py --sensor ds18b20 --wakes 3
+    python3 Host/run.py --sensor scd4x --wifi --png display.png
+    python3 Host/run.py --usb --wakes 5
+
+Every wake is printed with its modeled time on the board, the time the host
+took and the traffic of the buses, the flash and the network.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import emulator                                     # noqa: E402
+from emulator.board import Counters                 # noqa: E402
+from emulator.broker import Broker                  # noqa: E402
+from emulator.sensors import SENSORS                # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs Code/main.py on the emulated PicoInk.")
+    parser.add_argument("--fs", help="directory for the flash filesystem, kept between runs (temporary by default)")
+    parser.add_argument("--wakes", type=int, default=1, help="wakes to run")
+    parser.add_argument("--sensor", choices=sorted(SENSORS), default="ds18b20")
+    parser.add_argument("--usb", action="store_true", help="powered from USB: lightsleep instead of the power cut")
+    parser.add_argument("--battery", type=float, default=3.9, help="battery voltage")
+    parser.add_argument("--wifi", action="store_true", help="reports to the MQTT broker of the emulation")
+    parser.add_argument("--ble", action="store_true", help="advertises over BLE")
+    parser.add_argument("--widget", type=int, choices=(0, 1, 2), help="widget shown")
+    parser.add_argument("--png", help="saves what the display shows after the last wake")
+    args = parser.parse_args()
+
+    fs_dir = args.fs or tempfile.mkdtemp(prefix="picoink-")
+    board = emulator.install(fs_dir)
+    board.usb = args.usb
+    board.battery_v = args.battery
+    emulator.sensor(args.sensor)
+    values = {}
+    if args.wifi:
+        values.update(WiFi_SSID="picoink", WiFi_passw="password", MQTT_brokr="192.168.1.2", MQTT_name="picoink")
+        board.wifi["ssid"] = "picoink"
+        board.broker = Broker()
+    if args.ble:
+        values["BLE_name"] = "PicoInk"
+    if args.widget is not None:
+        values["widget"] = args.widget
+    if values:
+        emulator.settings(**values)
+
+    for wake, record in enumerate(emulator.boot(args.wakes), 1):
+        traffic = " ".join("{}={}".format(name, record[name]) for name in Counters.NAMES if record[name])
+        print("wake {}: {} after {:.1f} ms on the board, {:.1f} ms on the host; {}".format(
+            wake, record["end"], record["ms"], record["host_ms"], traffic))
+    if board.broker is not None:
+        print("published:", ", ".join(board.broker.topics()) or "nothing")
+    if args.png:
+        board.panel.png(args.png)
+        print("display saved to", args.png)
+    print("filesystem in", fs_dir)
+
+
+if __name__ == "__main__":
+    main()
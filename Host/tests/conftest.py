@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emulator                                     # noqa: E402
+
+
+@pytest.fixture
+def board(tmp_path):
+    """Emulated board with a fresh copy of Code/ as its flash, the working directory while the test runs."""
+    board = emulator.install(str(tmp_path / "flash"))
+    yield board
+    emulator.uninstall()
@@ -0,0 +1,48 @@
+import emulator
+from emulator import clock
+
+
+def test_rtc_starts_again_at_every_power_on(board):
+    emulator.sensor("ds18b20")
+    times = []
+    start_wake = board.start_wake
+
+    def record_time():
+        start_wake()
+        times.append(clock.time())
+    board.start_wake = record_time
+    emulator.boot(3)
+    assert [record["end"] for record in board.wake_log] == ["power off"] * 3
+    assert times == [clock.RP2_EPOCH] * 3
+
+
+def test_rtc_runs_on_in_lightsleep(board):
+    board.usb = True
+    emulator.sensor("ds18b20")
+    emulator.settings(Interval_s="10")
+    times = []
+    start_wake = board.start_wake
+
+    def record_time():
+        start_wake()
+        times.append(clock.time())
+    board.start_wake = record_time
+    emulator.boot(3)
+    assert times[0] == clock.RP2_EPOCH
+    assert times[1] - times[0] >= 10 and times[2] - times[1] >= 10
+
+
+def test_uninstall_gives_back_the_host_time_and_open(tmp_path):
+    import builtins
+    import os
+    import sys
+    import time
+    cwd, path, host_open = os.getcwd(), list(sys.path), builtins.open
+    emulator.install(str(tmp_path / "flash"))
+    assert sys.modules["time"] is clock
+    emulator.uninstall()
+    assert sys.modules["time"] is time
+    assert "machine" not in sys.modules
+    assert builtins.open is host_open
+    assert sys.path == path
+    assert os.getcwd() == cwd
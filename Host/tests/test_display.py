@@ -0,0 +1,104 @@
+import emulator
+
+
+def _shown_frame():
+    """The frame the firmware saved as shown, from the FrameStore of the display."""
+    from lib.display.epd_2in13_bw import IMAGE_BYTES
+    from lib.display.frame_store import FrameStore
+    frame = bytearray(IMAGE_BYTES)
+    assert FrameStore("display.dat", IMAGE_BYTES).load(frame)
+    return frame
+
+
+def test_partial_refreshes_show_the_canvas(board):
+    from lib.display import screens
+    widgets, eink = screens.display()
+    widgets.clear()
+    widgets.large_text("21.5", 10, 5)
+    eink.show(widgets.img, partial=False)
+    for i, text in enumerate(("21.6", "3.0", "18.25", "7")):
+        widgets.clear()
+        widgets.large_text(text, 10 + 7 * i, 5)
+        widgets.tiny_text(text, 200 - 20 * i, 100)
+        eink.show(widgets.img, partial=True)
+        assert board.panel.image() == widgets.img
+    assert board.panel.partial_refreshes == 4
+
+
+def test_battery_wakes_show_the_saved_frame(board):
+    device = emulator.sensor("ds18b20")
+    for temperature in (21.5, 22.0, 19.75, 25.5, 23.0):
+        device.temperature = temperature
+        emulator.boot(1)
+        assert board.panel.image() == _shown_frame()
+
+
+def test_usb_loop_shows_the_saved_frame(board):
+    board.usb = True
+    device = emulator.sensor("ds18b20")
+    emulator.settings(Interval_s="10")              # lightsleep: one boot, the loop of main.py runs on
+    start_wake = board.start_wake
+
+    def next_temperature():
+        device.temperature += 0.75
+        start_wake()
+    board.start_wake = next_temperature
+    emulator.boot(5)
+    assert [record["end"] for record in board.wake_log] == ["lightsleep"] * 5
+    assert board.panel.image() == _shown_frame()
+
+
+def test_settings_pages_show_every_setting(board):
+    from collections import OrderedDict
+    from lib.display import screens
+    settings = OrderedDict(("Setting-{}".format(i), str(i)) for i in range(16))
+    settings["widget"] = 0                          # lowercase keys are not shown
+    widgets, eink = screens.display()
+    pages = []
+    for page in range(3):
+        screens.show_settings(settings, partial=page > 0, page=page)
+        pages.append(board.panel.image())
+    assert pages[2] == pages[0]                     # wraps around
+
+    widgets.clear()
+    for i in range(11, 16):
+        widgets.tiny_text("Setting-{}: {}".format(i, i), 0, (i - 11) * 10)
+    widgets.tiny_text("2/2", eink.height - 30, 110)
+    assert pages[1] == widgets.img
+
+
+def test_full_refresh_sends_each_ram_in_one_transfer(board):
+    from lib.display import screens
+    from lib.display.epd_2in13_bw import IMAGE_BYTES
+    widgets, eink = screens.display()
+    widgets.clear()
+    widgets.large_text("21.5", 10, 5)
+    writes = []
+    panel_write = board.panel.write
+
+    def write(buf):
+        writes.append(len(buf))
+        panel_write(buf)
+    board.panel.write = write
+    eink.show(widgets.img, partial=False)
+    assert writes.count(IMAGE_BYTES) == 2           # 0x24 and 0x26, where it took a transfer per byte
+    assert len(writes) < 60                         # the rest are commands and their arguments
+    assert board.panel.image(0x24) == board.panel.image(0x26) == widgets.img
+
+
+def test_qr_code_from_the_cache_draws_like_a_fresh_render(board):
+    from lib.display import widgets
+    drawn = []
+    for content in ("http://192.168.4.1", "http://192.168.4.1", "http://192.168.4.2"):
+        canvas = widgets.Widgets()
+        cached = widgets._qr_load(content.encode(), 0, 2)
+        canvas.qr_code(content, 70, 70, 2)
+        drawn.append((cached is not None, bytes(canvas.img)))
+
+        fresh = widgets.Widgets()
+        buf, width, height = widgets._qr_render(content.encode(), 0, 2)
+        fresh.canvas.blit(widgets.framebuf.FrameBuffer(buf, width, height, widgets.framebuf.MONO_VLSB),
+                          70, 70 + widgets.TOP)
+        assert bytes(canvas.img) == bytes(fresh.img)
+    assert [cached for cached, image in drawn] == [False, True, False]     # a new content is rendered again
+    assert drawn[0][1] == drawn[1][1] != drawn[2][1]
@@ -0,0 +1,16 @@
+import emulator
+
+
+def test_wake_charge_counts_the_whole_wake(board):
+    emulator.sensor("ds18b20")
+    emulator.settings(Profile="1")
+    emulator.boot(1)
+
+    from energy import Energy, wake_mah
+    from profiler import Profiler, PHASES
+    (seq, durations), = Profiler().records()
+    assert durations[PHASES.index("total")] > 0
+    mah = Energy().mah
+    assert mah > 0
+    # the charge of the wake as stored by the profiler, total included (float32 in energy.dat)
+    assert abs(mah - wake_mah(durations)) < 1e-6 * mah + 1e-9
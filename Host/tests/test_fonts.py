@@ -0,0 +1,66 @@
+from fonts import bigfont
+
+
+def test_font_file_glyphs_match_the_font_module(board):
+    from lib.display import fontfile
+    font = fontfile.Font("lib/display/bigfont.fnt")
+    assert fontfile._unpack is fontfile._unpack_python
+    for name in ("height", "baseline", "max_width", "hmap", "reverse", "monospaced", "min_ch", "max_ch"):
+        assert getattr(font, name)() == getattr(bigfont, name)(), name
+    for code in range(bigfont.min_ch() - 1, bigfont.max_ch() + 2):    # and the default glyph on both sides
+        glyph, height, width = font.get_ch(chr(code))
+        expected, expected_height, expected_width = bigfont.get_ch(chr(code))
+        assert (height, width) == (expected_height, expected_width), chr(code)
+        assert bytes(glyph) == bytes(expected), chr(code)
+    font.close()
+
+
+def _writer(cache_bytes):
+    import framebuf
+    from lib.display.fontfile import Font
+    from lib.display.writer import Writer
+    buf = bytearray(250 * 128 // 8)
+    canvas = framebuf.FrameBuffer(buf, 250, 128, framebuf.MONO_VLSB)
+    writer = Writer(canvas, 128, 250, Font("lib/display/bigfont.fnt"), verbose=False, cache_bytes=cache_bytes)
+    renders = []
+    render = writer._render
+
+    def counted(width, invert):
+        renders.append(width)
+        return render(width, invert)
+    writer._render = counted
+    return writer, buf, renders
+
+
+def _glyph_bytes(char):
+    glyph, height, width = bigfont.get_ch(char)
+    return len(glyph)
+
+
+def test_glyph_cache_keeps_the_recently_used_within_its_bytes(board):
+    budget = _glyph_bytes("1") + _glyph_bytes("2")
+    writer, buf, renders = _writer(budget)
+    writer.set_textpos(0, 0)
+    writer.printstring("12")
+    writer.set_textpos(0, 0)
+    writer.printstring("1")                         # a hit: drawn from the cache
+    assert len(renders) == 2
+    writer.set_textpos(0, 0)
+    writer.printstring("3")                         # evicts "2", the least recently used
+    assert list(writer.cache) == [("1", False), ("3", False)]
+    assert writer.cached_bytes == _glyph_bytes("1") + _glyph_bytes("3") <= budget
+    writer.set_textpos(0, 0)
+    writer.printstring("2")
+    assert len(renders) == 4
+
+
+def test_cached_glyphs_draw_like_rendered_ones(board):
+    images = []
+    for cache_bytes in (0, 4000):
+        writer, buf, renders = _writer(cache_bytes)
+        for invert in (False, True, False, True):
+            writer.set_textpos(0, 0)
+            writer.printstring("10.5,", invert)
+        images.append(bytes(buf))
+    assert images[0] == images[1]
+    assert any(images[0])
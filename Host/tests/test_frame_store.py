@@ -0,0 +1,131 @@
+import random
+
+import emulator
+
+
+def test_identical_crc_with_other_bytes_is_saved(board):
+    from binascii import crc32
+    from lib.display.frame_store import FrameStore
+    store = FrameStore("display.dat", 64)
+    first = bytearray(range(64))
+    assert store.save(first)
+    assert not store.save(bytearray(first))
+    store.frame_crc = crc32(b"\0" * 64)             # as if another frame collided with the stored one
+    other = bytearray(64)
+    assert store.save(other)
+    frame = bytearray(64)
+    assert FrameStore("display.dat", 64).load(frame) and frame == other
+
+
+def test_load_leaves_the_frame_when_the_newest_record_does_not_decode(board):
+    import struct
+    from binascii import crc32
+    from lib.display.frame_store import FrameStore, HEADER, HEADER_SIZE, MAGIC, RLE
+    size = 64
+    marked = bytearray(b"\xff" * size)
+    marked[10] = marked[50] = 0
+    store = FrameStore("display.dat", size)
+    store.save(marked)
+    record = bytes((200, 0))                        # 74 zero bytes: a valid crc, longer than the frame
+    with open("display.dat", "r+b") as f:
+        f.seek(HEADER_SIZE + size)
+        f.write(struct.pack(HEADER, MAGIC, RLE, len(record), 5, crc32(record)) + record)
+    frame = bytearray(size)
+    store = FrameStore("display.dat", size)
+    assert store.load(frame) and frame == marked and len(frame) == size
+    assert store.seq == 1
+
+
+def test_saves_alternate_slots_and_skip_the_same_frame(board):
+    from lib.display.frame_store import FrameStore
+    size = 256
+    store = FrameStore("display.dat", size)
+    frame = bytearray(size)
+    assert not store.load(frame)
+    frames = [bytearray([i]) * size for i in range(1, 5)]
+    writes = board.counters.flash_writes
+    for expected, saved in enumerate(frames):
+        assert store.save(saved)
+        assert store.newest == expected % 2
+        assert not store.save(bytearray(saved))     # byte-identical: not written
+    assert board.counters.flash_writes - writes == len(frames)
+
+    loaded = FrameStore("display.dat", size)
+    assert loaded.load(frame) and frame == frames[-1]
+    assert loaded.seq == len(frames)
+
+
+def test_power_loss_during_a_save_keeps_the_previous_frame(board):
+    from lib.display.frame_store import FrameStore, HEADER_SIZE
+    size = 256
+    store = FrameStore("display.dat", size)
+    previous = bytearray(range(256))
+    store.save(previous)
+    store.save(bytearray(reversed(previous)))
+    with open("display.dat", "r+b") as f:          # the second save cut short in its record
+        f.seek(store.slot_size + HEADER_SIZE + 10)
+        f.truncate()
+    frame = bytearray(size)
+    assert FrameStore("display.dat", size).load(frame) and frame == previous
+
+
+def test_rle_round_trip(board):
+    rnd = random.Random(4)
+    cases = [b"", b"\x00", b"\x00" * 128, b"\x00" * 129, b"\x00" * 130, bytes(range(128)), bytes(range(200)),
+             b"\xff" * 300 + bytes(range(7)) + b"\x01\x01" + b"\xff" * 3]
+    for _ in range(50):
+        data = bytearray()
+        while len(data) < 500:
+            if rnd.random() < 0.5:
+                data += bytes([rnd.getrandbits(8)]) * rnd.randint(1, 300)
+            else:
+                data += bytes(rnd.getrandbits(8) for _ in range(rnd.randint(1, 300)))
+        cases.append(bytes(data))
+    from lib.display.frame_store import rle_encode, rle_decode
+    for data in cases:
+        encoded = bytearray(2 * len(data) + 2)
+        length = rle_encode(data, encoded)
+        assert length >= 0
+        decoded = bytearray(len(data))
+        assert rle_decode(memoryview(encoded)[:length], decoded) == len(data)
+        assert decoded == data
+    assert rle_encode(bytes(range(100)), bytearray(100)) == -1     # literals need a control byte more
+
+
+def test_screens_are_stored_compressed(board):
+    from lib.display.epd_2in13_bw import IMAGE_BYTES
+    from lib.display.frame_store import FrameStore, RAW
+    rnd = random.Random(2)
+    noise = bytearray(rnd.getrandbits(8) for _ in range(IMAGE_BYTES))
+    emulator.sensor("ds18b20")
+    for widget in (0, 1, 2):                        # chart, big value, gauge
+        emulator.settings(widget=widget)
+        emulator.boot(1)
+        store = FrameStore("display.dat", IMAGE_BYTES)
+        assert store.load(bytearray(IMAGE_BYTES))
+        assert store.length < IMAGE_BYTES // 4      # 477, 615 and 700 bytes when added
+
+    store.save(noise)
+    frame = bytearray(IMAGE_BYTES)
+    assert FrameStore("display.dat", IMAGE_BYTES).load(frame) and frame == noise
+    with open("display.dat", "rb") as f:
+        f.seek(store.newest * store.slot_size + 2)
+        assert f.read(1)[0] == RAW                  # does not compress: kept raw
+
+
+def test_flash_written_over_1000_wakes(board):
+    from lib.display.epd_2in13_bw import IMAGE_BYTES
+    from lib.display.frame_store import FrameStore, HEADER_SIZE
+    frame = bytearray(IMAGE_BYTES)
+    written = 0
+    start = board.counters.flash_bytes, board.counters.flash_writes
+    for wake in range(1000):
+        store = FrameStore("display.dat", IMAGE_BYTES)      # every wake a boot
+        store.load(frame)
+        if wake % 3 == 0:                           # a new value on every third wake
+            frame[:] = b"\xff" * IMAGE_BYTES
+            frame[wake % 3000:wake % 3000 + 200] = bytes(200)
+        if store.save(frame):
+            written += HEADER_SIZE + store.length
+    assert board.counters.flash_writes - start[1] == 334
+    assert board.counters.flash_bytes - start[0] == written < 334 * 100    # the append log: 4 MB and more
@@ -0,0 +1,84 @@
+import random
+import tracemalloc
+
+import pytest
+
+
+def test_round_trip_over_the_column_end(board):
+    from history import History
+    channels = [("temperature", -55, 125), ("humidity", 0, 100)]
+    rnd = random.Random(3)
+    for bits in (8, 12, 16):
+        filename = "history{}.dat".format(bits)
+        history = History(filename, channels, bits=bits, capacity=10)
+        records = [{"temperature": rnd.uniform(-10, 40), "humidity": rnd.uniform(0, 100)} for _ in range(15)]
+        records[7]["humidity"] = None               # a missing value is stored as the minimum
+        for record in records:
+            history.append(record)
+
+        loaded = History(filename, channels, bits=bits, capacity=10)
+        assert loaded.count == 10 and loaded.seq == 15
+        assert list(loaded.read_last(10)) == list(range(5, 15))
+        for name, minimum, maximum in channels:
+            step = (maximum - minimum) / ((1 << bits) - 1)
+            expected = [minimum if record[name] is None else record[name] for record in records[5:]]
+            for value, stored in zip(expected, loaded.last_values(10, name)):
+                assert abs(value - stored) <= step / 2 + 1e-3
+        assert loaded.last_values(3, "temperature") == loaded.last_values(10, "temperature")[-3:]
+
+
+def test_channel_name_over_the_table_field_is_refused(board):
+    from history import History, NAME_SIZE
+    History("history.dat", [("x" * NAME_SIZE, 0, 100)]).append({"x" * NAME_SIZE: 50})
+    with pytest.raises(ValueError):
+        History("history.dat", [("x" * (NAME_SIZE + 1), 0, 100)])
+    with pytest.raises(ValueError):
+        History("history.dat", [("teplota půdy", 0, 100)])     # 12 characters, 13 bytes
+
+
+def test_chart_rows_from_the_stored_entries(board):
+    from array import array
+    from history import History
+    from lib.display.widgets import CHART_ROWS
+    history = History("history.dat", [("temperature", -55, 125)])
+    values = [-20, 10, 15.5, 20, 24.9, 30, 45]
+    for value in values:
+        history.append({"temperature": value})
+    rows = array("B", bytes(len(values)))
+    assert history.last_rows(len(values), "temperature", 10, 30, CHART_ROWS, rows) == len(values)
+    # the mapping of the chart before it was read from the raw entries: clamped, truncated
+    expected = [int((min(max(value, 10), 30) - 10) / 20 * CHART_ROWS) for value in values]
+    assert all(abs(row - want) <= 1 for row, want in zip(rows, expected))
+    assert rows[0] == 0 and rows[-1] == CHART_ROWS
+
+
+def test_chart_draws_every_point_and_the_region_maxima(board):
+    from lib.display import screens
+    from lib.display.widgets import CHART_REGIONS, CHART_ROWS
+    from lib.display.epd_2in13_bw import SEEN_HEIGHT, SEEN_WIDTH, TOP, WIDTH
+    widgets = screens.widgets
+    rows = widgets.chart_rows
+    rnd = random.Random(5)
+    for count in (1, 120, len(rows)):
+        for i in range(count):
+            rows[i] = rnd.randint(0, CHART_ROWS)
+        widgets.clear()
+        tracemalloc.start()
+        maxima = widgets.chart(rows, count, 10, 30)
+        allocated = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert allocated < 2048                     # the two labels, no list per point
+
+        bottom = SEEN_WIDTH - 1
+        right = SEEN_HEIGHT - 1
+        first = max(0, count - right)
+        columns = {}
+        for i in range(first, count):
+            x = right - count + i
+            columns[x] = rows[i]
+            if 23 <= x:                             # right of the labels
+                for y in (bottom - rows[i], bottom - rows[i] + 1):     # 2 px thick, the bottom row clipped
+                    if y + TOP < WIDTH:
+                        assert widgets.canvas.pixel(x, y + TOP) == 0
+        for region, (start, end) in enumerate(CHART_REGIONS):
+            assert maxima[region] == max([row for x, row in columns.items() if start <= x < end], default=0)
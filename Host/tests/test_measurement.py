@@ -0,0 +1,42 @@
+import struct
+
+import pytest
+
+SOC = [
+    (3.0, 0),           # below the curve
+    (3.27, 0),          # its first point
+    (3.44, 2),          # halfway to 5 %, rounded down
+    (3.61, 5),
+    (3.65, 7),
+    (3.80, 40),
+    (4.00, 77),
+    (4.19, 99),
+    (4.20, 100),        # full charge
+    (4.35, 100),        # on the charger
+]
+
+
+@pytest.mark.parametrize("voltage, soc", SOC)
+def test_voltage_to_soc(board, voltage, soc):
+    from measurement import voltage_to_soc
+    assert voltage_to_soc(voltage) == soc
+
+
+FILTER = [
+    (None, 3.9, 3.9),               # first wake: the reading
+    (1.0, 3.8, 3.8),                # stored voltage out of range: the reading
+    (3.9, 4.0, 3.93),               # VOLTAGE_ALPHA of the change
+    (3.9, 3.7, 3.84),
+    (3.9, 4.25, 4.25),              # charged or swapped, over VOLTAGE_STEP: starts over
+]
+
+
+@pytest.mark.parametrize("stored, reading, filtered", FILTER)
+def test_filtered_voltage(board, stored, reading, filtered):
+    from measurement import filtered_voltage, VOLTAGE_FILE
+    if stored is not None:
+        with open(VOLTAGE_FILE, "wb") as f:
+            f.write(struct.pack("<f", stored))
+    assert filtered_voltage(reading) == filtered
+    with open(VOLTAGE_FILE, "rb") as f:
+        assert struct.unpack("<f", f.read())[0] == pytest.approx(filtered)
@@ -0,0 +1,90 @@
+import json
+
+from emulator.broker import Broker
+
+
+def _wifi(board):
+    """Connects the WiFi of the emulation, with a fresh broker behind it."""
+    import network
+    from time import sleep_ms
+    board.broker = Broker()
+    wlan = network.WLAN(network.STA_IF)
+    wlan.active(True)
+    wlan.connect("picoink", "password")
+    while not wlan.isconnected():
+        sleep_ms(10)
+
+
+def test_timed_out_pid_is_not_acked(board):
+    from time import sleep_ms
+    from lib.wireless.umqtt_simple import MQTTClient
+    _wifi(board)
+    client = MQTTClient("picoink", "192.168.1.2", message_timeout=1)
+    client.connect()
+    board.broker.acks = False
+    lost = client.publish(b"picoink/sensor", b"{}", qos=1)
+    sleep_ms(1500)                                  # past message_timeout of the first message
+    board.broker.acks = True
+    pid = client.publish(b"picoink/sensor", b"{}", qos=1)
+    assert not client.wait_for_acks(500)            # the PUBACK of the second one expires the first
+    assert lost not in client.rcv_pids
+    assert not client.acked(lost)
+    assert client.acked(pid)
+
+
+def test_discovery_is_remembered_only_when_acknowledged(board):
+    from lib.wireless import ha
+    _wifi(board)
+    ha.MQTT.message_timeout = 1
+    ha.MQTT.connect()
+    entities = [("temperature", "°C", "temperature"), ("soc", "%", "battery")]
+    board.broker.drop = 1                           # the first PUBACK is lost, the second one
+    board.wifi["rtt_ms"] = 1500                     # comes after message_timeout of the first
+    assert not ha.update_discovery(entities)
+    with open(ha.DISCOVERY_FILE) as f:
+        assert list(json.load(f)) == ["soc"]
+
+    board.wifi["rtt_ms"] = 20
+    assert ha.update_discovery(entities)            # sends again only the one not acknowledged
+    assert len(board.broker.topics("/config")) == 3
+    assert ha.update_discovery(entities)
+    assert len(board.broker.topics("/config")) == 3
+
+
+def _recorded(board):
+    """Every socket write the broker receives, one entry each."""
+    writes = []
+    connect = board.broker.connect
+
+    def recording():
+        connection = connect()
+        receive = connection.receive
+
+        def record(data):
+            writes.append(data)
+            return receive(data)
+        connection.receive = record
+        return connection
+    board.broker.connect = recording
+    return writes
+
+
+def test_connect_and_publish_are_written_whole(board):
+    from lib.wireless.umqtt_simple import MQTTClient, PKT_SIZE
+    _wifi(board)
+    writes = _recorded(board)
+    client = MQTTClient("picoink", "192.168.1.2")
+    pkt = client.pkt
+    client.connect()
+    assert writes == [b"\x10\x13\x00\x04MQTT\x04\x02\x00\x00\x00\x07picoink"]
+
+    topic = b"picoink/" + b"x" * 192                # remaining length 206: two bytes of varint
+    pid = client.publish(topic, b"{}", qos=1)
+    assert writes[1:] == [b"\x32\xce\x01\x00\xc8" + topic + pid.to_bytes(2, "big") + b"{}"]
+    client.publish(b"picoink/state", b"on", retain=True)
+    assert writes[2:] == [b"\x31\x11\x00\x0dpicoink/state" + b"on"]
+    assert client.pkt is pkt and len(pkt) == PKT_SIZE   # assembled in the preallocated buffer
+
+    client.publish(b"picoink/big", b"x" * PKT_SIZE)
+    assert len(writes) == 4 and len(writes[3]) == 3 + 13 + PKT_SIZE
+    assert board.broker.messages[-1] == ("picoink/big", b"x" * PKT_SIZE, 0, False)
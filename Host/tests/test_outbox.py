@@ -0,0 +1,31 @@
+import json
+
+import emulator
+from emulator.broker import Broker
+
+
+def _wifi_settings(board):
+    emulator.settings(WiFi_SSID="picoink", WiFi_passw="password", MQTT_brokr="192.168.1.2", MQTT_name="picoink")
+    board.wifi["ssid"] = "picoink"
+
+
+def test_outage_is_sent_with_ages_after_power_cuts(board):
+    device = emulator.sensor("ds18b20")
+    _wifi_settings(board)
+    for temperature in (21.5, 22.5, 23.5):          # the broker is down: three wakes into the outbox
+        device.temperature = temperature
+        emulator.boot(1)
+    assert [record["end"] for record in board.wake_log] == ["power off"] * 3
+
+    board.broker = Broker()
+    device.temperature = 24.5
+    emulator.boot(1)
+    backlog = [json.loads(payload) for topic, payload, qos, retain in board.broker.messages
+               if topic.endswith("/backlog")]
+    states = [state for message in backlog for state in message]
+    assert [state["temperature"] for state in states] == [21.5, 22.5, 23.5]
+    assert [state["age"] for state in states] == [1800, 1200, 600]      # Interval-s 600, the TPL5110 period
+
+    from outbox import Outbox
+    outbox = Outbox("outbox.dat", ["temperature", "soc"])
+    assert outbox.load() and not len(outbox)
@@ -0,0 +1,34 @@
+def _reporter():
+    from report import Reporter
+    return Reporter({"temperature": ("°C", "temperature"), "humidity": ("%", "humidity")})
+
+
+def test_first_wake_without_state_reports(board):
+    reporter = _reporter()
+    assert reporter.published == {} and reporter.silent == 0
+    assert reporter.should_report({"temperature": 21.0, "humidity": 40.0, "soc": 80})
+
+
+def test_change_within_the_deadband_is_skipped_beyond_it_reported(board):
+    reporter = _reporter()
+    reporter.reported({"temperature": 21.0, "humidity": 40.0, "soc": 80})
+    reporter = _reporter()                          # the next wake, from report.json
+    assert not reporter.should_report({"temperature": 21.1, "humidity": 40.5, "soc": 84})
+    reporter.skipped()
+    assert reporter.should_report({"temperature": 21.3, "humidity": 40.5, "soc": 84})
+    assert reporter.changed({"temperature": 21.3, "humidity": 40.5, "soc": 84}) == ["temperature"]
+
+
+def test_silent_wakes_end_with_a_heartbeat(board):
+    from report import HEARTBEAT_WAKES
+    values = {"temperature": 21.0, "humidity": 40.0, "soc": 80}
+    _reporter().reported(values)
+    for wake in range(HEARTBEAT_WAKES - 1):
+        reporter = _reporter()
+        assert not reporter.should_report(values)
+        reporter.skipped()
+    reporter = _reporter()
+    assert reporter.silent == HEARTBEAT_WAKES - 1
+    assert reporter.should_report(values)
+    reporter.reported(values)
+    assert not _reporter().should_report(values)
@@ -0,0 +1,45 @@
+import random
+import statistics
+
+from emulator import devices
+
+
+def _adc(noise, seed=1):
+    """ADC of the emulated board on a noisy 1.5 V input, and the read_u16() values it gives, in order."""
+    from machine import ADC
+    rnd = random.Random(seed)
+    devices.attach_analog(0, lambda: rnd.gauss(1.5, noise))
+    return ADC(26)
+
+
+def _reference_stop(samples, tolerance, min_count=8, block=8):
+    """Samples taken by the early stop computed with floats over all the values."""
+    n = 0
+    while n < len(samples):
+        n = min(n + block, len(samples))
+        if n >= min_count and statistics.variance(samples[:n]) <= tolerance * tolerance * n:
+            break
+    return n
+
+
+def test_mean_without_tolerance(board):
+    import sampling
+    adc = _adc(0.05)
+    value, n = sampling.oversample(adc, 64, sampling.MEAN)
+    assert n == 64
+    assert value == statistics.mean(sampling._buffer[:64])
+
+
+def test_early_stop_matches_the_variance_of_the_samples(board):
+    import sampling
+    stops = []
+    for noise, tolerance in ((0.002, 16), (0.02, 16), (0.2, 64), (0.0, 1)):
+        adc = _adc(noise)
+        value, n = sampling.oversample(adc, 128, sampling.MEDIAN, tolerance=tolerance)
+        taken = list(sampling._buffer[:n])
+        adc = _adc(noise)                           # the same samples again, all 128 of them
+        sampling.oversample(adc, 128, sampling.MEAN)
+        assert n == _reference_stop(list(sampling._buffer[:128]), tolerance)
+        assert value == statistics.median(taken)
+        stops.append(n)
+    assert stops[-1] == 8 and max(stops) == 128     # a steady input stops at once, a noisy one never
@@ -0,0 +1,82 @@
+class Pin:
+    def __init__(self, level=0):
+        self.level = level
+
+    def value(self, level=None):
+        if level is None:
+            return self.level
+        self.level = level
+
+
+def test_wake_period_is_the_timer_on_battery_and_the_interval_on_usb(board):
+    from scheduler import Scheduler, FakeClock
+    vbus = Pin(0)
+    scheduler = Scheduler(Pin(), vbus, 600, clock=FakeClock())
+    scheduler.adapt(20.0, 1.0)
+    scheduler.adapt(20.0, 1.0)                      # steady value: the interval grew
+    assert scheduler.interval > 600
+    assert scheduler.wake_period_s() == 600         # the TPL5110 does not follow it
+    vbus.level = 1
+    assert scheduler.wake_period_s() == scheduler.interval
+
+
+class DonePin(Pin):
+    def __init__(self):
+        super().__init__()
+        self.levels = []
+
+    def value(self, level=None):
+        if level is not None:
+            self.levels.append(level)
+        return super().value(level)
+
+
+def test_interval_adapts_between_a_quarter_and_four_times(board):
+    from scheduler import Scheduler, FakeClock
+    scheduler = Scheduler(Pin(), Pin(1), 60, clock=FakeClock())
+    for wake in range(10):
+        scheduler.adapt(20.0, 1.0)                  # steady: grows by half up to 4 times
+    assert scheduler.interval == 240
+    for wake in range(10):
+        scheduler.adapt(20.0 + 2 * (wake % 2), 1.0)     # moving: halves down to a quarter
+    assert scheduler.interval == 15
+    assert scheduler.adapt(None, 1.0) == 15         # nothing measured: unchanged
+
+
+def test_sleep_mode_by_power_source_and_interval(board):
+    from scheduler import Scheduler, FakeClock, POWER_OFF, LIGHT_SLEEP, DEEP_SLEEP, DEEP_SLEEP_FROM_S
+    vbus = Pin(0)
+    scheduler = Scheduler(Pin(), vbus, 600, clock=FakeClock())
+    assert scheduler.mode(1000) == POWER_OFF
+    vbus.level = 1
+    assert scheduler.mode(DEEP_SLEEP_FROM_S * 1000 - 1) == LIGHT_SLEEP
+    assert scheduler.mode(DEEP_SLEEP_FROM_S * 1000) == DEEP_SLEEP
+
+    clock = FakeClock()
+    scheduler = Scheduler(Pin(), Pin(1), 60, clock=clock)
+    clock.sleep_ms(2000)                            # the wake took 2 s of the interval
+    assert scheduler.sleep() == LIGHT_SLEEP
+    scheduler.interval = 600
+    assert scheduler.sleep() == DEEP_SLEEP
+    assert clock.sleeps == [(LIGHT_SLEEP, 58_000), (DEEP_SLEEP, 600_000)]
+
+
+def test_battery_wake_signals_done_and_sleeps_when_the_power_stays(board):
+    from scheduler import Scheduler, FakeClock, LIGHT_SLEEP, POWER_OFF_GRACE_MS
+    done, clock = DonePin(), FakeClock()
+    scheduler = Scheduler(done, Pin(0), 60, clock=clock)
+    assert scheduler.sleep() == LIGHT_SLEEP         # no TPL5110 fitted: the board is still running
+    assert done.levels == [1, 0]
+    assert clock.sleeps == [(LIGHT_SLEEP, 60_000 - POWER_OFF_GRACE_MS)]
+
+
+def test_deepsleep_keeps_the_adapted_interval(board):
+    from scheduler import Scheduler, FakeClock, DEEP_SLEEP
+    scheduler = Scheduler(Pin(), Pin(1), 600, clock=FakeClock())
+    scheduler.adapt(20.0, 1.0)
+    scheduler.adapt(25.0, 1.0)
+    assert scheduler.sleep() == DEEP_SLEEP
+    booted = Scheduler(Pin(), Pin(1), 600, clock=FakeClock())     # the board boots again
+    assert booted.interval == scheduler.interval == 450
+    assert booted.last == 25.0
+    assert Scheduler(Pin(), Pin(1), 300, clock=FakeClock()).interval == 300     # new setting: starts over
@@ -0,0 +1,56 @@
+import json
+
+
+def test_full_connect_after_the_cache_failed_gets_the_whole_time(board):
+    from nonvolatile import Settings
+    from lib.wireless import sta
+    Settings["WiFi-SSID"] = "picoink"
+    Settings["WiFi-passw"] = "password"
+    board.wifi["ssid"] = "picoink"
+    with open(sta.CACHE_FILE, "w") as f:
+        f.write(json.dumps({"ssid": "picoink", "static": "",
+                            "ifconfig": ["192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1"]}))
+    board.wifi["assoc_ms"] = 5_000                  # the cached connect gives up after FAST_CONNECT_MS
+    sta.wifi_connect()
+    assert sta.Fast
+    assert sta.wait_for_wifi_connection()           # 3 s of it and 7.7 s of the full connect
+    assert not sta.Fast
+    sta.published()
+    with open(sta.CACHE_FILE) as f:
+        assert "ifconfig" in json.loads(f.read())
+
+
+def _connect(board):
+    from nonvolatile import Settings
+    from lib.wireless import sta
+    Settings["WiFi-SSID"] = "picoink"
+    Settings["WiFi-passw"] = "password"
+    board.wifi["ssid"] = "picoink"
+    sta.wifi_connect()
+    assert sta.wait_for_wifi_connection()
+    sta.published()
+    sta.STA.disconnect()
+    return sta
+
+
+def test_cached_access_point_is_connected_without_the_scan(board):
+    import network
+    sta = _connect(board)
+    assert not sta.Fast
+    assert sta.STA.log[-1]["bssid"] is None
+    sta = _connect(board)
+    assert sta.Fast
+    assert sta.STA.log[-1]["bssid"] == network.AP_BSSID
+    assert sta.STA.log[-1]["channel"] == network.AP_CHANNEL
+
+
+def test_cached_lease_asks_dhcp_again_after_lease_wakes(board):
+    sta = _connect(board)
+    for wake in range(sta.LEASE_WAKES):
+        assert sta.load_cache()["lease_wakes"] == wake
+        sta = _connect(board)
+        assert sta.STA.static                       # the cached lease, no DHCP
+    assert "ifconfig" not in sta.load_cache()
+    sta = _connect(board)
+    assert sta.Fast and sta.STA.static is None      # directed connect, fresh lease from DHCP
+    assert sta.load_cache()["lease_wakes"] == 0